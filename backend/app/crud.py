@@ -1,4 +1,6 @@
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
+import base64
 import uuid
 import json
 from datetime import datetime
@@ -94,9 +96,40 @@ def log_event(db: Session, event_type: str, actor: str, payload: dict):
     db.refresh(db_event)
     return db_event
 
-def get_events(db: Session, skip: int = 0, limit: int = 100):
-    """Retrieves a list of events from the event ledger."""
-    return db.query(models.Event).order_by(models.Event.timestamp.desc()).offset(skip).limit(limit).all()
+# The backend image is built from backend/ alone, so it cannot import runtime.ledger;
+# these two keep its cursor token format (urlsafe base64 of [timestamp, id], unpadded)
+# so a token from either API pages the other. tests/test_ledger.py pins the format.
+
+def encode_event_cursor(event: models.Event) -> str:
+    """Opaque keyset cursor pointing just past this event in (timestamp, id) DESC order."""
+    raw = json.dumps([event.timestamp, event.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_event_cursor(cursor: str):
+    """Inverse of encode_event_cursor; raises ValueError for malformed tokens."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, event_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(timestamp, str) or not isinstance(event_id, int):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return timestamp, event_id
+
+def get_events(db: Session, skip: int = 0, limit: int = 100, cursor: str = None):
+    """Retrieves a list of events from the event ledger.
+
+    With a cursor, seeks past the given (timestamp, id) instead of counting
+    an offset, so deep pages cost the same as the first one.
+    """
+    query = db.query(models.Event)
+    if cursor:
+        timestamp, event_id = decode_event_cursor(cursor)
+        query = query.filter(or_(
+            models.Event.timestamp < timestamp,
+            and_(models.Event.timestamp == timestamp, models.Event.id < event_id)
+        ))
+    return query.order_by(models.Event.timestamp.desc(), models.Event.id.desc()).offset(skip).limit(limit).all()
 
 
 # --- Approval CRUD Functions ---
@@ -1,7 +1,7 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 import threading
 import os
@@ -42,6 +42,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.post("/api/v1/tasks/", response_model=schemas.Task)
@@ -63,11 +64,20 @@ def read_tasks_endpoint(skip: int = 0, limit: int = 100, db: Session = Depends(g
     return tasks
 
 @app.get("/api/v1/events/", response_model=List[schemas.Event], summary="Read the Event Ledger")
-def read_events_endpoint(skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
+def read_events_endpoint(response: Response, skip: int = 0, limit: int = 20, cursor: Optional[str] = None,
+                         db: Session = Depends(get_db)):
     """
     Retrieves the most recent events from the Event Ledger.
+    For deep paging, pass the X-Next-Cursor header of the previous page as `cursor`.
     """
-    events = crud.get_events(db, skip=skip, limit=limit)
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="Use either cursor or skip, not both")
+    try:
+        events = crud.get_events(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if events and len(events) == limit:
+        response.headers["X-Next-Cursor"] = crud.encode_event_cursor(events[-1])
     return events
 
 @app.get("/api/v1/tasks/{task_id}", response_model=schemas.Task)
@@ -38,7 +38,7 @@ class Event(Base):
     __tablename__ = "events"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    timestamp = Column(String, nullable=False)
+    timestamp = Column(String, nullable=False, index=True)
     event_type = Column(String, nullable=False, index=True)
     actor = Column(String, nullable=False, index=True)
     target = Column(String)
@@ -0,0 +1,142 @@
+"""
+Cancellation - cooperative cancellation tokens and thread-safe timeouts for workflow tasks.
+
+Each workflow execution owns a root CancellationToken; every task attempt gets a
+child token, so cancelling the execution (WorkflowExecution.cancel) or hitting an
+attempt's timeout reaches the handler. Handlers that accept a `token` argument
+receive it and can poll `token.cancelled` or call `token.raise_if_cancelled()`.
+Timeouts are enforced by waiting on an event rather than SIGALRM, so they work in
+any thread with sub-second precision.
+"""
+
+import functools
+import inspect
+import threading
+from typing import Any, Callable, List, Optional
+
+
+class TaskCancelledError(Exception):
+    """Raised when a task is stopped through its cancellation token."""
+
+
+class CancellationToken:
+    """Thread-safe cancellation signal, optionally linked to a parent token."""
+
+    def __init__(self, parent: Optional["CancellationToken"] = None):
+        """Initialize token; it is cancelled when its parent is."""
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self._parent = parent
+        if parent is not None:
+            parent.add_callback(self._cancel_from_parent)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Cancel the token and every token derived from it."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def _cancel_from_parent(self) -> None:
+        self.cancel(self._parent.reason)
+
+    def raise_if_cancelled(self) -> None:
+        """Raise TaskCancelledError if the token has been cancelled."""
+        if self._event.is_set():
+            raise TaskCancelledError(self.reason)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep until cancelled or timeout; returns True if cancelled."""
+        return self._event.wait(timeout)
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Call callback() on cancellation (immediately if already cancelled)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        """Stop calling a registered callback."""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def detach(self) -> None:
+        """Unlink from the parent once the work this token guards is over."""
+        if self._parent is not None:
+            self._parent.remove_callback(self._cancel_from_parent)
+            self._parent = None
+
+
+def accepts_token(handler: Callable) -> bool:
+    """True if the handler takes a `token` keyword (or **kwargs)."""
+    try:
+        parameters = inspect.signature(handler).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == "token" or p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters)
+
+
+_accepts_token_cached = functools.lru_cache(maxsize=1024)(accepts_token)
+
+
+def bind_token(handler: Callable, token: CancellationToken) -> Callable[[Any], Any]:
+    """Handler as a one-argument callable, passing the token if it accepts one."""
+    try:
+        accepts = _accepts_token_cached(handler)
+    except TypeError:  # unhashable callable
+        accepts = accepts_token(handler)
+    return functools.partial(handler, token=token) if accepts else handler
+
+
+def call_with_timeout(fn: Callable[[Any], Any], arg: Any, timeout: Optional[float],
+                      token: CancellationToken, message: str = "timeout") -> Any:
+    """Call fn(arg), giving up after timeout seconds or when token is cancelled.
+
+    Without a timeout fn runs in the calling thread. With one it runs in a helper
+    thread and the caller waits on an event; on timeout the token is cancelled
+    (so a cooperative handler can stop) and TimeoutError(message) is raised. A
+    Python thread cannot be killed, so an uncooperative handler runs on until it
+    returns and its result is discarded.
+    """
+    if timeout is None:
+        return fn(arg)
+
+    outcome = {}
+    done = threading.Event()
+
+    def target():
+        try:
+            outcome["result"] = fn(arg)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    threading.Thread(target=target, name="task-timeout-worker", daemon=True).start()
+    token.add_callback(done.set)
+    try:
+        done.wait(timeout)
+    finally:
+        token.remove_callback(done.set)
+
+    if "error" in outcome:
+        raise outcome["error"]
+    if "result" in outcome:
+        return outcome["result"]
+    if token.cancelled:
+        raise TaskCancelledError(token.reason)
+    token.cancel("timeout")
+    raise TimeoutError(message)
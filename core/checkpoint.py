@@ -0,0 +1,161 @@
+"""
+Checkpoint - durable workflow progress for WorkflowExecutor.resume().
+
+Checkpoints live next to the events in the ledger's SQLite database and are
+written by the ledger's writer thread: every finished task's status and
+serialized result, plus the execution's own status. Task checkpoints are queued
+as non-urgent writes, so with a group-commit ledger the checkpoints of many
+short tasks share one transaction instead of paying a commit each.
+
+Results go through a pluggable serializer (pickle by default; JSON for results
+that must stay readable outside Python). A result the serializer cannot handle
+is not checkpointed, so its task simply runs again on resume.
+"""
+
+import json
+import logging
+import pickle
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+from ..runtime.ledger import EventLedger
+
+logger = logging.getLogger(__name__)
+
+
+class PickleSerializer:
+    """Serialize results with pickle (any picklable value)."""
+    name = "pickle"
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class JsonSerializer:
+    """Serialize results as JSON (portable, JSON-compatible values only)."""
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+CHECKPOINT_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS workflow_checkpoints (
+        execution_id TEXT PRIMARY KEY,
+        workflow_id TEXT NOT NULL,
+        name TEXT,
+        status TEXT NOT NULL,
+        start_time REAL,
+        end_time REAL,
+        errors_json TEXT,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS task_checkpoints (
+        execution_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        serializer TEXT,
+        result BLOB,
+        error TEXT,
+        attempts INTEGER,
+        start_time REAL,
+        end_time REAL,
+        metadata_json TEXT,
+        PRIMARY KEY (execution_id, task_id)
+    ) WITHOUT ROWID
+    """,
+)
+
+SAVE_EXECUTION_SQL = """
+    INSERT INTO workflow_checkpoints (execution_id, workflow_id, name, status, start_time, end_time, errors_json)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (execution_id) DO UPDATE SET
+        status = excluded.status, end_time = excluded.end_time,
+        errors_json = excluded.errors_json, updated_at = CURRENT_TIMESTAMP
+"""
+
+SAVE_TASK_SQL = """
+    INSERT OR REPLACE INTO task_checkpoints
+        (execution_id, task_id, status, serializer, result, error, attempts, start_time, end_time, metadata_json)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class CheckpointStore:
+    """Durable execution and task checkpoints in the event ledger's database."""
+
+    def __init__(self, ledger: EventLedger, serializer=None):
+        """Initialize store; serializer needs name, dumps(value) and loads(data)."""
+        self.ledger = ledger
+        self.serializer = serializer or PickleSerializer()
+        ledger.submit_write(self._create_tables, savepoint=False).result()
+
+    @staticmethod
+    def _create_tables(conn) -> None:
+        for statement in CHECKPOINT_TABLES:
+            conn.execute(statement)
+
+    def save_execution(self, execution_id: str, workflow_id: str, name: str, status: str,
+                       start_time: Optional[float], end_time: Optional[float], errors: list) -> Future:
+        """Upsert an execution's status; committed without waiting for more work."""
+        row = (execution_id, workflow_id, name, status, start_time, end_time, json.dumps(errors))
+        return self.ledger.submit_write(lambda conn: conn.execute(SAVE_EXECUTION_SQL, row), savepoint=False)
+
+    def save_task(self, execution_id: str, task_id: str, status: str, result: Any = None,
+                  error: Optional[str] = None, attempts: int = 0, start_time: Optional[float] = None,
+                  end_time: Optional[float] = None, metadata: Optional[Dict[str, Any]] = None) -> Optional[Future]:
+        """Queue a finished task's checkpoint; it commits with the next batch.
+
+        Serialization happens here, in the calling thread. Returns None (and
+        checkpoints nothing) if the result cannot be serialized.
+        """
+        try:
+            data = self.serializer.dumps(result)
+            metadata_json = json.dumps(metadata or {}, default=str)
+        except Exception as e:
+            logger.warning(f"Task {task_id} result not checkpointed: {e}")
+            return None
+        row = (execution_id, task_id, status, self.serializer.name, data, error, attempts,
+               start_time, end_time, metadata_json)
+        return self.ledger.submit_write(lambda conn: conn.execute(SAVE_TASK_SQL, row),
+                                        urgent=False, savepoint=False)
+
+    def flush(self) -> None:
+        """Wait until every queued checkpoint is committed."""
+        self.ledger.flush()
+
+    def load(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Get an execution's checkpoint with its tasks (results deserialized), or None."""
+        self.flush()
+
+        def read(conn):
+            row = conn.execute("SELECT * FROM workflow_checkpoints WHERE execution_id = ?",
+                               (execution_id,)).fetchone()
+            if row is None:
+                return None, []
+            return dict(row), [dict(task) for task in conn.execute(
+                "SELECT * FROM task_checkpoints WHERE execution_id = ?", (execution_id,)
+            )]
+
+        checkpoint, tasks = self.ledger.read(read)
+        if checkpoint is None:
+            return None
+        checkpoint["errors"] = json.loads(checkpoint.pop("errors_json") or "[]")
+        checkpoint["tasks"] = {}
+        for task in tasks:
+            if task["serializer"] != self.serializer.name:
+                raise ValueError(f"Task {task['task_id']} was checkpointed with the "
+                                 f"{task['serializer']} serializer, not {self.serializer.name}")
+            task["result"] = self.serializer.loads(task["result"])
+            task["metadata"] = json.loads(task.pop("metadata_json") or "{}")
+            checkpoint["tasks"][task["task_id"]] = task
+        return checkpoint
@@ -0,0 +1,237 @@
+"""
+Execution backends - where a workflow task's handler actually runs.
+
+WorkflowExecutor keeps scheduling, retries, timeouts and ledger events in the
+parent process; a backend only decides where the handler call happens:
+
+- thread:  the executor's thread pool (default; fine for I/O-bound handlers)
+- process: a pool of worker processes, for CPU-bound handlers that would serialize on the GIL
+- inline:  directly on the scheduler thread, for trivial glue tasks
+
+Process workers are reused across tasks; a timeout or cancellation kills the
+task's worker outright and a new one takes its place. Process handlers must be
+picklable (module-level functions) and do not receive a cancellation token.
+Results larger than share_threshold bytes are written to shared memory by the
+worker and travel as a small SharedResult handle, so a dependent process task
+reads them straight from shared memory instead of having them pickled through
+the parent.
+"""
+
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, List, Optional
+
+from .cancellation import CancellationToken, TaskCancelledError
+
+BACKENDS = ("thread", "process", "inline")
+
+
+@dataclass(frozen=True)
+class SharedResult:
+    """Handle to a pickled task result held in a shared memory block."""
+    name: str
+    size: int
+
+    def load(self) -> Any:
+        """Unpickle the result (a copy) from shared memory."""
+        block = shared_memory.SharedMemory(name=self.name)
+        try:
+            return pickle.loads(block.buf[:self.size])
+        finally:
+            block.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory block."""
+        block = shared_memory.SharedMemory(name=self.name)
+        block.close()
+        block.unlink()
+
+
+def share(value: Any, share_threshold: int) -> Any:
+    """Move a large value into shared memory; small values are returned as is."""
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) < share_threshold:
+        return value
+    block = shared_memory.SharedMemory(create=True, size=len(data))
+    block.buf[:len(data)] = data
+    block.close()
+    return SharedResult(name=block.name, size=len(data))
+
+
+def resolve_context(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace SharedResult handles in a handler context with their values."""
+    return {key: value.load() if isinstance(value, SharedResult) else value
+            for key, value in context.items()}
+
+
+def run_shared(handler: Callable, context: Dict[str, Any], share_threshold: int) -> Any:
+    """Load shared inputs, run the handler, share a large result."""
+    return share(handler(resolve_context(context)), share_threshold)
+
+
+def _worker_main(conn) -> None:
+    # Worker process entry point: serve (handler, context, share_threshold) jobs,
+    # answering each with ("ok", result) or ("error", exception), until sent None
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        except BaseException as e:  # the job could not be unpickled here
+            conn.send(("error", e))
+            continue
+        if job is None:
+            break
+        handler, context, share_threshold = job
+        try:
+            outcome = ("ok", run_shared(handler, context, share_threshold))
+        except BaseException as e:
+            outcome = ("error", e)
+        try:
+            conn.send(outcome)
+        except Exception as e:  # unpicklable result or exception
+            conn.send(("error", RuntimeError(f"Could not return task outcome: {e!r}")))
+    conn.close()
+
+
+def _default_start_method() -> str:
+    # Never fork: the parent already runs ledger, pool and event bus threads whose
+    # locks a forked child would inherit in whatever state they happened to be in
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class _Worker:
+    """A long-lived worker process that runs one task at a time."""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+
+    def stop(self) -> None:
+        """Ask the worker to exit, killing it if it does not."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ProcessBackend:
+    """Reusable worker processes for CPU-bound handlers, with shared memory for large results."""
+
+    def __init__(self, max_workers: Optional[int] = None, share_threshold: int = 1024 * 1024,
+                 start_method: Optional[str] = None):
+        """Initialize backend; at most max_workers (default: CPU count) processes run at once.
+
+        Workers start on first use and are reused across tasks and runs. They are
+        started with start_method (default: "forkserver" where available, else
+        "spawn"), never forked from this multi-threaded process.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.share_threshold = share_threshold
+        self.slots = threading.BoundedSemaphore(self.max_workers)
+        self.context = multiprocessing.get_context(start_method or _default_start_method())
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def run(self, handler: Callable, context: Dict[str, Any], timeout: Optional[float] = None,
+            token: Optional[CancellationToken] = None, message: str = "timeout") -> Any:
+        """Run handler(context) on a pooled worker process and wait for the result.
+
+        When the timeout expires (TimeoutError(message)) or the token is cancelled
+        (TaskCancelledError) that worker is killed; a fresh one replaces it on the
+        next task.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self.slots:
+            if token is not None:
+                token.raise_if_cancelled()
+            worker = self._checkout()
+            reusable = False
+            if token is not None:
+                token.add_callback(worker.kill)
+            try:
+                worker.conn.send((handler, context, self.share_threshold))
+                remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+                if wait([worker.conn, worker.process.sentinel], remaining) and worker.conn.poll():
+                    try:
+                        status, payload = worker.conn.recv()
+                    except (EOFError, OSError):  # the worker died mid-task
+                        status = None
+                    if status is not None:
+                        reusable = True
+                        if status == "error":
+                            raise payload
+                        return payload
+                if token is not None and token.cancelled:
+                    raise TaskCancelledError(token.reason)
+                if deadline is not None and time.monotonic() >= deadline:
+                    if token is not None:
+                        token.cancel("timeout")
+                    raise TimeoutError(message)
+                raise RuntimeError(f"Worker process exited with code {worker.process.exitcode}")
+            finally:
+                if token is not None:
+                    token.remove_callback(worker.kill)
+                    # A cancellation racing the result may already have killed it
+                    reusable = reusable and not token.cancelled
+                self._checkin(worker, reusable)
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ProcessBackend is shut down")
+            if self._idle:
+                return self._idle.pop()
+        # Workers must share this process's resource tracker, or a worker's own
+        # tracker could unlink the shared blocks it created when it exits
+        resource_tracker.ensure_running()
+        return _Worker(self.context)
+
+    def _checkin(self, worker: _Worker, reusable: bool) -> None:
+        if reusable and worker.process.is_alive():
+            with self._lock:
+                if not self._closed:
+                    self._idle.append(worker)
+                    return
+            worker.stop()
+            return
+        worker.kill()
+        worker.process.join()
+        worker.conn.close()
+
+    def shutdown(self) -> None:
+        """Stop the idle worker processes; busy ones stop when their task returns.
+
+        No new worker starts afterwards: run() raises RuntimeError.
+        """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+
+def release_shared(results: List[SharedResult]) -> List[Any]:
+    """Load each shared result into this process and free its block."""
+    values = []
+    for handle in results:
+        values.append(handle.load())
+        handle.unlink()
+    return values
@@ -0,0 +1,277 @@
+"""
+Monitoring - streaming, bounded-memory statistics for WorkflowMonitor.
+
+Nothing per execution is kept: every observation folds into a MetricSummary per
+key (a workflow or task id) holding outcome counts, Welford running mean and
+variance, and a quantile sketch for p50/p95/p99. All three merge exactly, so:
+
+- windowed views ("last 5 minutes", "last hour") keep a ring of summaries, one
+  per `resolution` seconds, and merge the buckets inside the window; and
+- writers never contend on one lock: the aggregator is split into shards, each
+  writer thread sticks to one, and readers merge the shards.
+
+Memory per key is bounded by shards x (horizon / resolution + 1) summaries, each
+at most max_bins sketch bins, however many executions are recorded.
+
+The sketch is a DDSketch: log-spaced buckets give every quantile within
+`relative_accuracy` of the true value (until max_bins forces the lowest buckets
+to collapse, which only blurs the smallest values).
+"""
+
+import itertools
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Values at or below this are counted as zero by the sketch
+MIN_SKETCH_VALUE = 1e-9
+
+
+class RunningStats:
+    """Count, mean, variance, min and max in O(1) memory (Welford)."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "RunningStats") -> None:
+        """Fold another RunningStats into this one (Chan et al.)."""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0.0 below two values)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """Mergeable relative-error quantile sketch (DDSketch) for non-negative values."""
+
+    __slots__ = ("relative_accuracy", "max_bins", "gamma", "log_gamma", "bins", "zero_count", "count")
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 512):
+        """Initialize empty sketch; quantiles come back within relative_accuracy."""
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value <= MIN_SKETCH_VALUE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Fold another sketch with the same accuracy into this one."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        # Fold the lowest buckets into the lowest one kept
+        keys = sorted(self.bins)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        self.bins[excess[-1]] = sum(self.bins.pop(key) for key in excess)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated q-quantile (0 <= q <= 1), or None when empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                # Midpoint (in relative terms) of the bucket (gamma^(key-1), gamma^key]
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+
+class MetricSummary:
+    """Outcome counts plus duration statistics for one key."""
+
+    __slots__ = ("count", "successes", "failures", "durations", "sketch")
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 512):
+        self.count = 0
+        self.successes = 0
+        self.failures = 0
+        self.durations = RunningStats()
+        self.sketch = QuantileSketch(relative_accuracy, max_bins)
+
+    def add(self, duration: Optional[float], outcome: Optional[bool]) -> None:
+        """Count one observation; outcome is True (success), False (failure) or None."""
+        self.count += 1
+        if outcome is True:
+            self.successes += 1
+        elif outcome is False:
+            self.failures += 1
+        if duration is not None:
+            self.durations.add(duration)
+            self.sketch.add(max(duration, 0.0))
+
+    def merge(self, other: "MetricSummary") -> None:
+        self.count += other.count
+        self.successes += other.successes
+        self.failures += other.failures
+        self.durations.merge(other.durations)
+        self.sketch.merge(other.sketch)
+
+    def to_dict(self) -> Dict[str, Any]:
+        timed = self.durations.count
+        return {
+            "executions": self.count,
+            "successes": self.successes,
+            "failures": self.failures,
+            "avg_duration": self.durations.mean,
+            "stddev_duration": self.durations.stddev,
+            "min_duration": self.durations.min if timed else None,
+            "max_duration": self.durations.max if timed else None,
+            "p50_duration": self.sketch.quantile(0.50),
+            "p95_duration": self.sketch.quantile(0.95),
+            "p99_duration": self.sketch.quantile(0.99),
+        }
+
+
+class _Shard:
+    """One writer's slice of a StreamingAggregator."""
+
+    def __init__(self, slots: int):
+        self.lock = threading.Lock()
+        self.totals: Dict[Hashable, MetricSummary] = {}
+        # Ring of (bucket number, key -> summary); a slot is reused once its bucket ages out
+        self.ring: List[Tuple[int, Dict[Hashable, MetricSummary]]] = [(-1, {}) for _ in range(slots)]
+
+
+class StreamingAggregator:
+    """Per-key MetricSummary over all time and over sliding windows up to `horizon` seconds.
+
+    Windows are resolved to whole buckets of `resolution` seconds, so a window
+    may include up to one bucket's worth of older observations.
+    """
+
+    def __init__(self, horizon: float = 3600.0, resolution: float = 60.0, shards: int = 4,
+                 relative_accuracy: float = 0.01, max_bins: int = 512,
+                 clock: Callable[[], float] = time.time):
+        """Initialize empty aggregator."""
+        if resolution <= 0 or horizon < resolution:
+            raise ValueError("resolution must be positive and no larger than horizon")
+        self.horizon = horizon
+        self.resolution = resolution
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.clock = clock
+        self.slots = math.ceil(horizon / resolution) + 1
+        self.shards = [_Shard(self.slots) for _ in range(max(1, shards))]
+        self._local = threading.local()
+        self._next_shard = itertools.count()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = self.shards[next(self._next_shard) % len(self.shards)]
+        return shard
+
+    def _new_summary(self) -> MetricSummary:
+        return MetricSummary(self.relative_accuracy, self.max_bins)
+
+    def record(self, key: Hashable, duration: Optional[float], outcome: Optional[bool] = None,
+               timestamp: Optional[float] = None) -> None:
+        """Fold one observation for key into the current thread's shard."""
+        self.record_many([(key, duration, outcome)], timestamp)
+
+    def record_many(self, observations: Iterable[Tuple[Hashable, Optional[float], Optional[bool]]],
+                    timestamp: Optional[float] = None) -> None:
+        """Fold (key, duration, outcome) observations in, taking the shard lock once."""
+        bucket = int((self.clock() if timestamp is None else timestamp) // self.resolution)
+        shard = self._shard()
+        with shard.lock:
+            number, window = shard.ring[bucket % self.slots]
+            if number != bucket:
+                window = {}
+                shard.ring[bucket % self.slots] = (bucket, window)
+            for key, duration, outcome in observations:
+                for summaries in (shard.totals, window):
+                    summary = summaries.get(key)
+                    if summary is None:
+                        summary = summaries[key] = self._new_summary()
+                    summary.add(duration, outcome)
+
+    def summaries(self, window: Optional[float] = None, keys: Optional[Iterable[Hashable]] = None
+                  ) -> Dict[Hashable, MetricSummary]:
+        """Merged summary per key (or just `keys`), over all time or the last `window` seconds."""
+        wanted = None if keys is None else set(keys)
+        if window is not None and not 0 < window <= self.horizon:
+            raise ValueError(f"window must be between 0 and the {self.horizon}s horizon")
+        if window is not None:
+            newest = int(self.clock() // self.resolution)
+            oldest = newest - math.ceil(window / self.resolution) + 1
+        merged: Dict[Hashable, MetricSummary] = {}
+        for shard in self.shards:
+            with shard.lock:
+                if window is None:
+                    sources = [shard.totals]
+                else:
+                    sources = [summaries for number, summaries in shard.ring if oldest <= number <= newest]
+                for summaries in sources:
+                    for key, summary in summaries.items():
+                        if wanted is not None and key not in wanted:
+                            continue
+                        if key not in merged:
+                            merged[key] = self._new_summary()
+                        merged[key].merge(summary)
+        return merged
+
+    def summary(self, key: Hashable, window: Optional[float] = None) -> MetricSummary:
+        """Merged summary for one key (empty if never seen)."""
+        return self.summaries(window, [key]).get(key) or self._new_summary()
+
+    def total(self, window: Optional[float] = None) -> MetricSummary:
+        """Every key merged into one summary."""
+        combined = self._new_summary()
+        for summary in self.summaries(window).values():
+            combined.merge(summary)
+        return combined
@@ -0,0 +1,226 @@
+"""
+Profiling - opt-in per-task resource measurements for WorkflowExecutor.
+
+Pass a TaskProfiler to the executor and every task attempt is measured where its
+handler actually runs:
+
+- run_time:    wall-clock seconds inside the handler, summed over attempts
+- cpu_time:    CPU seconds of the thread that ran the handler
+- peak_memory: bytes allocated at the high-water mark (tracemalloc)
+- queue_wait:  seconds between the task becoming ready (its last dependency
+               finishing, or the run starting) and its first attempt starting
+
+and the totals land in TaskExecution.metadata["profile"], the task's final ledger
+event and its checkpoint.
+
+Limits: tracemalloc peaks are process-wide, so while tasks overlap each one's
+peak_memory is an upper bound; tracemalloc also slows every allocation, hence
+memory=False to turn it off. Process-backend and coroutine handlers get
+run_time only, since their CPU and memory are not the measuring thread's.
+
+With sample_after set, a sampler thread snapshots the stacks of handlers that
+have been running longer than that many seconds, every sample_interval seconds.
+The samples for a run are written to flamegraph_dir as <execution_id>.folded, in
+the collapsed-stack format flamegraph.pl and speedscope read.
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class _RunProfile:
+    """Measurements for one workflow execution in progress."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.stacks: Counter = Counter()
+
+
+class TaskProfiler:
+    """Collects per-task CPU, memory and timing measurements and stack samples."""
+
+    def __init__(self, memory: bool = True, sample_after: Optional[float] = None,
+                 sample_interval: float = 0.005, flamegraph_dir: Optional[str] = None):
+        """Initialize profiler; sample_after=None disables stack sampling."""
+        self.memory = memory
+        self.sample_after = sample_after
+        self.sample_interval = sample_interval
+        self.flamegraph_dir = flamegraph_dir
+        self.lock = threading.Lock()
+        self._runs: Dict[str, _RunProfile] = {}
+        # Memory measurement state: runs using tracemalloc, attempts measuring it now
+        self._tracing_runs = 0
+        self._started_tracing = False
+        self._measuring = 0
+        # Sampled threads: ident -> (execution id, task id, sample from)
+        self._sampled: Dict[int, Tuple[str, str, float]] = {}
+        self._sampler_wakeup = threading.Condition(self.lock)
+        self._sampler: Optional[threading.Thread] = None
+
+    # ===== RUNS =====
+
+    def begin_run(self, execution_id: str, name: str) -> None:
+        """Start collecting for an execution."""
+        with self.lock:
+            self._runs[execution_id] = _RunProfile(name)
+            if self.memory:
+                self._tracing_runs += 1
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started_tracing = True
+
+    def end_run(self, execution_id: str) -> Optional[str]:
+        """Stop collecting for an execution; returns the flame graph path, if one was written."""
+        with self.lock:
+            run = self._runs.pop(execution_id, None)
+            if run is not None and self.memory:
+                self._tracing_runs -= 1
+                if not self._tracing_runs and self._started_tracing:
+                    tracemalloc.stop()
+                    self._started_tracing = False
+        if run is None or not run.stacks or not self.flamegraph_dir:
+            return None
+        os.makedirs(self.flamegraph_dir, exist_ok=True)
+        path = os.path.join(self.flamegraph_dir, f"{execution_id}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(run.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def _task(self, execution_id: str, task_id: str) -> Optional[Dict[str, Any]]:
+        # Call with the lock held; None once the run has ended (a detached handler)
+        run = self._runs.get(execution_id)
+        if run is None:
+            return None
+        return run.tasks.setdefault(task_id, {
+            "run_time": 0.0, "cpu_time": None, "peak_memory": None, "samples": 0,
+        })
+
+    def task_profile(self, execution_id: str, task_id: str, ready_time: Optional[float],
+                     start_time: Optional[float]) -> Optional[Dict[str, Any]]:
+        """Get a task's measurements so far, with its queue wait, or None if it has none."""
+        with self.lock:
+            run = self._runs.get(execution_id)
+            measured = run.tasks.get(task_id) if run else None
+            if measured is None:
+                return None
+            profile = dict(measured)
+        if ready_time is not None and start_time is not None:
+            profile["queue_wait"] = max(0.0, start_time - ready_time)
+        return profile
+
+    # ===== MEASUREMENT =====
+
+    def wrap(self, handler: Callable[[Any], Any], execution_id: str, task_id: str,
+             local: bool = True) -> Callable[[Any], Any]:
+        """Measure handler calls in whichever thread makes them.
+
+        local=False (the handler hands the work to another process) measures
+        wall-clock time only.
+        """
+        return functools.partial(self._call, handler, execution_id, task_id, local)
+
+    def wrap_async(self, handler: Callable[[Any], Any], execution_id: str,
+                   task_id: str) -> Callable[[Any], Any]:
+        """Measure a coroutine handler's wall-clock time."""
+        @functools.wraps(handler)
+        async def measured(context):
+            started = time.perf_counter()
+            try:
+                return await handler(context)
+            finally:
+                self._record(execution_id, task_id, time.perf_counter() - started, None, None)
+        return measured
+
+    def _call(self, handler: Callable[[Any], Any], execution_id: str, task_id: str,
+              local: bool, context: Any) -> Any:
+        if not local:
+            started = time.perf_counter()
+            try:
+                return handler(context)
+            finally:
+                self._record(execution_id, task_id, time.perf_counter() - started, None, None)
+
+        memory = self.memory and tracemalloc.is_tracing()
+        ident = threading.get_ident()
+        with self.lock:
+            if memory:
+                # Only reset the peak when nothing else is measuring it
+                if not self._measuring:
+                    tracemalloc.reset_peak()
+                self._measuring += 1
+            if self.sample_after is not None:
+                self._sampled[ident] = (execution_id, task_id, time.monotonic() + self.sample_after)
+                self._ensure_sampler()
+        baseline = tracemalloc.get_traced_memory()[0] if memory else 0
+        cpu_started = time.thread_time()
+        started = time.perf_counter()
+        try:
+            return handler(context)
+        finally:
+            run_time = time.perf_counter() - started
+            cpu_time = time.thread_time() - cpu_started
+            peak = max(0, tracemalloc.get_traced_memory()[1] - baseline) if memory else None
+            with self.lock:
+                if memory:
+                    self._measuring -= 1
+                self._sampled.pop(ident, None)
+            self._record(execution_id, task_id, run_time, cpu_time, peak)
+
+    def _record(self, execution_id: str, task_id: str, run_time: float,
+                cpu_time: Optional[float], peak_memory: Optional[int]) -> None:
+        with self.lock:
+            task = self._task(execution_id, task_id)
+            if task is None:
+                return
+            task["run_time"] += run_time
+            if cpu_time is not None:
+                task["cpu_time"] = (task["cpu_time"] or 0.0) + cpu_time
+            if peak_memory is not None:
+                task["peak_memory"] = max(task["peak_memory"] or 0, peak_memory)
+
+    # ===== STACK SAMPLING =====
+
+    def _ensure_sampler(self) -> None:
+        # Call with the lock held
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._sample_loop, name="task-profiler-sampler",
+                                             daemon=True)
+            self._sampler.start()
+        self._sampler_wakeup.notify()
+
+    def _sample_loop(self) -> None:
+        while True:
+            with self.lock:
+                while not self._sampled:
+                    self._sampler_wakeup.wait()
+            time.sleep(self.sample_interval)
+            now = time.monotonic()
+            frames = sys._current_frames()
+            with self.lock:
+                for ident, (execution_id, task_id, sample_from) in self._sampled.items():
+                    frame = frames.get(ident)
+                    run = self._runs.get(execution_id)
+                    if frame is None or run is None or now < sample_from:
+                        continue
+                    stack = ";".join([run.name, task_id, *_handler_frames(frame)])
+                    run.stacks[stack] += 1
+                    task = self._task(execution_id, task_id)
+                    task["samples"] += 1
+
+
+def _handler_frames(frame) -> List[str]:
+    """Frames from the handler down to the sampled one, outermost first."""
+    names = []
+    while frame is not None and frame.f_code is not TaskProfiler._call.__code__:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return names[::-1]
@@ -0,0 +1,214 @@
+"""
+Result cache - content-addressed memoization of workflow task results.
+
+A cached task's key is a SHA-256 of its identity (task id, handler and
+cache_version) and of its context, the dependency results it would be called
+with. Identical inputs therefore hit whether they come from the same run, a
+nightly re-run or a resumed execution; bumping cache_version invalidates a
+task's entries after its handler or prompt changes.
+
+Entries live in an in-memory LRU tier and, if a directory is given, an on-disk
+tier that survives restarts. Both tiers evict least-recently-used entries past
+their entry/byte budgets, and every entry can carry a TTL. Memory hits return
+the stored object itself, so cached results must be treated as read-only.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def canonical_bytes(value: Any) -> bytes:
+    """Stable byte encoding of a value for hashing (sorted JSON, else pickle)."""
+    try:
+        return b"j" + json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    except (TypeError, ValueError):
+        return b"p" + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def cache_key(identity: Tuple[Any, ...], context: Any) -> str:
+    """Content address for a task identity and the context it runs with."""
+    digest = hashlib.sha256()
+    digest.update(canonical_bytes(list(identity)))
+    digest.update(b"\0")
+    digest.update(canonical_bytes(context))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Two-tier (memory LRU + disk) result cache with TTL and size-based eviction."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 256 * 1024 * 1024,
+                 directory: Optional[str] = None, max_disk_bytes: int = 1024 * 1024 * 1024,
+                 ttl: Optional[float] = None):
+        """Initialize cache; ttl is the default lifetime in seconds (None: no expiry)."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # key -> (expires_at, value, size), least recently used first
+        self._memory: "OrderedDict[str, Tuple[Optional[float], Any, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        # key -> file size, least recently used first
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load_disk_index()
+
+    # ===== LOOKUP =====
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a cached value (default on a miss or expired entry)."""
+        found = self._lookup(key)
+        return default if found is _MISSING else found
+
+    def lookup(self, key: str) -> Tuple[bool, Any]:
+        """Get (hit, value) for a key."""
+        found = self._lookup(key)
+        return (False, None) if found is _MISSING else (True, found)
+
+    def _lookup(self, key: str) -> Any:
+        now = time.time()
+        with self.lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._drop_memory(key)
+
+            if key in self._disk:
+                loaded = self._read_disk(key)
+                if loaded is not _MISSING:
+                    expires_at, value = loaded
+                    if expires_at is None or expires_at > now:
+                        self._disk.move_to_end(key)
+                        self._store_memory(key, value, expires_at, self._disk[key])
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return value
+                self._drop_disk(key)
+
+            self.misses += 1
+            return _MISSING
+
+    # ===== STORE =====
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Cache a value; ttl overrides the cache default for this entry."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        try:
+            data = pickle.dumps((expires_at, value), protocol=pickle.HIGHEST_PROTOCOL)
+            size = len(data)
+        except Exception:
+            data, size = None, sys.getsizeof(value)  # memory tier only
+        with self.lock:
+            self._store_memory(key, value, expires_at, size)
+            if self.directory and data is not None and size <= self.max_disk_bytes:
+                self._write_disk(key, data)
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self.lock:
+            for key in list(self._disk):
+                self._drop_disk(key)
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> dict:
+        """Get hit/miss counts and tier sizes."""
+        with self.lock:
+            return {
+                "hits": self.hits, "misses": self.misses, "disk_hits": self.disk_hits,
+                "memory_entries": len(self._memory), "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk), "disk_bytes": self._disk_bytes,
+            }
+
+    # ===== TIERS (call with the lock held) =====
+
+    def _store_memory(self, key: str, value: Any, expires_at: Optional[float], size: int) -> None:
+        if size > self.max_bytes:
+            return
+        self._drop_memory(key)
+        self._memory[key] = (expires_at, value, size)
+        self._memory_bytes += size
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            self._drop_memory(next(iter(self._memory)))
+
+    def _drop_memory(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[2]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".pkl")
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so a crash never leaves a truncated entry behind
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Result cache entry {key} not written to disk: {e}")
+            return
+        self._disk_bytes -= self._disk.pop(key, 0)
+        self._disk[key] = len(data)
+        self._disk_bytes += len(data)
+        while self._disk_bytes > self.max_disk_bytes:
+            self._drop_disk(next(iter(self._disk)))
+
+    def _read_disk(self, key: str) -> Any:
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return _MISSING
+
+    def _drop_disk(self, key: str) -> None:
+        self._disk_bytes -= self._disk.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _load_disk_index(self) -> None:
+        # Oldest modification first, so the LRU order survives a restart approximately
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.endswith(".tmp"):
+                    os.remove(path)  # left over from an interrupted write
+                elif name.endswith(".pkl"):
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        while self._disk_bytes > self.max_disk_bytes:
+            self._drop_disk(next(iter(self._disk)))
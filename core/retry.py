@@ -0,0 +1,143 @@
+"""
+Retry - per-task retry policies and the timer wheel that schedules delayed retries.
+
+A RetryPolicy decides whether a failed attempt is retried (attempt budget and an
+exception filter) and how long to back off: fixed, exponential (optionally with
+full jitter) or decorrelated jitter, capped at max_delay. Jitter spreads retries
+from many tasks that failed together (a rate-limited LLM provider) instead of
+having them all wake at once.
+
+The executors do not sleep through a backoff: the failed attempt returns its pool
+slot and the scheduler parks the task in a TimerWheel. When the delay expires the
+task goes back on the ready queue and waits for a free worker in priority order.
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, List, Optional, Tuple, Type
+
+
+class BackoffStrategy(str, Enum):
+    """How the delay grows between attempts."""
+    FIXED = "fixed"
+    EXPONENTIAL = "exponential"
+    DECORRELATED_JITTER = "decorrelated_jitter"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When and how soon a failed task is retried."""
+    max_retries: int = 0
+    backoff: BackoffStrategy = BackoffStrategy.EXPONENTIAL
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    multiplier: float = 2.0
+    jitter: bool = True
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+    retry_if: Optional[Callable[[BaseException], bool]] = None
+
+    def __post_init__(self):
+        object.__setattr__(self, "backoff", BackoffStrategy(self.backoff))
+        if self.max_retries < 0 or self.base_delay < 0 or self.max_delay < 0:
+            raise ValueError("max_retries, base_delay and max_delay must be >= 0")
+
+    @classmethod
+    def fixed(cls, retries: int, delay: float = 1.0) -> "RetryPolicy":
+        """Retry any exception up to `retries` times, `delay` seconds apart."""
+        return cls(max_retries=retries, backoff=BackoffStrategy.FIXED, base_delay=delay,
+                   max_delay=delay, jitter=False)
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """True if a failure on zero-based `attempt` gets another attempt."""
+        if attempt >= self.max_retries or not isinstance(error, self.retry_on):
+            return False
+        return self.retry_if is None or bool(self.retry_if(error))
+
+    def next_delay(self, attempt: int, previous_delay: Optional[float] = None,
+                   rng: Callable[[float, float], float] = random.uniform) -> float:
+        """Seconds to wait before retrying after zero-based `attempt` failed."""
+        if self.backoff == BackoffStrategy.FIXED:
+            delay = self.base_delay
+        elif self.backoff == BackoffStrategy.EXPONENTIAL:
+            delay = min(self.max_delay, self.base_delay * self.multiplier ** attempt)
+            if self.jitter:
+                delay = rng(0.0, delay)  # full jitter
+        else:
+            # Decorrelated jitter: grows from the previous delay, not the attempt number
+            previous = previous_delay if previous_delay is not None else self.base_delay
+            delay = rng(self.base_delay, max(self.base_delay, previous * 3))
+        return min(self.max_delay, delay)
+
+
+class TimerWheel:
+    """Hashed timing wheel: O(1) schedule and expiry for many pending timers.
+
+    Time is cut into ticks of `tick` seconds; a timer lands in slot
+    (due tick % slots) and fires once the wheel has advanced past its tick.
+    Timers further out than one revolution wait in their slot for later laps.
+    Not thread-safe: the scheduler loop that owns it schedules and expires.
+    """
+
+    def __init__(self, tick: float = 0.01, slots: int = 512,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize an empty wheel."""
+        self.tick = tick
+        self.slots: List[List[Tuple[int, Any]]] = [[] for _ in range(slots)]
+        self.clock = clock
+        self.current_tick = self._tick_of(clock())
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _tick_of(self, now: float) -> int:
+        return int(now / self.tick)
+
+    def schedule(self, delay: float, item: Any) -> None:
+        """Fire `item` after `delay` seconds (rounded up to the next tick)."""
+        due = max(self._tick_of(self.clock() + delay), self.current_tick) + 1
+        self.slots[due % len(self.slots)].append((due, item))
+        self.count += 1
+
+    def expire(self) -> List[Any]:
+        """Advance to the current time and return the items that came due, oldest first."""
+        now_tick = self._tick_of(self.clock())
+        if not self.count or now_tick <= self.current_tick:
+            self.current_tick = max(self.current_tick, now_tick)
+            return []
+
+        # Visit each elapsed tick's slot once; after a full lap every slot is covered
+        first = self.current_tick + 1
+        last = min(now_tick, self.current_tick + len(self.slots))
+        due: List[Tuple[int, Any]] = []
+        for t in range(first, last + 1):
+            slot = self.slots[t % len(self.slots)]
+            if slot:
+                keep = [entry for entry in slot if entry[0] > now_tick]
+                due.extend(entry for entry in slot if entry[0] <= now_tick)
+                slot[:] = keep
+        self.current_tick = now_tick
+        self.count -= len(due)
+        due.sort(key=lambda entry: entry[0])
+        return [item for _, item in due]
+
+    def next_timeout(self) -> Optional[float]:
+        """Seconds until the next timer may fire; None when the wheel is empty."""
+        if not self.count:
+            return None
+        for offset in range(1, len(self.slots) + 1):
+            t = self.current_tick + offset
+            if any(due == t for due, _ in self.slots[t % len(self.slots)]):
+                return max(0.0, t * self.tick - self.clock())
+        # Everything pending is more than a lap away: wake after one revolution
+        return max(0.0, (self.current_tick + len(self.slots)) * self.tick - self.clock())
+
+    def clear(self) -> List[Any]:
+        """Drop every pending timer and return their items."""
+        items = [item for slot in self.slots for _, item in slot]
+        for slot in self.slots:
+            slot.clear()
+        self.count = 0
+        return items
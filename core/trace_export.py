@@ -0,0 +1,239 @@
+"""
+Trace export - workflow runs as spans for trace viewers.
+
+A finished WorkflowExecution becomes one span for the run and, per task, a span
+from its first attempt to its end with children for the queue wait before it,
+each attempt and each retry backoff between attempts. Cache hits appear as
+zero-length task spans; tasks that never ran (skipped, cancelled before
+starting, restored from a checkpoint) have none.
+
+Two file formats, both stdlib-only:
+
+- Chrome trace-event JSON (chrome://tracing, Perfetto, speedscope): attempts
+  are packed onto as few "worker" rows as will hold them, waits and backoffs go
+  on "waiting" rows, and a "running tasks" counter charts utilization, so idle
+  workers and scheduler stalls show up as gaps.
+- OTLP JSON (the OpenTelemetry protobuf JSON mapping, as the collector's file
+  exporter writes it): one trace per execution, ready for an OTLP receiver or
+  `otel-cli`-style tooling.
+
+Queue waits need the task dependencies, so pass the WorkflowDefinition when it
+is at hand (the executor keeps it in `workflows`).
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Chrome trace process ids
+RUN_PID = 1
+WAIT_PID = 2
+
+
+@dataclass
+class Span:
+    """One timed interval of a workflow run (times in epoch seconds)."""
+    name: str
+    kind: str  # workflow, task, queue_wait, attempt, backoff
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    end: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def _span_id(*parts: Any) -> str:
+    return hashlib.sha256("\0".join(map(str, parts)).encode("utf-8")).hexdigest()[:16]
+
+
+def trace_id(execution) -> str:
+    """32-hex-digit trace id for an execution (its uuid, else a hash of its id)."""
+    compact = execution.execution_id.replace("-", "").lower()
+    if len(compact) == 32 and all(c in "0123456789abcdef" for c in compact):
+        return compact
+    return hashlib.sha256(execution.execution_id.encode("utf-8")).hexdigest()[:32]
+
+
+def execution_spans(execution, workflow=None) -> List[Span]:
+    """Spans for a finished execution, the workflow span first."""
+    run_end = execution.end_time or max(
+        (task.end_time for task in execution.tasks.values() if task.end_time), default=execution.start_time
+    )
+    root = Span(
+        name=execution.name or execution.workflow_id, kind="workflow",
+        span_id=_span_id(execution.execution_id), parent_id=None,
+        start=execution.start_time, end=run_end,
+        attributes={"workflow.id": execution.workflow_id, "execution.id": execution.execution_id,
+                    "workflow.status": getattr(execution.status, "value", execution.status)},
+        error="; ".join(execution.errors) or None,
+    )
+    spans = [root]
+
+    for task_id, task in execution.tasks.items():
+        if task.start_time is None or task.metadata.get("restored"):
+            continue
+        attempts = task.metadata.get("attempt_log", [])
+        end = max([task.end_time or task.start_time, *(a["end"] or 0.0 for a in attempts)])
+        task_def = workflow.tasks.get(task_id) if workflow else None
+        attributes = {"task.id": task_id, "task.status": getattr(task.status, "value", task.status),
+                      "task.attempts": task.attempts}
+        if task_def is not None and task_def.domain:
+            attributes["task.domain"] = task_def.domain
+        if task.metadata.get("cache_hit"):
+            attributes["task.cache_hit"] = True
+        task_span = Span(name=task_id, kind="task", span_id=_span_id(execution.execution_id, task_id),
+                         parent_id=root.span_id, start=task.start_time, end=end,
+                         attributes=attributes, error=task.error)
+        spans.append(task_span)
+
+        def child(kind: str, start: float, stop: float, number: int = 0, **extra) -> Span:
+            return Span(name=f"{task_id} {kind}", kind=kind,
+                        span_id=_span_id(execution.execution_id, task_id, kind, number),
+                        parent_id=task_span.span_id, start=start, end=stop,
+                        attributes={"task.id": task_id, **extra})
+
+        if task_def is not None:
+            ready = execution.ready_time(task_def.depends_on)
+            if ready is not None and ready < task.start_time:
+                spans.append(child("queue_wait", ready, task.start_time))
+        previous_end = None
+        for number, attempt in enumerate(attempts, 1):
+            if previous_end is not None and attempt["start"] > previous_end:
+                spans.append(child("backoff", previous_end, attempt["start"], number))
+            attempt_end = attempt["end"] or end
+            span = child("attempt", attempt["start"], attempt_end, number, **{"task.attempt": number})
+            span.name = f"{task_id} #{number}" if len(attempts) > 1 else task_id
+            span.error = attempt["error"]
+            spans.append(span)
+            previous_end = attempt_end
+    return spans
+
+
+# ===== CHROME TRACE =====
+
+def _pack(spans: List[Span]) -> Dict[str, int]:
+    """Assign spans to rows, greedily, so no two on a row overlap; span id -> row (from 1)."""
+    free_at: List[float] = []
+    rows = {}
+    for span in sorted(spans, key=lambda s: (s.start, s.end)):
+        for row, busy_until in enumerate(free_at):
+            if busy_until <= span.start:
+                break
+        else:
+            row = len(free_at)
+            free_at.append(0.0)
+        free_at[row] = span.end
+        rows[span.span_id] = row + 1
+    return rows
+
+
+def to_chrome_trace(spans: List[Span]) -> Dict[str, Any]:
+    """Chrome trace-event document for spans from execution_spans()."""
+    root = spans[0]
+    origin = root.start
+
+    def micros(t: float) -> float:
+        return round((t - origin) * 1e6, 3)
+
+    def complete(span: Span, pid: int, tid: int) -> Dict[str, Any]:
+        args = dict(span.attributes)
+        if span.error:
+            args["error"] = span.error
+        return {"name": span.name, "cat": span.kind, "ph": "X", "pid": pid, "tid": tid,
+                "ts": micros(span.start), "dur": micros(span.end) - micros(span.start), "args": args}
+
+    attempts = [s for s in spans if s.kind == "attempt"]
+    # Cache hits never occupied a worker; show them as instants on the run row
+    hits = [s for s in spans if s.kind == "task" and s.attributes.get("task.cache_hit")]
+    waits = [s for s in spans if s.kind in ("queue_wait", "backoff")]
+    attempt_rows, wait_rows = _pack(attempts), _pack(waits)
+
+    events: List[Dict[str, Any]] = [
+        {"name": "process_name", "ph": "M", "pid": RUN_PID, "args": {"name": f"{root.name} (run)"}},
+        {"name": "process_name", "ph": "M", "pid": WAIT_PID, "args": {"name": f"{root.name} (waiting)"}},
+        {"name": "thread_name", "ph": "M", "pid": RUN_PID, "tid": 0, "args": {"name": "workflow"}},
+    ]
+    for row in sorted(set(attempt_rows.values())):
+        events.append({"name": "thread_name", "ph": "M", "pid": RUN_PID, "tid": row, "args": {"name": f"worker {row}"}})
+    for row in sorted(set(wait_rows.values())):
+        events.append({"name": "thread_name", "ph": "M", "pid": WAIT_PID, "tid": row, "args": {"name": f"waiting {row}"}})
+
+    events.append(complete(root, RUN_PID, 0))
+    events.extend(complete(span, RUN_PID, attempt_rows[span.span_id]) for span in attempts)
+    events.extend(complete(span, WAIT_PID, wait_rows[span.span_id]) for span in waits)
+    events.extend({"name": span.name, "cat": "cache_hit", "ph": "i", "s": "t", "pid": RUN_PID, "tid": 0,
+                   "ts": micros(span.start), "args": dict(span.attributes)} for span in hits)
+
+    # Running-task count at every attempt boundary
+    changes = sorted([(s.start, 1) for s in attempts] + [(s.end, -1) for s in attempts])
+    running = 0
+    for t, delta in changes:
+        running += delta
+        events.append({"name": "running tasks", "ph": "C", "pid": RUN_PID, "ts": micros(t),
+                       "args": {"running": running}})
+    return {"traceEvents": events, "displayTimeUnit": "ms",
+            "otherData": {"execution_id": root.attributes.get("execution.id")}}
+
+
+def export_chrome_trace(execution, path: str, workflow=None) -> str:
+    """Write an execution as Chrome trace-event JSON; returns the path."""
+    return _write_json(path, to_chrome_trace(execution_spans(execution, workflow)))
+
+
+# ===== OTLP =====
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(spans: List[Span], trace: str, service_name: str = "simdecisions") -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest for spans from execution_spans()."""
+    otlp_spans = []
+    for span in spans:
+        attributes = dict(span.attributes)
+        if span.error:
+            attributes["error.message"] = span.error
+        otlp_span = {
+            "traceId": trace,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(int(span.start * 1e9)),
+            "endTimeUnixNano": str(int(span.end * 1e9)),
+            "attributes": _otlp_attributes({"span.kind": span.kind, **attributes}),
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            otlp_span["parentSpanId"] = span.parent_id
+        otlp_spans.append(otlp_span)
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+        "scopeSpans": [{"scope": {"name": __name__}, "spans": otlp_spans}],
+    }]}
+
+
+def export_otlp(execution, path: str, workflow=None, service_name: str = "simdecisions") -> str:
+    """Write an execution as an OTLP/JSON trace file; returns the path."""
+    return _write_json(path, to_otlp(execution_spans(execution, workflow), trace_id(execution), service_name))
+
+
+def _write_json(path: str, document: Dict[str, Any]) -> str:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, default=str)
+    return path
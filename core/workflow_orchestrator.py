@@ -11,13 +11,27 @@ from enum import Enum
 import uuid
 import time
 import threading
+import asyncio
+import inspect
 from datetime import datetime, timedelta
 import logging
 import json
-from collections import deque, defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-from ..runtime.ledger import EventLedger
+import queue
+import functools
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from ..runtime.ledger import EventLedger, utc_timestamp
+from .checkpoint import CheckpointStore
+from .cancellation import CancellationToken, TaskCancelledError, bind_token, call_with_timeout
+from .execution_backends import BACKENDS, ProcessBackend, SharedResult, release_shared, resolve_context
+from .monitoring import StreamingAggregator
+from .profiling import TaskProfiler
+from .result_cache import ResultCache, cache_key
+from .retry import RetryPolicy, TimerWheel
+from .scheduling import SCHEDULING_POLICIES, PriorityReadyQueue, critical_path_priorities
+from .trace_export import export_chrome_trace, export_otlp
+from .workflow_plan import ExecutionPlan, compile_plan
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +47,7 @@ class TaskStatus(str, Enum):
     FAILED = "failed"
     RETRYING = "retrying"
     SKIPPED = "skipped"
+    CANCELLED = "cancelled"
 
 
 class WorkflowStatus(str, Enum):
@@ -52,8 +67,48 @@ class BranchCondition(str, Enum):
     ALWAYS = "always"
 
 
+# Upstream task statuses that let each kind of edge through
+BRANCH_SATISFIED_BY = {
+    BranchCondition.IF_SUCCESS: {TaskStatus.SUCCESS},
+    BranchCondition.IF_FAILED: {TaskStatus.FAILED},
+    BranchCondition.IF_SKIPPED: {TaskStatus.SKIPPED},
+    BranchCondition.ALWAYS: {TaskStatus.SUCCESS, TaskStatus.FAILED, TaskStatus.SKIPPED},
+}
+
+# Statuses a task never leaves once set
+FINAL_TASK_STATUSES = {TaskStatus.SUCCESS, TaskStatus.FAILED, TaskStatus.SKIPPED, TaskStatus.CANCELLED}
+
+
 # ===== DATA STRUCTURES =====
 
+@dataclass(frozen=True)
+class MapSpec:
+    """How a map task fans out: one handler call per item of a dependency's result.
+
+    At most max_concurrency items are queued or running at a time. With reduce,
+    each item's result is folded in as it finishes (acc = reduce(acc, result),
+    starting from initial, in completion order); without it the task's result is
+    the list of item results in item order.
+    """
+    over: str
+    max_concurrency: int = 16
+    reduce: Optional[Callable[[Any, Any], Any]] = None
+    initial: Any = None
+
+
+def call_map_item(handler: Callable, item: Any, index: int, context: Dict[str, Any],
+                  token: Optional[CancellationToken] = None) -> Any:
+    """Call a map task's handler for one item, which joins the context as "item" and "index"."""
+    context = {**context, "item": item, "index": index}
+    return bind_token(handler, token)(context) if token is not None else handler(context)
+
+
+async def call_map_item_async(handler: Callable, item: Any, index: int, context: Dict[str, Any],
+                              token: Optional[CancellationToken] = None) -> Any:
+    """call_map_item for coroutine handlers."""
+    return await call_map_item(handler, item, index, context, token)
+
+
 @dataclass
 class TaskDefinition:
     """Definition of a single task in workflow."""
@@ -65,8 +120,35 @@ class TaskDefinition:
     retries: int = 0
     timeout: Optional[float] = None
     condition: Optional[Callable[[Dict[str, Any]], bool]] = None
+    branch_conditions: Dict[str, BranchCondition] = field(default_factory=dict)
+    backend: Optional[str] = None
+    retry_policy: Optional[RetryPolicy] = None
+    cache: bool = False
+    cache_version: str = "1"
+    cache_ttl: Optional[float] = None
+    priority: float = 0.0
+    estimated_duration: Optional[float] = None
+    map: Optional[MapSpec] = None
+    subworkflow: Optional["WorkflowDefinition"] = field(default=None, repr=False)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    def __post_init__(self):
+        # A bare retry count keeps the old behaviour: any exception, one second apart
+        if self.retry_policy is None:
+            self.retry_policy = RetryPolicy.fixed(self.retries)
+        else:
+            self.retries = self.retry_policy.max_retries
+
+    def branch_condition(self, dependency: str) -> BranchCondition:
+        """Get the condition on the edge from a dependency (IF_SUCCESS by default)."""
+        return self.branch_conditions.get(dependency, BranchCondition.IF_SUCCESS)
+
+    def cache_identity(self) -> Tuple[Any, ...]:
+        """What, besides its context, a cached result depends on."""
+        handler = self.handler
+        return (self.task_id, getattr(handler, "__module__", None),
+                getattr(handler, "__qualname__", type(handler).__qualname__), self.cache_version)
+
 
 @dataclass
 class TaskExecution:
@@ -90,6 +172,27 @@ class TaskExecution:
         return None
 
 
+@dataclass
+class SchedulerMetrics:
+    """Scheduler overhead for one workflow run."""
+    tasks_dispatched: int = 0
+    wall_time: float = 0.0
+    wait_time: float = 0.0
+    scheduler_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    @property
+    def dispatch_rate(self) -> float:
+        """Tasks dispatched per second of run time."""
+        return self.tasks_dispatched / self.wall_time if self.wall_time else 0.0
+
+    @property
+    def overhead(self) -> float:
+        """Fraction of the run spent inside the scheduler rather than waiting on tasks."""
+        return self.scheduler_time / self.wall_time if self.wall_time else 0.0
+
+
 @dataclass
 class WorkflowDefinition:
     """Complete workflow definition."""
@@ -99,6 +202,13 @@ class WorkflowDefinition:
     tasks: Dict[str, TaskDefinition] = field(default_factory=dict)
     start_task: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    plan: Optional[ExecutionPlan] = field(default=None, repr=False, compare=False)
+
+    def compile(self) -> ExecutionPlan:
+        """Get the compiled plan, compiling on first use (WorkflowValidationError if invalid)."""
+        if self.plan is None:
+            self.plan = compile_plan(self.tasks)
+        return self.plan
 
 
 @dataclass
@@ -113,7 +223,18 @@ class WorkflowExecution:
     end_time: Optional[float] = None
     outputs: Dict[str, Any] = field(default_factory=dict)
     errors: List[str] = field(default_factory=list)
+    # Added to every task's context (a subworkflow's parent task context)
+    inputs: Dict[str, Any] = field(default_factory=dict)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    scheduler: SchedulerMetrics = field(default_factory=SchedulerMetrics)
+    cancel_token: CancellationToken = field(default_factory=CancellationToken, repr=False)
+    # Child of cancel_token and parent of every attempt's token; fail-fast cancels it
+    abort_token: Optional[CancellationToken] = field(default=None, repr=False)
+
+    @property
+    def aborted(self) -> bool:
+        """True once fail-fast has stopped the run (and it was not cancelled outright)."""
+        return self.abort_token is not None and self.abort_token.cancelled and not self.cancel_token.cancelled
 
     @property
     def duration(self) -> Optional[float]:
@@ -122,6 +243,18 @@ class WorkflowExecution:
             return self.end_time - self.start_time
         return None
 
+    def ready_time(self, depends_on: List[str]) -> Optional[float]:
+        """When a task could start: once the run had started and its last dependency had finished."""
+        if self.start_time is None:
+            return None
+        return max([self.start_time, *(
+            self.tasks[dep].end_time or 0.0 for dep in depends_on if dep in self.tasks
+        )])
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Stop the run: nothing new starts and running tasks are cancelled (thread-safe)."""
+        self.cancel_token.cancel(reason)
+
     @property
     def is_complete(self) -> bool:
         """Check if workflow is complete."""
@@ -148,8 +281,22 @@ class WorkflowBuilder:
 
     def add_task(self, task_id: str, name: str, handler: Callable, domain: Optional[str] = None, depends_on: List[str] = None,
                  retries: int = 0, timeout: Optional[float] = None,
-                 condition: Optional[Callable] = None) -> "WorkflowBuilder":
-        """Add task to workflow."""
+                 condition: Optional[Callable] = None,
+                 branch_conditions: Optional[Dict[str, Any]] = None,
+                 backend: Optional[str] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 cache: bool = False, cache_version: str = "1",
+                 cache_ttl: Optional[float] = None, priority: float = 0.0,
+                 estimated_duration: Optional[float] = None) -> "WorkflowBuilder":
+        """Add task to workflow; branch_conditions maps dependency -> BranchCondition.
+
+        retry_policy, if given, replaces retries (see retry.RetryPolicy). cache opts
+        the task into the executor's result cache; bump cache_version when the
+        handler changes (see result_cache). priority and estimated_duration feed
+        critical-path scheduling (see scheduling).
+        """
+        if backend is not None and backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}")
         self.tasks[task_id] = TaskDefinition(
             task_id=task_id,
             name=name,
@@ -158,7 +305,15 @@ class WorkflowBuilder:
             depends_on=depends_on or [],
             retries=retries,
             timeout=timeout,
-            condition=condition
+            condition=condition,
+            branch_conditions={dep: BranchCondition(cond) for dep, cond in (branch_conditions or {}).items()},
+            backend=backend,
+            retry_policy=retry_policy,
+            cache=cache,
+            cache_version=cache_version,
+            cache_ttl=cache_ttl,
+            priority=priority,
+            estimated_duration=estimated_duration
         )
 
         if self.start_task is None:
@@ -166,241 +321,1235 @@ class WorkflowBuilder:
 
         return self
 
+    def add_map(self, task_id: str, name: str, handler: Callable, over: str,
+                max_concurrency: int = 16, reduce: Optional[Callable[[Any, Any], Any]] = None,
+                initial: Any = None, depends_on: List[str] = None, **options) -> "WorkflowBuilder":
+        """Add a map task: handler runs once per item of dependency `over`'s result.
+
+        Items are expanded at run time, each a task of its own ("<task_id>[<i>]")
+        with the map task's backend, timeout and retry policy, and the handler
+        sees the item and its index in its context. See MapSpec for
+        max_concurrency and reduce; options as for add_task.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        depends_on = list(depends_on or [])
+        if over not in depends_on:
+            depends_on.insert(0, over)
+        self.add_task(task_id, name, handler, depends_on=depends_on, **options)
+        self.tasks[task_id].map = MapSpec(over, max_concurrency, reduce, initial)
+        return self
+
+    def add_subworkflow(self, task_id: str, name: str, workflow: "WorkflowDefinition",
+                        depends_on: List[str] = None, **options) -> "WorkflowBuilder":
+        """Add a task that runs a whole workflow as a child execution.
+
+        The child's tasks get this task's context (its dependency results) added to
+        their own, and the task's result is the child's outputs. The child's plan is
+        compiled once and reused by every run. options as for add_task.
+        """
+        workflow.compile()
+        self.add_task(task_id, name, None, depends_on=depends_on, **options)
+        self.tasks[task_id].subworkflow = workflow
+        return self
+
     def set_start_task(self, task_id: str) -> "WorkflowBuilder":
         """Set starting task."""
         self.start_task = task_id
         return self
 
     def build(self) -> WorkflowDefinition:
-        """Build workflow."""
+        """Build workflow and compile its plan; raises WorkflowValidationError for a bad DAG."""
+        tasks = dict(self.tasks)  # later add_task calls must not change a compiled workflow
         return WorkflowDefinition(
             workflow_id=self.workflow_id,
             name=self.name,
             description=self.description,
-            tasks=self.tasks,
-            start_task=self.start_task
+            tasks=tasks,
+            start_task=self.start_task,
+            plan=compile_plan(tasks)
         )
 
 
 # ===== EXECUTION ENGINE =====
 
+class MapState:
+    """Progress of one expanded map task within a run."""
+
+    def __init__(self, task_def: TaskDefinition, items: Any):
+        self.task_def = task_def
+        self.spec = task_def.map
+        self.items = items  # iterator, consumed only as concurrency allows
+        self.next_index = 0
+        self.outstanding = 0
+        self.exhausted = False
+        self.error: Optional[str] = None
+        self.acc = self.spec.initial
+        self.results: Dict[int, Any] = {}
+
+    @property
+    def finished(self) -> bool:
+        return not self.outstanding and (self.exhausted or self.error is not None)
+
+    def add_result(self, index: int, result: Any) -> None:
+        if self.spec.reduce is None:
+            self.results[index] = result
+        else:
+            self.acc = self.spec.reduce(self.acc, result)
+
+    def result(self) -> Any:
+        if self.spec.reduce is None:
+            return [self.results[i] for i in range(self.next_index)]
+        return self.acc
+
+
+class TaskGraph:
+    """Dependency bookkeeping for one workflow run, shared by the executors."""
+
+    def __init__(self, workflow: WorkflowDefinition, execution: WorkflowExecution,
+                 priorities: Optional[Dict[str, Any]] = None):
+        """Set up per-run dependency counts and the initial ready queue from the compiled plan.
+
+        With priorities (task id -> sort key) ready tasks come out in priority order
+        rather than first in, first out.
+        """
+        # Map items are added per run, so the workflow's own dict stays untouched
+        self.task_defs = dict(workflow.tasks)
+        self.execution = execution
+        self.plan = workflow.compile()
+        self.downstream_map = self.plan.downstream_ids
+        self.dependency_count = dict(self.plan.in_degree)
+
+        # A task is pushed onto the ready queue once every incoming edge is satisfied, so
+        # each completion only touches its own downstream tasks and a run is
+        # O(tasks + edges).
+        self.ready = PriorityReadyQueue(priorities) if priorities is not None else deque()
+        # Ledger events for tasks the scheduler settles itself, written a batch (e.g. a
+        # whole cascade of skips) per scheduling pass
+        self.events: List[Dict[str, Any]] = []
+        # Expanded map tasks, and the map each materialized item belongs to
+        self.maps: Dict[str, MapState] = {}
+        self.map_items: Dict[str, Tuple[MapState, int]] = {}
+
+        # Tasks already in the execution were restored from a checkpoint: settle their
+        # edges up front so only the unfinished part of the DAG runs
+        self.ready.extend(task_id for task_id in self.plan.roots if task_id not in execution.tasks)
+        for task_id in list(execution.tasks):
+            self.resolve(task_id)
+
+    def start(self, task_id: str) -> TaskExecution:
+        """Create the execution record for a dispatched task."""
+        task_exec = TaskExecution(task_id=task_id, name=self.task_defs[task_id].name,
+                                  metadata=self._item_metadata(task_id))
+        self.execution.tasks[task_id] = task_exec
+        return task_exec
+
+    def _item_metadata(self, task_id: str) -> Dict[str, Any]:
+        """The map task and index of a map item; empty for other tasks."""
+        if task_id not in self.map_items:
+            return {}
+        state, index = self.map_items[task_id]
+        return {"map_task": state.task_def.task_id, "map_index": index}
+
+    def resolve(self, task_id: str) -> None:
+        """Settle the edges out of a finished task.
+
+        A downstream task whose edge condition does not hold is skipped, and the skip
+        cascades (worklist, not recursion) to its own descendants in the same pass.
+        """
+        tasks = self.execution.tasks
+        pending = [task_id]
+        while pending:
+            upstream = pending.pop()
+            status = tasks[upstream].status
+            for downstream_task_id in self.downstream_map[upstream]:
+                if downstream_task_id in tasks:
+                    continue  # already skipped through another edge
+                task_def = self.task_defs[downstream_task_id]
+                condition = task_def.branch_condition(upstream)
+                if status in BRANCH_SATISFIED_BY[condition]:
+                    self.dependency_count[downstream_task_id] -= 1
+                    if self.dependency_count[downstream_task_id] == 0:
+                        self.ready.append(downstream_task_id)
+                    continue
+                self.skip(task_def, {"upstream": upstream, "upstream_status": status.value,
+                                     "branch_condition": condition.value})
+                pending.append(downstream_task_id)
+
+    def expand(self, task_def: TaskDefinition, items: Any) -> MapState:
+        """Start a map task over items, queueing its first max_concurrency item tasks."""
+        state = self.maps[task_def.task_id] = MapState(task_def, iter(items))
+        self._queue_items(state)
+        return state
+
+    def _queue_items(self, state: MapState) -> None:
+        # Materialize item tasks lazily, only as far as the concurrency cap allows
+        task_def = state.task_def
+        while state.error is None and not state.exhausted and state.outstanding < state.spec.max_concurrency:
+            try:
+                item = next(state.items)
+            except StopIteration:
+                state.exhausted = True
+                break
+            except Exception as e:
+                state.error = f"map items failed: {e}"
+                break
+            index = state.next_index
+            state.next_index += 1
+            state.outstanding += 1
+            item_id = f"{task_def.task_id}[{index}]"
+            call = call_map_item_async if inspect.iscoroutinefunction(task_def.handler) else call_map_item
+            self.task_defs[item_id] = TaskDefinition(
+                task_id=item_id, name=f"{task_def.name}[{index}]",
+                handler=functools.partial(call, task_def.handler, item, index),
+                domain=task_def.domain, depends_on=task_def.depends_on, timeout=task_def.timeout,
+                backend=task_def.backend, retry_policy=task_def.retry_policy, priority=task_def.priority,
+            )
+            self.map_items[item_id] = (state, index)
+            if isinstance(self.ready, PriorityReadyQueue):
+                self.ready.priorities[item_id] = self.ready.priorities[task_def.task_id]
+            self.ready.append(item_id)
+
+    def finish_item(self, item_id: str) -> MapState:
+        """Fold a finished item into its map and queue the next; the map is done once state.finished."""
+        state, index = self.map_items.pop(item_id)
+        state.outstanding -= 1
+        item = self.execution.tasks[item_id]
+        if state.error is None:
+            if item.status == TaskStatus.SUCCESS:
+                try:
+                    state.add_result(index, resolve_context({"result": item.result})["result"])
+                except Exception as e:
+                    state.error = f"map reduce failed: {e}"
+            else:
+                state.error = f"{item_id} {item.status.value}: {item.error}"
+        self._queue_items(state)
+        return state
+
+    def skip(self, task_def: TaskDefinition, reason: Dict[str, Any]) -> None:
+        """Mark a task SKIPPED without running it."""
+        now = time.time()
+        self.execution.tasks[task_def.task_id] = TaskExecution(
+            task_id=task_def.task_id, name=task_def.name, status=TaskStatus.SKIPPED,
+            start_time=now, end_time=now, metadata={"skip_reason": reason, **self._item_metadata(task_def.task_id)}
+        )
+        self.add_event("task_skipped", task_def, reason)
+
+    def cancel(self, task_def: TaskDefinition, reason: str) -> None:
+        """Mark a task CANCELLED without running it."""
+        now = time.time()
+        self.execution.tasks[task_def.task_id] = TaskExecution(
+            task_id=task_def.task_id, name=task_def.name, status=TaskStatus.CANCELLED,
+            start_time=now, end_time=now, metadata={"cancel_reason": reason, **self._item_metadata(task_def.task_id)}
+        )
+        self.add_event("task_cancelled", task_def, {"reason": reason})
+
+    def add_event(self, event_type: str, task_def: TaskDefinition, payload: Dict[str, Any]) -> None:
+        """Queue a task event for the next batch, timestamped now."""
+        self.events.append({
+            "timestamp": utc_timestamp(),
+            "event_type": event_type,
+            "actor": "system:workflow_executor",
+            "target": task_def.task_id,
+            "domain": task_def.domain,
+            "payload_json": payload,
+        })
+
+    def skip_remaining(self, reason: Dict[str, Any]) -> None:
+        """Skip every task that was never dispatched, and maps cut off mid-way."""
+        self.ready.clear()
+        for task_id, task_def in self.task_defs.items():
+            if task_id not in self.execution.tasks or self._unfinished_map(task_id):
+                self.skip(task_def, reason)
+
+    def cancel_remaining(self, reason: str) -> None:
+        """Cancel every task that was never dispatched, and maps cut off mid-way."""
+        self.ready.clear()
+        for task_id, task_def in self.task_defs.items():
+            if task_id not in self.execution.tasks or self._unfinished_map(task_id):
+                self.cancel(task_def, reason)
+
+    def _unfinished_map(self, task_id: str) -> bool:
+        return task_id in self.maps and self.execution.tasks[task_id].status not in FINAL_TASK_STATUSES
+
+
 class WorkflowExecutor:
     """Execute workflows with state management."""
 
-    def __init__(self, max_workers: int = 4, ledger: Optional[EventLedger] = None):
-        """Initialize executor."""
+    def __init__(self, max_workers: int = 4, ledger: Optional[EventLedger] = None,
+                 fail_fast: bool = False, default_backend: str = "thread",
+                 domain_backends: Optional[Dict[str, str]] = None,
+                 process_workers: Optional[int] = None, share_threshold: int = 1024 * 1024,
+                 checkpoints: Optional[CheckpointStore] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 scheduling: str = "critical_path", monitor: Optional["WorkflowMonitor"] = None,
+                 domain_weights: Optional[Dict[str, float]] = None,
+                 profiler: Optional[TaskProfiler] = None):
+        """Initialize executor; fail_fast stops a workflow at its first failed task.
+
+        Handlers run on the backend named by the task, else by domain_backends for
+        its domain, else default_backend (see execution_backends). With a
+        CheckpointStore every finished task is checkpointed and resume() can pick a
+        run back up after a restart. Tasks added with cache=True are memoized in
+        result_cache, if given.
+
+        When more tasks are ready than workers, scheduling picks who goes first
+        (see scheduling); "critical_path" uses task durations from monitor, which
+        also records every finished execution. A profiler measures every task's CPU,
+        memory and timing into its metadata["profile"] (see profiling).
+        """
+        for backend in [default_backend, *(domain_backends or {}).values()]:
+            if backend not in BACKENDS:
+                raise ValueError(f"backend must be one of {BACKENDS}")
+        if scheduling not in SCHEDULING_POLICIES:
+            raise ValueError(f"scheduling must be one of {SCHEDULING_POLICIES}")
         self.max_workers = max_workers
+        self.fail_fast = fail_fast
+        self.default_backend = default_backend
+        self.domain_backends = dict(domain_backends or {})
+        self.process_backend = ProcessBackend(max_workers=process_workers, share_threshold=share_threshold)
         self.lock = threading.RLock()
         self.executions: Dict[str, WorkflowExecution] = {}
+        self.workflows: Dict[str, WorkflowDefinition] = {}
         self.ledger = ledger
+        self.checkpoints = checkpoints
+        self.result_cache = result_cache
+        self.scheduling = scheduling
+        self.monitor = monitor
+        self.domain_weights = dict(domain_weights or {})
+        self.profiler = profiler
+
+    def shutdown(self) -> None:
+        """Stop the idle process-backend workers; subclasses stop their own resources too."""
+        self.process_backend.shutdown()
+
+    def cancel(self, execution_id: str, reason: str = "cancelled") -> bool:
+        """Cancel a running execution by id; False if it is unknown or already complete."""
+        with self.lock:
+            execution = self.executions.get(execution_id)
+        if execution is None or execution.is_complete:
+            return False
+        execution.cancel(reason)
+        return True
+
+    def export_trace(self, execution_id: str, path: str, format: str = "chrome") -> str:
+        """Write an execution's spans as a Chrome trace ("chrome") or OTLP/JSON ("otlp") file (see trace_export)."""
+        with self.lock:
+            execution = self.executions[execution_id]
+            workflow = self.workflows.get(execution.workflow_id)
+        if format == "chrome":
+            return export_chrome_trace(execution, path, workflow)
+        if format == "otlp":
+            return export_otlp(execution, path, workflow)
+        raise ValueError('format must be "chrome" or "otlp"')
+
+    def _backend_for(self, task_def: TaskDefinition) -> str:
+        """Get the backend a task's handler runs on."""
+        return task_def.backend or self.domain_backends.get(task_def.domain, self.default_backend)
 
     def execute(self, workflow: WorkflowDefinition) -> WorkflowExecution:
         """Execute workflow."""
+        return self._run_execution(workflow, self._start_execution(workflow))
+
+    def resume(self, execution_id: str, workflow: Optional[WorkflowDefinition] = None) -> WorkflowExecution:
+        """Continue a checkpointed execution, re-running only its unfinished tasks.
+
+        Tasks that succeeded keep their checkpointed results; everything else
+        (failed, skipped, cancelled or never finished) runs again. The workflow
+        definition defaults to the one this executor last ran under that
+        workflow_id; after a restart pass it in, since handlers are not stored.
+        """
+        if self.checkpoints is None:
+            raise ValueError("resume() needs an executor with a CheckpointStore")
+        checkpoint = self.checkpoints.load(execution_id)
+        if checkpoint is None:
+            raise KeyError(f"No checkpoint for execution {execution_id}")
+        workflow = workflow or self.workflows.get(checkpoint["workflow_id"])
+        if workflow is None:
+            raise ValueError(f"Workflow {checkpoint['workflow_id']} is not registered; pass workflow=")
+
+        restored = {}
+        for task_id, saved in checkpoint["tasks"].items():
+            if task_id not in workflow.tasks or saved["status"] != TaskStatus.SUCCESS.value:
+                continue
+            restored[task_id] = TaskExecution(
+                task_id=task_id, name=workflow.tasks[task_id].name, status=TaskStatus.SUCCESS,
+                result=saved["result"], start_time=saved["start_time"], end_time=saved["end_time"],
+                attempts=saved["attempts"], metadata={**saved["metadata"], "restored": True}
+            )
+
+        execution = self._start_execution(workflow, execution_id=execution_id, restored=restored)
+        return self._run_execution(workflow, execution)
+
+    def _run_execution(self, workflow: WorkflowDefinition, execution: WorkflowExecution) -> WorkflowExecution:
+        """Run a started execution to completion."""
+        try:
+            self._execute_tasks(workflow, execution)
+        except Exception as e:
+            self._finish_execution(execution, e)
+        else:
+            self._finish_execution(execution)
+        return execution
+
+    def _start_execution(self, workflow: WorkflowDefinition, execution_id: Optional[str] = None,
+                         restored: Optional[Dict[str, TaskExecution]] = None,
+                         parent: Optional[WorkflowExecution] = None, inputs: Optional[Dict[str, Any]] = None,
+                         cancel_token: Optional[CancellationToken] = None) -> WorkflowExecution:
+        """Register a new (or resumed, or child) execution and record workflow_started (or workflow_resumed)."""
         execution = WorkflowExecution(
             workflow_id=workflow.workflow_id,
-            execution_id=str(uuid.uuid4()),
-            name=workflow.name
+            execution_id=execution_id or str(uuid.uuid4()),
+            name=workflow.name,
+            inputs=dict(inputs or {}),
+            cancel_token=cancel_token or CancellationToken()
         )
+        execution.abort_token = CancellationToken(parent=execution.cancel_token)
+        if parent is not None:
+            execution.metadata["parent_execution_id"] = parent.execution_id
+        for task_id, task_exec in (restored or {}).items():
+            execution.tasks[task_id] = task_exec
+            execution.outputs[task_id] = task_exec.result
 
         if self.ledger:
-            self.ledger.record_event(
-                event_type="workflow_started",
+            payload = {"workflow_name": workflow.name, "workflow_id": workflow.workflow_id}
+            if execution_id is not None:
+                payload["restored_tasks"] = len(execution.tasks)
+            if parent is not None:
+                payload["parent_execution_id"] = parent.execution_id
+            self._record_event(
+                event_type="workflow_resumed" if execution_id is not None else "workflow_started",
                 actor="system:workflow_executor",
                 target=execution.execution_id,
                 domain="system",
-                payload_json={"workflow_name": workflow.name, "workflow_id": workflow.workflow_id}
+                payload_json=payload
             )
 
         with self.lock:
             self.executions[execution.execution_id] = execution
+            self.workflows[workflow.workflow_id] = workflow
 
         execution.start_time = time.time()
         execution.status = WorkflowStatus.RUNNING
+        if self.profiler:
+            self.profiler.begin_run(execution.execution_id, workflow.name)
+        self._checkpoint_execution(execution)
+        return execution
 
-        try:
-            self._execute_tasks(workflow, execution)
+    def _cache_summary(self, execution: WorkflowExecution) -> Dict[str, Any]:
+        """Result cache hit/miss counts for the workflow's final event, if it used the cache."""
+        metrics = execution.scheduler
+        if not metrics.cache_hits and not metrics.cache_misses:
+            return {}
+        return {"cache": {"hits": metrics.cache_hits, "misses": metrics.cache_misses}}
+
+    def _profile_summary(self, execution: WorkflowExecution) -> Dict[str, Any]:
+        """Flame graph path for the workflow's final event, if one was written."""
+        flamegraph = execution.metadata.get("flamegraph")
+        return {"flamegraph": flamegraph} if flamegraph else {}
+
+    def _checkpoint_execution(self, execution: WorkflowExecution) -> None:
+        """Save the execution's status, if checkpointing."""
+        if self.checkpoints:
+            self.checkpoints.save_execution(
+                execution.execution_id, execution.workflow_id, execution.name, execution.status.value,
+                execution.start_time, execution.end_time, execution.errors
+            )
 
-            if any(t.status == TaskStatus.FAILED for t in execution.tasks.values()):
-                execution.status = WorkflowStatus.FAILED
-                if self.ledger:
-                    self.ledger.record_event(
-                        event_type="workflow_failed",
-                        actor="system:workflow_executor",
-                        target=execution.execution_id,
-                        domain="system",
-                        payload_json={"errors": execution.errors}
-                    )
-            else:
-                execution.status = WorkflowStatus.SUCCESS
-                if self.ledger:
-                    self.ledger.record_event(
-                        event_type="workflow_succeeded",
-                        actor="system:workflow_executor",
-                        target=execution.execution_id,
-                        domain="system"
-                    )
+    def _checkpoint_task(self, execution: WorkflowExecution, task_exec: TaskExecution) -> None:
+        """Queue a finished task's checkpoint, if checkpointing."""
+        if self.checkpoints:
+            result = task_exec.result
+            if isinstance(result, SharedResult):
+                result = result.load()
+            self.checkpoints.save_task(
+                execution.execution_id, task_exec.task_id, task_exec.status.value, result,
+                error=task_exec.error, attempts=task_exec.attempts, start_time=task_exec.start_time,
+                end_time=task_exec.end_time, metadata=task_exec.metadata
+            )
 
-        except Exception as e:
+    def _finish_execution(self, execution: WorkflowExecution, error: Optional[Exception] = None) -> None:
+        """Set the final workflow status and record it."""
+        if self.profiler:
+            flamegraph = self.profiler.end_run(execution.execution_id)
+            if flamegraph:
+                execution.metadata["flamegraph"] = flamegraph
+
+        if error is not None:
             execution.status = WorkflowStatus.FAILED
-            execution.errors.append(str(e))
+            execution.errors.append(str(error))
             if self.ledger:
-                self.ledger.record_event(
+                self._record_event(
                     event_type="workflow_failed",
                     actor="system:workflow_executor",
                     target=execution.execution_id,
                     domain="system",
-                    payload_json={"error": str(e)}
+                    payload_json={"error": str(error)}
+                )
+        elif execution.cancel_token.cancelled:
+            execution.status = WorkflowStatus.CANCELLED
+            if self.ledger:
+                self._record_event(
+                    event_type="workflow_cancelled",
+                    actor="system:workflow_executor",
+                    target=execution.execution_id,
+                    domain="system",
+                    payload_json={"reason": execution.cancel_token.reason}
+                )
+        elif any(t.status == TaskStatus.FAILED for t in execution.tasks.values()):
+            execution.status = WorkflowStatus.FAILED
+            if self.ledger:
+                self._record_event(
+                    event_type="workflow_failed",
+                    actor="system:workflow_executor",
+                    target=execution.execution_id,
+                    domain="system",
+                    payload_json={"errors": execution.errors, **self._cache_summary(execution),
+                                  **self._profile_summary(execution)}
+                )
+        else:
+            execution.status = WorkflowStatus.SUCCESS
+            if self.ledger:
+                self._record_event(
+                    event_type="workflow_succeeded",
+                    actor="system:workflow_executor",
+                    target=execution.execution_id,
+                    domain="system",
+                    payload_json={**self._cache_summary(execution), **self._profile_summary(execution)} or None
                 )
 
         execution.end_time = time.time()
-        return execution
+        self._checkpoint_execution(execution)
+        if self.monitor:
+            self.monitor.record_execution(execution)
 
     def _execute_tasks(self, workflow: WorkflowDefinition, execution: WorkflowExecution) -> None:
         """Execute tasks with dependency ordering."""
-        from concurrent.futures import wait, FIRST_COMPLETED
-
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {}
-            task_defs = workflow.tasks
-
-            # Build dependency graph
-            downstream_map = {task_id: [] for task_id in task_defs}
-            dependency_count = {task_id: len(task_def.depends_on) for task_id, task_def in task_defs.items()}
-            for task_id, task_def in task_defs.items():
-                for dep in task_def.depends_on:
-                    downstream_map[dep].append(task_id)
-
-            submitted_tasks = set()
-
-            while len(execution.tasks) < len(task_defs):
-                # Find and submit ready tasks
-                ready_to_submit = False
-                for task_id, count in dependency_count.items():
-                    if count == 0 and task_id not in submitted_tasks:
-                        task_def = task_defs[task_id]
-                        task_exec = TaskExecution(task_id=task_id, name=task_def.name)
-                        execution.tasks[task_id] = task_exec
-                        future = executor.submit(self._execute_task, task_def, task_exec, execution)
-                        futures[future] = task_id
-                        submitted_tasks.add(task_id)
-                        ready_to_submit = True
-                
-                # If no tasks are ready and none are running, there might be a cycle or failure
-                if not ready_to_submit and not futures:
-                    break
+        metrics = execution.scheduler
+        started = time.perf_counter()
+        graph = self._task_graph(workflow, execution)
+
+        # Finished tasks report through a queue rather than wait() over every future;
+        # cancelling the execution wakes the scheduler with a None
+        completed = queue.Queue()
+        in_flight = {}
+        # Tasks backing off before a retry wait here, not in a worker; once due they
+        # queue for a worker in the ready queue like any ready task
+        retries = TimerWheel()
+        retrying: Set[str] = set()
+        cancel_token = execution.cancel_token
+        wake = functools.partial(completed.put, None)
+        cancel_token.add_callback(wake)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        def dispatch(task_id: str, task_exec: TaskExecution) -> None:
+            task_def = graph.task_defs[task_id]
+            if self._backend_for(task_def) == "inline":
+                # Runs right here on the scheduler thread
+                future = Future()
+                future.set_running_or_notify_cancel()
+                try:
+                    future.set_result(self._execute_task(task_def, task_exec, execution))
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                future = executor.submit(self._execute_task, task_def, task_exec, execution)
+            future.add_done_callback(lambda f: completed.put((task_id, f)))
+            in_flight[task_id] = future
+            metrics.tasks_dispatched += 1
 
-                # Wait for at least one task to complete
-                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        try:
+            aborted = False
+            while not cancel_token.cancelled:
+                # Ready tasks wait in the ready queue, not the pool's, so the next free
+                # worker always goes to the highest-priority task
+                while graph.ready and len(in_flight) < self.max_workers and not cancel_token.cancelled:
+                    task_exec = self._next_ready(graph, retrying)
+                    if task_exec is not None:
+                        dispatch(task_exec.task_id, task_exec)
+
+                # Nothing ready, running or backing off: every reachable task is settled
+                if not in_flight and not retries:
+                    break
 
-                for future in done:
-                    completed_task_id = futures.pop(future)
-                    
+                # Wait for at least one task to complete (or a retry to come due), then
+                # take whatever else finished
+                waited = time.perf_counter()
+                try:
+                    done = [completed.get(timeout=retries.next_timeout())]
+                except queue.Empty:
+                    done = []
+                metrics.wait_time += time.perf_counter() - waited
+                while True:
+                    try:
+                        done.append(completed.get_nowait())
+                    except queue.Empty:
+                        break
+
+                for item in done:
+                    if item is None or cancel_token.cancelled:
+                        continue
+                    completed_task_id, future = item
+                    del in_flight[completed_task_id]
+                    if future.cancelled():
+                        graph.skip(graph.task_defs[completed_task_id], {"fail_fast": True})
+                        continue
                     try:
-                        future.result()
+                        retry_delay = future.result()
                     except Exception as e:
                         logger.error(f"Task {completed_task_id} failed with exception: {e}")
+                        retry_delay = None
+                    if retry_delay is not None:
+                        retries.schedule(retry_delay, completed_task_id)
+                        continue
+
+                    if self._should_abort(execution.tasks[completed_task_id], aborted):
+                        # Stop dispatching and drop queued siblings; running and
+                        # backing-off ones are cancelled through their tokens
+                        aborted = True
+                        self._abort(execution)
+                        self._drop_ready(graph, retrying)
+                        for sibling in in_flight.values():
+                            sibling.cancel()
+                    if not aborted:
+                        self._resolve(graph, completed_task_id)
+                # Skips cascaded by this pass's completions go out now, not at the end
+                self._record_graph_events(graph)
+
+                for task_id in retries.expire():
+                    retrying.add(task_id)
+                    graph.ready.append(task_id)
+
+            if cancel_token.cancelled:
+                for future in in_flight.values():
+                    future.cancel()
+                self._cancel_in_flight(graph, [*in_flight, *retries.clear(), *retrying])
+            elif aborted:
+                graph.skip_remaining({"fail_fast": True})
+        finally:
+            cancel_token.remove_callback(wake)
+            # A cancelled run returns at once; handlers that ignore their token finish detached
+            executor.shutdown(wait=not cancel_token.cancelled, cancel_futures=True)
+            # Free shared-memory blocks on every way out, not only a clean finish
+            self._release_shared_results(execution)
+            # Skips and cancellations settled on the way out, or before a failure
+            self._record_graph_events(graph)
+
+        metrics.wall_time = time.perf_counter() - started
+        metrics.scheduler_time = metrics.wall_time - metrics.wait_time
+
+    def _cancel_in_flight(self, graph: TaskGraph, in_flight: List[str]) -> None:
+        """Settle dispatched but unfinished tasks, then undispatched ones, as CANCELLED."""
+        reason = graph.execution.cancel_token.reason
+        for task_id in in_flight:
+            task_exec = graph.execution.tasks[task_id]
+            if self._settle(graph.execution, task_exec, TaskStatus.CANCELLED):
+                task_exec.metadata["cancel_reason"] = reason
+                task_exec.end_time = time.time()
+                graph.add_event("task_cancelled", graph.task_defs[task_id], {"reason": reason})
+        graph.cancel_remaining(reason)
+
+    def _task_graph(self, workflow: WorkflowDefinition, execution: WorkflowExecution) -> TaskGraph:
+        """Set up a run's TaskGraph with the executor's scheduling policy."""
+        if self.scheduling == "fifo":
+            return TaskGraph(workflow, execution)
+        durations = self.monitor.get_average_task_durations() if self.monitor else {}
+        priorities = critical_path_priorities(workflow.compile(), workflow.tasks, durations, self.domain_weights)
+        return TaskGraph(workflow, execution, priorities)
+
+    def _start_ready(self, graph: TaskGraph, task_id: str) -> Optional[TaskExecution]:
+        """Start a task off the ready queue; None if it completed or expanded without dispatch."""
+        task_exec = graph.start(task_id)
+        task_def = graph.task_defs[task_id]
+        if self._cache_hit(graph, task_exec):
+            graph.resolve(task_id)
+        elif task_def.map is not None:
+            self._expand_map(graph, task_def, task_exec)
+        else:
+            return task_exec
+        return None
 
-                    task_exec = execution.tasks[completed_task_id]
-                    if task_exec.status == TaskStatus.SUCCESS:
-                        for downstream_task_id in downstream_map[completed_task_id]:
-                            dependency_count[downstream_task_id] -= 1
-                    elif task_exec.status == TaskStatus.FAILED:
-                        # If a task fails, we should not execute its downstream tasks.
-                        # We can mark them as skipped.
-                        # This part can be enhanced later. For now, we just don't decrement the count.
-                        pass
-
-    def _execute_task(self, task_def: TaskDefinition, task_exec: TaskExecution,
-                      execution: WorkflowExecution) -> None:
-        """Execute single task with retry logic."""
+    def _next_ready(self, graph: TaskGraph, retrying: Set[str]) -> Optional[TaskExecution]:
+        """Take the next task off the ready queue; None if it needs no worker.
+
+        A retry whose backoff expired queues here too, already started.
+        """
+        task_id = graph.ready.popleft()
+        if task_id in retrying:
+            retrying.discard(task_id)
+            return graph.execution.tasks[task_id]
+        return self._start_ready(graph, task_id)
+
+    def _drop_ready(self, graph: TaskGraph, retrying: Set[str]) -> None:
+        """Empty the ready queue for fail-fast, settling queued retries as CANCELLED."""
+        graph.ready.clear()
+        for task_id in retrying:
+            self._cancel_aborted(graph.task_defs[task_id], graph.execution.tasks[task_id], graph.execution)
+        retrying.clear()
+
+    def _resolve(self, graph: TaskGraph, task_id: str) -> None:
+        """Settle a finished task's edges; a map item reports to its map task instead."""
+        if task_id not in graph.map_items:
+            graph.resolve(task_id)
+            return
+        state = graph.finish_item(task_id)
+        if state.finished:
+            self._finish_map(graph, state)
+
+    def _expand_map(self, graph: TaskGraph, task_def: TaskDefinition, task_exec: TaskExecution) -> None:
+        """Fan a map task out over its `over` dependency's result."""
+        execution = graph.execution
+        if not self._begin_attempt(task_def, task_exec, execution):
+            return
+        task_exec.attempts += 1
+        if self._condition_skips(task_def, task_exec, execution):
+            graph.resolve(task_def.task_id)
+            return
+        items = resolve_context({"items": execution.tasks[task_def.map.over].result})["items"]
+        try:
+            state = graph.expand(task_def, items)
+        except TypeError as e:
+            state = MapState(task_def, iter(()))
+            state.error = f"map over {task_def.map.over} needs an iterable result: {e}"
+        if state.finished:
+            self._finish_map(graph, state)
+
+    def _finish_map(self, graph: TaskGraph, state: MapState) -> None:
+        """Complete a map task once all its items are done, then settle its edges."""
+        task_def = state.task_def
+        task_exec = graph.execution.tasks[task_def.task_id]
+        task_exec.metadata["map_items"] = state.next_index
+        if state.error is None:
+            self._task_succeeded(task_def, task_exec, graph.execution, state.result())
+        else:
+            # Items retry individually, so the map task itself never does
+            self._attempt_failed(task_def, task_exec, graph.execution, task_def.retry_policy.max_retries,
+                                 RuntimeError(state.error))
+        graph.resolve(task_def.task_id)
+
+    def _cache_hit(self, graph: TaskGraph, task_exec: TaskExecution) -> bool:
+        """Complete a cached task from the result cache, without dispatching it.
+
+        On a miss the key is kept in the task's metadata so its result is stored
+        once it succeeds.
+        """
+        task_def = graph.task_defs[task_exec.task_id]
+        execution = graph.execution
+        if not (task_def.cache and self.result_cache):
+            return False
+        if task_def.condition and not task_def.condition(execution.outputs):
+            return False  # let the task skip as usual
+        # Keyed on exactly what the handler would receive, run inputs included
+        context = self._task_context(task_def, execution, "thread")
+        try:
+            key = cache_key(task_def.cache_identity(), context)
+        except Exception as e:
+            logger.warning(f"Task {task_def.task_id} context is not hashable, not cached: {e}")
+            return False
+
+        hit, result = self.result_cache.lookup(key)
+        if not hit:
+            execution.scheduler.cache_misses += 1
+            task_exec.metadata["cache_key"] = key
+            return False
+
+        execution.scheduler.cache_hits += 1
+        now = time.time()
+        task_exec.status = TaskStatus.SUCCESS
+        task_exec.result = result
+        task_exec.start_time = task_exec.end_time = now
+        task_exec.metadata.update(cache_hit=True, cache_key=key)
+        execution.outputs[task_def.task_id] = result
+        graph.add_event("task_cache_hit", task_def, {"cache_key": key})
+        self._checkpoint_task(execution, task_exec)
+        return True
+
+    def _release_shared_results(self, execution: WorkflowExecution) -> None:
+        """Swap shared-memory result handles for their values and free the blocks."""
+        shared = [task for task in execution.tasks.values() if isinstance(task.result, SharedResult)]
+        for task, value in zip(shared, release_shared([task.result for task in shared])):
+            task.result = value
+            execution.outputs[task.task_id] = value
+
+    def _task_context(self, task_def: TaskDefinition, execution: WorkflowExecution,
+                      backend: str) -> Dict[str, Any]:
+        """Get dependencies outputs; process handlers load shared results themselves."""
+        context = {**execution.inputs, **{dep: execution.tasks[dep].result for dep in task_def.depends_on}}
+        return context if backend == "process" else resolve_context(context)
+
+    def _should_abort(self, task_exec: TaskExecution, aborted: bool) -> bool:
+        """True when fail-fast should stop the run after this task."""
+        return self.fail_fast and not aborted and task_exec.status == TaskStatus.FAILED
+
+    def _abort(self, execution: WorkflowExecution) -> None:
+        """Signal fail-fast to the run's running and backing-off attempts."""
+        if execution.abort_token is not None:
+            execution.abort_token.cancel("fail_fast")
+
+    def _cancel_aborted(self, task_def: TaskDefinition, task_exec: TaskExecution,
+                        execution: WorkflowExecution) -> None:
+        """Settle a task stopped by fail-fast as CANCELLED."""
+        if self._settle(execution, task_exec, TaskStatus.CANCELLED):
+            self._record_task_event("task_cancelled", task_def, {"reason": "fail_fast"})
+            task_exec.metadata["cancel_reason"] = "fail_fast"
+            task_exec.end_time = time.time()
+
+    def _record_graph_events(self, graph: TaskGraph) -> None:
+        """Write the task_skipped/task_cancelled events queued since the last call in one batch."""
+        events, graph.events = graph.events, []
+        if events and self.ledger:
+            self.ledger.record_events(events)
+
+    def _settle(self, execution: WorkflowExecution, task_exec: TaskExecution, status: TaskStatus) -> bool:
+        """Give a task its final status; False if it already has one or the run was cancelled.
+
+        Worker threads and a cancelling scheduler race to settle in-flight tasks,
+        so the check and the update happen under the lock.
+        """
+        with self.lock:
+            if task_exec.status in FINAL_TASK_STATUSES:
+                return False
+            if status != TaskStatus.CANCELLED and execution.cancel_token.cancelled:
+                return False
+            task_exec.status = status
+            return True
+
+    def _record_event(self, **event: Any) -> None:
+        """Record an event in the ledger; a group-commit ledger commits it with a later batch."""
+        if self.ledger.group_commit:
+            self.ledger.submit_event(**event)
+        else:
+            self.ledger.record_event(**event)
+
+    def _record_task_event(self, event_type: str, task_def: TaskDefinition,
+                           payload: Optional[Dict[str, Any]] = None) -> None:
+        """Record a task lifecycle event in the ledger, if any."""
         if self.ledger:
-            self.ledger.record_event(
-                event_type="task_running",
+            self._record_event(
+                event_type=event_type,
                 actor="system:workflow_executor",
                 target=task_def.task_id,
                 domain=task_def.domain,
-                payload_json={"workflow_id": execution.workflow_id, "execution_id": execution.execution_id}
+                payload_json=payload
             )
-        task_exec.status = TaskStatus.RUNNING
-        task_exec.start_time = time.time()
-
-        for attempt in range(task_def.retries + 1):
-            try:
-                task_exec.attempts = attempt + 1
-
-                if task_def.condition:
-                    if not task_def.condition(execution.outputs):
-                        if self.ledger:
-                            self.ledger.record_event(
-                                event_type="task_skipped",
-                                actor="system:workflow_executor",
-                                target=task_def.task_id,
-                                domain=task_def.domain,
-                                payload_json={"condition": "failed"}
-                            )
-                        task_exec.status = TaskStatus.SKIPPED
-                        task_exec.end_time = time.time()
-                        return
-
-                # Get dependencies outputs
-                context = {dep: execution.tasks[dep].result for dep in task_def.depends_on}
-
-                # Execute with timeout
-                if task_def.timeout:
-                    import signal
-
-                    def timeout_handler(signum, frame):
-                        raise TimeoutError(f"Task {task_def.task_id} timeout")
-
-                    signal.signal(signal.SIGALRM, timeout_handler)
-                    signal.alarm(int(task_def.timeout))
-
-                result = task_def.handler(context)
-
-                if task_def.timeout:
-                    signal.alarm(0)
-
-                task_exec.result = result
-                task_exec.status = TaskStatus.SUCCESS
-                execution.outputs[task_def.task_id] = result
-                if self.ledger:
-                     self.ledger.record_event(
-                        event_type="task_succeeded",
-                        actor="system:workflow_executor",
-                        target=task_def.task_id,
-                        domain=task_def.domain,
-                        payload_json={"result": str(result)} # Convert result to string for logging
-                    )
 
+    def _begin_attempt(self, task_def: TaskDefinition, task_exec: TaskExecution,
+                       execution: WorkflowExecution) -> bool:
+        """Mark task running for its next attempt; False if the run was cancelled first."""
+        if execution.aborted:
+            self._cancel_aborted(task_def, task_exec, execution)  # a retry due after fail-fast
+            return False
+        with self.lock:
+            if task_exec.status in FINAL_TASK_STATUSES or execution.cancel_token.cancelled:
+                return False
+            task_exec.status = TaskStatus.RUNNING
+        if not task_exec.attempts:
+            self._record_task_event(
+                "task_running", task_def,
+                {"workflow_id": execution.workflow_id, "execution_id": execution.execution_id}
+            )
+            task_exec.start_time = time.time()
+        return True
+
+    def _log_attempt(self, task_exec: TaskExecution) -> Dict[str, Any]:
+        """Start a record of this attempt's timing in the task's metadata (for trace export)."""
+        record = {"start": time.time(), "end": None, "error": None}
+        task_exec.metadata.setdefault("attempt_log", []).append(record)
+        return record
+
+    def _condition_skips(self, task_def: TaskDefinition, task_exec: TaskExecution,
+                         execution: WorkflowExecution) -> bool:
+        """Skip the task if its condition rejects the workflow outputs."""
+        if task_def.condition and not task_def.condition(execution.outputs):
+            if self._settle(execution, task_exec, TaskStatus.SKIPPED):
+                self._record_task_event("task_skipped", task_def, {"condition": "failed"})
                 task_exec.end_time = time.time()
-                return
+            return True
+        return False
+
+    def _profiled(self, handler: Callable[[Any], Any], execution: WorkflowExecution,
+                  task_exec: TaskExecution, local: bool = True) -> Callable[[Any], Any]:
+        """Wrap a handler call for the profiler, if any; local=False for work run in another process."""
+        if not self.profiler:
+            return handler
+        if inspect.iscoroutinefunction(handler):
+            return self.profiler.wrap_async(handler, execution.execution_id, task_exec.task_id)
+        return self.profiler.wrap(handler, execution.execution_id, task_exec.task_id, local)
+
+    def _task_profile(self, task_def: TaskDefinition, task_exec: TaskExecution,
+                      execution: WorkflowExecution) -> Dict[str, Any]:
+        """Attach a finished task's measurements to its metadata; returns them for its final event."""
+        if not self.profiler:
+            return {}
+        profile = self.profiler.task_profile(execution.execution_id, task_def.task_id,
+                                             execution.ready_time(task_def.depends_on), task_exec.start_time)
+        if profile is None:
+            return {}
+        task_exec.metadata["profile"] = profile
+        return {"profile": profile}
+
+    def _task_succeeded(self, task_def: TaskDefinition, task_exec: TaskExecution,
+                        execution: WorkflowExecution, result: Any) -> None:
+        """Record a successful result."""
+        if not self._settle(execution, task_exec, TaskStatus.SUCCESS):
+            return  # the run was cancelled while the handler ran
+        task_exec.result = result
+        execution.outputs[task_def.task_id] = result
+        # Convert result to string for logging
+        self._record_task_event("task_succeeded", task_def,
+                                {"result": str(result), **self._task_profile(task_def, task_exec, execution)})
+        task_exec.end_time = time.time()
+        self._checkpoint_task(execution, task_exec)
+        if self.result_cache and "cache_key" in task_exec.metadata:
+            value = result.load() if isinstance(result, SharedResult) else result
+            self.result_cache.put(task_exec.metadata["cache_key"], value, ttl=task_def.cache_ttl)
+
+    def _attempt_failed(self, task_def: TaskDefinition, task_exec: TaskExecution,
+                        execution: WorkflowExecution, attempt: int, error: Exception) -> Optional[float]:
+        """Record a failed attempt; returns the backoff delay if the task will be retried."""
+        if execution.cancel_token.cancelled:
+            return None  # the scheduler marks the task CANCELLED
+        if execution.aborted and isinstance(error, TaskCancelledError):
+            self._cancel_aborted(task_def, task_exec, execution)
+            return None
+        policy = task_def.retry_policy
+        if not execution.aborted and policy.should_retry(error, attempt):
+            delay = policy.next_delay(attempt, task_exec.metadata.get("retry_delay"))
+            task_exec.metadata["retry_delay"] = delay
+            self._record_task_event("task_retrying", task_def,
+                                    {"attempt": attempt + 1, "error": str(error), "delay": delay})
+            task_exec.status = TaskStatus.RETRYING
+            return delay
+
+        if not self._settle(execution, task_exec, TaskStatus.FAILED):
+            return None
+        self._record_task_event("task_failed", task_def,
+                                {"error": str(error), **self._task_profile(task_def, task_exec, execution)})
+        task_exec.error = str(error)
+        execution.errors.append(f"{task_def.task_id}: {str(error)}")
+        task_exec.end_time = time.time()
+        self._checkpoint_task(execution, task_exec)
+        return None
 
-            except Exception as e:
-                if attempt < task_def.retries:
-                    if self.ledger:
-                        self.ledger.record_event(
-                            event_type="task_retrying",
-                            actor="system:workflow_executor",
-                            target=task_def.task_id,
-                            domain=task_def.domain,
-                            payload_json={"attempt": attempt + 1, "error": str(e)}
-                        )
-                    task_exec.status = TaskStatus.RETRYING
-                    time.sleep(1)  # Backoff
-                else:
-                    if self.ledger:
-                        self.ledger.record_event(
-                            event_type="task_failed",
-                            actor="system:workflow_executor",
-                            target=task_def.task_id,
-                            domain=task_def.domain,
-                            payload_json={"error": str(e)}
-                        )
-                    task_exec.status = TaskStatus.FAILED
-                    task_exec.error = str(e)
-                    execution.errors.append(f"{task_def.task_id}: {str(e)}")
-                    task_exec.end_time = time.time()
-                    return
+    def _execute_task(self, task_def: TaskDefinition, task_exec: TaskExecution,
+                      execution: WorkflowExecution) -> Optional[float]:
+        """Run one attempt of a task; returns the backoff delay if it is to be retried."""
+        if not self._begin_attempt(task_def, task_exec, execution):
+            return None
+        attempt = task_exec.attempts
+        task_exec.attempts += 1
+        # Each attempt gets its own token: a timeout cancels only that attempt
+        token = CancellationToken(parent=execution.abort_token or execution.cancel_token)
+        attempt_record = None
+        try:
+            if self._condition_skips(task_def, task_exec, execution):
+                return None
+            attempt_record = self._log_attempt(task_exec)
+
+            # Get dependencies outputs
+            backend = self._backend_for(task_def)
+            context = self._task_context(task_def, execution, backend)
+            timeout_message = f"Task {task_def.task_id} timeout"
+
+            if task_def.subworkflow is not None:
+                run = functools.partial(self._run_subworkflow, task_def, execution, token)
+                result = call_with_timeout(run, context, task_def.timeout, token, timeout_message)
+            elif backend == "process":
+                run = functools.partial(self.process_backend.run, task_def.handler, timeout=task_def.timeout,
+                                        token=token, message=timeout_message)
+                result = self._profiled(run, execution, task_exec, local=False)(context)
+            else:
+                handler = self._profiled(bind_token(task_def.handler, token), execution, task_exec)
+                result = call_with_timeout(handler, context, task_def.timeout, token, timeout_message)
+
+            self._task_succeeded(task_def, task_exec, execution, result)
+            return None
+
+        except Exception as e:
+            if attempt_record is not None:
+                attempt_record["error"] = str(e)
+            return self._attempt_failed(task_def, task_exec, execution, attempt, e)
+        finally:
+            token.detach()
+            if attempt_record is not None:
+                attempt_record["end"] = time.time()
+
+
+    def _start_subworkflow(self, task_def: TaskDefinition, parent: WorkflowExecution,
+                           token: CancellationToken, context: Dict[str, Any]) -> WorkflowExecution:
+        """Start a subworkflow task's child execution; cancelling the attempt cancels the child."""
+        return self._start_execution(task_def.subworkflow, parent=parent, inputs=context,
+                                     cancel_token=CancellationToken(parent=token))
+
+    def _subworkflow_result(self, task_def: TaskDefinition, child: WorkflowExecution,
+                            token: CancellationToken) -> Dict[str, Any]:
+        """A finished child's outputs, or the error that fails its subworkflow task."""
+        child.cancel_token.detach()
+        if child.status == WorkflowStatus.SUCCESS:
+            return dict(child.outputs)
+        if token.cancelled:
+            raise TaskCancelledError(token.reason)
+        raise RuntimeError(f"Subworkflow {task_def.subworkflow.workflow_id} ({child.execution_id}) "
+                           f"{child.status.value}: {'; '.join(child.errors)}")
+
+    def _run_subworkflow(self, task_def: TaskDefinition, parent: WorkflowExecution,
+                         token: CancellationToken, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a subworkflow task's workflow to completion on this thread."""
+        child = self._start_subworkflow(task_def, parent, token, context)
+        self._run_execution(task_def.subworkflow, child)
+        return self._subworkflow_result(task_def, child, token)
+
+
+class AsyncWorkflowExecutor(WorkflowExecutor):
+    """Execute workflows on an asyncio event loop.
+
+    `async def` handlers run as coroutines on the loop, so thousands of I/O-bound
+    tasks (LLM calls) can wait concurrently without a thread each; plain handlers
+    run in a pool of max_workers threads. max_concurrency caps running tasks
+    overall and domain_limits caps them per task domain. Statuses and ledger events
+    match WorkflowExecutor. Ledger writes made on the loop are queued for the
+    ledger's writer thread and awaited before a run returns, so the loop never
+    waits on SQLite.
+    """
+
+    def __init__(self, max_workers: int = 4, ledger: Optional[EventLedger] = None,
+                 fail_fast: bool = False, max_concurrency: int = 1000,
+                 domain_limits: Optional[Dict[str, int]] = None, **backend_options):
+        """Initialize executor; backend_options (backends, checkpoints, scheduling) as for WorkflowExecutor."""
+        super().__init__(max_workers=max_workers, ledger=ledger, fail_fast=fail_fast, **backend_options)
+        self.max_concurrency = max_concurrency
+        self.domain_limits = dict(domain_limits or {})
+        # Ledger writes queued from the loop and not yet awaited
+        self._pending_writes: List[Future] = []
+
+    async def execute_async(self, workflow: WorkflowDefinition) -> WorkflowExecution:
+        """Execute workflow on the running event loop."""
+        execution = self._start_execution(workflow)
+        try:
+            await self._execute_tasks_async(workflow, execution)
+        except Exception as e:
+            self._finish_execution(execution, e)
+        else:
+            self._finish_execution(execution)
+        await self._flush_writes()
+        return execution
+
+    def _on_loop(self) -> bool:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+
+    def _record_event(self, **event: Any) -> None:
+        """Record an event; on the loop it is queued for the writer thread instead of waited for."""
+        if self._on_loop():
+            self._pending_writes.append(self.ledger.submit_event(**event))
+        else:
+            super()._record_event(**event)
+
+    def _record_graph_events(self, graph: TaskGraph) -> None:
+        """Write the queued task_skipped/task_cancelled events; on the loop without waiting."""
+        if not self._on_loop():
+            super()._record_graph_events(graph)
+            return
+        events, graph.events = graph.events, []
+        if events and self.ledger:
+            self._pending_writes.append(self.ledger.submit_events(events))
+
+    async def _flush_writes(self) -> None:
+        """Wait for the queued ledger writes to commit; failed ones are logged."""
+        pending, self._pending_writes = self._pending_writes, []
+        results = await asyncio.gather(*(asyncio.wrap_future(f) for f in pending), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Ledger write failed: {result}")
+
+    def _execute_tasks(self, workflow: WorkflowDefinition, execution: WorkflowExecution) -> None:
+        """Run the async scheduler on a fresh event loop (for execute())."""
+        asyncio.run(self._execute_tasks_async(workflow, execution))
+
+    async def _execute_tasks_async(self, workflow: WorkflowDefinition, execution: WorkflowExecution) -> None:
+        """Execute tasks with dependency ordering on the running loop."""
+        metrics = execution.scheduler
+        started = time.perf_counter()
+        graph = self._task_graph(workflow, execution)
+        loop = asyncio.get_running_loop()
+
+        limit = asyncio.Semaphore(self.max_concurrency)
+        domain_limits = {domain: asyncio.Semaphore(n) for domain, n in self.domain_limits.items()}
+        completed: asyncio.Queue = asyncio.Queue()
+        in_flight: Dict[str, asyncio.Task] = {}
+        retries = TimerWheel()
+        retrying: Set[str] = set()
+        cancel_token = execution.cancel_token
+        wake = functools.partial(loop.call_soon_threadsafe, completed.put_nowait, None)
+        cancel_token.add_callback(wake)
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        def dispatch(task_id: str, task_exec: TaskExecution) -> None:
+            task_def = graph.task_defs[task_id]
+            task = loop.create_task(self._execute_task_async(
+                task_def, task_exec, execution, pool, limit, domain_limits.get(task_def.domain)
+            ))
+            task.add_done_callback(lambda t: completed.put_nowait((task_id, t)))
+            in_flight[task_id] = task
+            metrics.tasks_dispatched += 1
+
+        try:
+            aborted = False
+            while not cancel_token.cancelled:
+                while graph.ready and len(in_flight) < self.max_concurrency and not cancel_token.cancelled:
+                    task_exec = self._next_ready(graph, retrying)
+                    if task_exec is not None:
+                        dispatch(task_exec.task_id, task_exec)
+
+                if not in_flight and not retries:
+                    break
+
+                waited = time.perf_counter()
+                try:
+                    done = [await asyncio.wait_for(completed.get(), retries.next_timeout())]
+                except asyncio.TimeoutError:
+                    done = []
+                metrics.wait_time += time.perf_counter() - waited
+                while True:
+                    try:
+                        done.append(completed.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+
+                for item in done:
+                    if item is None or cancel_token.cancelled:
+                        continue
+                    completed_task_id, task = item
+                    del in_flight[completed_task_id]
+                    if task.cancelled():
+                        graph.skip(graph.task_defs[completed_task_id], {"fail_fast": True})
+                        continue
+                    if task.exception():
+                        logger.error(f"Task {completed_task_id} failed with exception: {task.exception()}")
+                    elif task.result() is not None:
+                        retries.schedule(task.result(), completed_task_id)
+                        continue
+
+                    if self._should_abort(execution.tasks[completed_task_id], aborted):
+                        # Coroutines are cancelled outright; pool-thread handlers through their tokens
+                        aborted = True
+                        self._abort(execution)
+                        self._drop_ready(graph, retrying)
+                        for sibling in in_flight.values():
+                            sibling.cancel()
+                    if not aborted:
+                        self._resolve(graph, completed_task_id)
+                # Skips cascaded by this pass's completions go out now, not at the end
+                self._record_graph_events(graph)
+
+                for task_id in retries.expire():
+                    retrying.add(task_id)
+                    graph.ready.append(task_id)
+
+            if cancel_token.cancelled:
+                for task in in_flight.values():
+                    task.cancel()
+                await asyncio.gather(*in_flight.values(), return_exceptions=True)
+                self._cancel_in_flight(graph, [*in_flight, *retries.clear(), *retrying])
+            elif aborted:
+                graph.skip_remaining({"fail_fast": True})
+        finally:
+            cancel_token.remove_callback(wake)
+            pool.shutdown(wait=not cancel_token.cancelled, cancel_futures=True)
+            self._release_shared_results(execution)
+            self._record_graph_events(graph)
+            await self._flush_writes()
+
+        metrics.wall_time = time.perf_counter() - started
+        metrics.scheduler_time = metrics.wall_time - metrics.wait_time
+
+    async def _run_subworkflow_async(self, task_def: TaskDefinition, parent: WorkflowExecution,
+                                     token: CancellationToken, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a subworkflow task's workflow to completion on the running loop."""
+        child = self._start_subworkflow(task_def, parent, token, context)
+        try:
+            await self._execute_tasks_async(task_def.subworkflow, child)
+        except asyncio.CancelledError:
+            # Timed out: settle the child before letting the cancellation through
+            child.cancel("timeout")
+            self._finish_execution(child)
+            raise
+        except Exception as e:
+            self._finish_execution(child, e)
+        else:
+            self._finish_execution(child)
+        return self._subworkflow_result(task_def, child, token)
+
+    async def _execute_task_async(self, task_def: TaskDefinition, task_exec: TaskExecution,
+                                  execution: WorkflowExecution, pool: ThreadPoolExecutor,
+                                  limit: asyncio.Semaphore,
+                                  domain_limit: Optional[asyncio.Semaphore]) -> Optional[float]:
+        """Run one attempt of a task once a concurrency slot is free."""
+        async with limit:
+            if domain_limit is None:
+                return await self._run_task_async(task_def, task_exec, execution, pool)
+            async with domain_limit:
+                return await self._run_task_async(task_def, task_exec, execution, pool)
+
+    async def _run_task_async(self, task_def: TaskDefinition, task_exec: TaskExecution,
+                              execution: WorkflowExecution, pool: ThreadPoolExecutor) -> Optional[float]:
+        """Async counterpart of WorkflowExecutor._execute_task."""
+        if not self._begin_attempt(task_def, task_exec, execution):
+            return None
+        attempt = task_exec.attempts
+        task_exec.attempts += 1
+        is_async = inspect.iscoroutinefunction(task_def.handler)
+        backend = self._backend_for(task_def)
+        timeout_message = f"Task {task_def.task_id} timeout"
+        loop = asyncio.get_running_loop()
+        token = CancellationToken(parent=execution.abort_token or execution.cancel_token)
+        attempt_record = None
+        try:
+            if self._condition_skips(task_def, task_exec, execution):
+                return None
+            attempt_record = self._log_attempt(task_exec)
+
+            context = self._task_context(task_def, execution, "thread" if is_async else backend)
+            handler = self._profiled(bind_token(task_def.handler, token), execution, task_exec)
+            if task_def.subworkflow is not None:
+                call = self._run_subworkflow_async(task_def, execution, token, context)
+                try:
+                    result = await asyncio.wait_for(call, task_def.timeout) if task_def.timeout else await call
+                except asyncio.TimeoutError:
+                    token.cancel("timeout")
+                    raise TimeoutError(timeout_message)
+            elif backend == "inline" and not is_async:
+                # Runs right here on the event loop
+                result = handler(context)
+            elif backend == "process" and not is_async:
+                # The backend enforces the timeout itself and kills the worker process
+                run = functools.partial(self.process_backend.run, task_def.handler, timeout=task_def.timeout,
+                                        token=token, message=timeout_message)
+                result = await loop.run_in_executor(None, self._profiled(run, execution, task_exec, local=False),
+                                                    context)
+            else:
+                call = handler(context) if is_async else loop.run_in_executor(pool, handler, context)
+                try:
+                    result = await asyncio.wait_for(call, task_def.timeout) if task_def.timeout else await call
+                except asyncio.TimeoutError:
+                    token.cancel("timeout")
+                    raise TimeoutError(timeout_message)
+
+            self._task_succeeded(task_def, task_exec, execution, result)
+            return None
+
+        except Exception as e:
+            if attempt_record is not None:
+                attempt_record["error"] = str(e)
+            return self._attempt_failed(task_def, task_exec, execution, attempt, e)
+        finally:
+            token.detach()
+            if attempt_record is not None:
+                attempt_record["end"] = time.time()
 
 
 # ===== STATE MANAGEMENT =====
@@ -431,6 +1580,14 @@ class WorkflowState:
             "name": execution.name,
             "status": execution.status.value,
             "duration": execution.duration,
+            "scheduler": {
+                "tasks_dispatched": execution.scheduler.tasks_dispatched,
+                "dispatch_rate": execution.scheduler.dispatch_rate,
+                "scheduler_time": execution.scheduler.scheduler_time,
+                "overhead": execution.scheduler.overhead,
+                "cache_hits": execution.scheduler.cache_hits,
+                "cache_misses": execution.scheduler.cache_misses
+            },
             "tasks": {
                 task_id: {
                     "status": task.status.value,
@@ -447,71 +1604,96 @@ class WorkflowState:
 # ===== MONITORING =====
 
 class WorkflowMonitor:
-    """Monitor workflow execution."""
+    """Monitor workflow execution with streaming statistics (see monitoring).
 
-    def __init__(self):
-        """Initialize monitor."""
-        self.executions: List[WorkflowExecution] = []
-        self.lock = threading.RLock()
+    Memory stays constant per workflow and task id, however many executions are
+    recorded; the items of a map task are aggregated under "<map task>[*]". Every query takes an optional window: seconds, or a name from
+    WINDOWS, up to `horizon`.
+    """
+
+    WINDOWS = {"5m": 300.0, "1h": 3600.0}
+
+    def __init__(self, horizon: float = 3600.0, resolution: float = 60.0, shards: int = 4,
+                 relative_accuracy: float = 0.01, clock: Callable[[], float] = time.time):
+        """Initialize monitor; resolution is the granularity of windowed views."""
+        options = dict(horizon=horizon, resolution=resolution, shards=shards,
+                       relative_accuracy=relative_accuracy, clock=clock)
+        self.workflows = StreamingAggregator(**options)
+        self.tasks = StreamingAggregator(**options)
+
+    def _window(self, window) -> Optional[float]:
+        return self.WINDOWS.get(window, window) if isinstance(window, str) else window
 
     def record_execution(self, execution: WorkflowExecution) -> None:
         """Record completed execution."""
-        with self.lock:
-            self.executions.append(execution)
+        # Task and workflow statuses share these values; anything else counts as neither
+        outcomes = {"success": True, "failed": False}
+        self.workflows.record(execution.workflow_id, execution.duration, outcomes.get(execution.status))
+        self.tasks.record_many(
+            (self._task_key(task_id, task), self._task_duration(task), outcomes.get(task.status))
+            for task_id, task in execution.tasks.items()
+        )
 
-    def get_success_rate(self) -> float:
+    @staticmethod
+    def _task_key(task_id: str, task: TaskExecution) -> str:
+        # Items of a map task share one key, "<map task>[*]", so the key count does not
+        # grow with fan-out; the map task keeps its own end-to-end entry
+        map_task = task.metadata.get("map_task")
+        return task_id if map_task is None else f"{map_task}[*]"
+
+    @staticmethod
+    def _task_duration(task: TaskExecution) -> Optional[float]:
+        # Skipped, cancelled and cache-hit tasks are counted but never ran; their
+        # zero durations would drag the means and percentiles down
+        if task.status in (TaskStatus.SKIPPED, TaskStatus.CANCELLED) or task.metadata.get("cache_hit"):
+            return None
+        return task.duration
+
+    def get_execution_count(self, window=None) -> int:
+        """Get number of recorded executions."""
+        return self.workflows.total(self._window(window)).count
+
+    def get_success_rate(self, window=None) -> float:
         """Get success rate."""
-        with self.lock:
-            if not self.executions:
-                return 0.0
-            successful = sum(1 for e in self.executions if e.status == WorkflowStatus.SUCCESS)
-            return successful / len(self.executions)
+        total = self.workflows.total(self._window(window))
+        return total.successes / total.count if total.count else 0.0
 
-    def get_average_duration(self) -> float:
+    def get_average_duration(self, window=None) -> float:
         """Get average execution duration."""
-        with self.lock:
-            if not self.executions:
-                return 0.0
-            total_duration = sum(e.duration for e in self.executions if e.duration)
-            return total_duration / len(self.executions)
-
-    def get_task_statistics(self) -> Dict[str, Dict[str, Any]]:
-        """Get task-level statistics."""
-        stats: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
-            "executions": 0, "successes": 0, "failures": 0, "avg_duration": 0.0
-        })
+        return self.workflows.total(self._window(window)).durations.mean
 
-        with self.lock:
-            for execution in self.executions:
-                for task_id, task in execution.tasks.items():
-                    s = stats[task_id]
-                    s["executions"] += 1
-                    if task.status == TaskStatus.SUCCESS:
-                        s["successes"] += 1
-                    elif task.status == TaskStatus.FAILED:
-                        s["failures"] += 1
-                    if task.duration:
-                        s["avg_duration"] = (s["avg_duration"] + task.duration) / 2
-
-        return stats
-
-    def get_report(self) -> str:
+    def get_workflow_statistics(self, window=None) -> Dict[str, Dict[str, Any]]:
+        """Get per-workflow counts and duration mean/stddev/percentiles."""
+        return {workflow_id: summary.to_dict()
+                for workflow_id, summary in self.workflows.summaries(self._window(window)).items()}
+
+    def get_task_statistics(self, window=None) -> Dict[str, Dict[str, Any]]:
+        """Get task-level counts and duration mean/stddev/percentiles."""
+        return {task_id: summary.to_dict()
+                for task_id, summary in self.tasks.summaries(self._window(window)).items()}
+
+    def get_average_task_durations(self, window=None) -> Dict[str, float]:
+        """Get mean duration per task id over recorded runs (for critical-path estimates)."""
+        return {task_id: summary.durations.mean
+                for task_id, summary in self.tasks.summaries(self._window(window)).items()
+                if summary.durations.count}
+
+    def get_report(self, window=None) -> str:
         """Generate execution report."""
-        with self.lock:
-            total = len(self.executions)
-            successful = sum(1 for e in self.executions if e.status == WorkflowStatus.SUCCESS)
-            failed = sum(1 for e in self.executions if e.status == WorkflowStatus.FAILED)
+        total = self.workflows.total(self._window(window))
+        p95 = total.sketch.quantile(0.95)
 
-            report = f"""
+        report = f"""
 Workflow Execution Report
 ========================
-Total Executions: {total}
-Successful: {successful}
-Failed: {failed}
-Success Rate: {self.get_success_rate():.1%}
-Average Duration: {self.get_average_duration():.2f}s
+Total Executions: {total.count}
+Successful: {total.successes}
+Failed: {total.failures}
+Success Rate: {total.successes / total.count if total.count else 0.0:.1%}
+Average Duration: {total.durations.mean:.2f}s
+p95 Duration: {p95 or 0.0:.2f}s
 """
-            return report
+        return report
 
 if __name__ == '__main__':
     # Setup basic logging
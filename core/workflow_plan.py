@@ -0,0 +1,164 @@
+"""
+Workflow plan - the compiled, immutable form of a workflow's task graph.
+
+WorkflowBuilder.build() compiles the task definitions once: dependencies are
+validated (unknown tasks, branch conditions on non-dependencies, cycles) and the
+DAG is laid out as integer-indexed adjacency arrays in topological order, with
+topological levels. Every execution of the workflow reuses the same plan, so the
+scheduler only copies the in-degree counts per run.
+
+Critical-path estimates take historical task durations (for example
+WorkflowMonitor.get_average_task_durations()), since the plan itself knows
+nothing about run times.
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+
+class WorkflowValidationError(ValueError):
+    """Raised when a workflow definition is not a valid DAG."""
+
+
+@dataclass(frozen=True)
+class CriticalPath:
+    """Longest expected chain of dependent tasks."""
+    length: float
+    task_ids: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """Validated DAG layout; task indices follow topological order."""
+    task_ids: Tuple[str, ...]
+    index: Mapping[str, int]
+    upstream: Tuple[Tuple[int, ...], ...]
+    downstream: Tuple[Tuple[int, ...], ...]
+    levels: Tuple[Tuple[int, ...], ...]
+    level_of: Tuple[int, ...]
+    # Task-id views of the same graph, for the scheduler
+    downstream_ids: Mapping[str, Tuple[str, ...]]
+    in_degree: Mapping[str, int]
+    roots: Tuple[str, ...]
+
+    @property
+    def size(self) -> int:
+        return len(self.task_ids)
+
+    @property
+    def depth(self) -> int:
+        """Number of topological levels (the longest chain, counted in tasks)."""
+        return len(self.levels)
+
+    def _durations(self, durations: Mapping[str, float], default: Optional[float]) -> List[float]:
+        if default is None:
+            known = [d for d in durations.values() if d is not None]
+            default = sum(known) / len(known) if known else 1.0
+        return [durations.get(task_id, default) for task_id in self.task_ids]
+
+    def remaining_work(self, durations: Mapping[str, float], default: Optional[float] = None) -> Dict[str, float]:
+        """Expected time from each task's start to the end of the longest chain after it.
+
+        Tasks without a recorded duration count as `default` (the mean of the
+        known durations, or 1.0 with no history).
+        """
+        cost = self._durations(durations, default)
+        rank = [0.0] * self.size
+        for i in reversed(range(self.size)):
+            rank[i] = cost[i] + max((rank[c] for c in self.downstream[i]), default=0.0)
+        return dict(zip(self.task_ids, rank))
+
+    def critical_path(self, durations: Mapping[str, float], default: Optional[float] = None) -> CriticalPath:
+        """Chain of tasks with the longest expected total duration."""
+        if not self.task_ids:
+            return CriticalPath(0.0, ())
+        rank = self.remaining_work(durations, default)
+        task_id = max(self.roots, key=rank.__getitem__)
+        path = [task_id]
+        while self.downstream_ids[task_id]:
+            task_id = max(self.downstream_ids[task_id], key=rank.__getitem__)
+            path.append(task_id)
+        return CriticalPath(rank[path[0]], tuple(path))
+
+
+def compile_plan(tasks: Mapping[str, Any]) -> ExecutionPlan:
+    """Validate task definitions (depends_on, branch_conditions) and lay out their DAG."""
+    ids = list(tasks)
+    position = {task_id: i for i, task_id in enumerate(ids)}
+    deps: List[Tuple[int, ...]] = []
+    for task_id in ids:
+        task = tasks[task_id]
+        for dep in task.depends_on:
+            if dep not in position:
+                raise WorkflowValidationError(f"Task '{task_id}' depends on unknown task '{dep}'")
+        for dep in task.branch_conditions:
+            if dep not in task.depends_on:
+                raise WorkflowValidationError(
+                    f"Task '{task_id}' has a branch condition on '{dep}', which it does not depend on")
+        spec = getattr(task, "map", None)
+        if spec is not None and spec.over not in task.depends_on:
+            raise WorkflowValidationError(f"Map task '{task_id}' maps over '{spec.over}', which it does not depend on")
+        deps.append(tuple(dict.fromkeys(position[dep] for dep in task.depends_on)))
+
+    children: List[List[int]] = [[] for _ in ids]
+    for i, parents in enumerate(deps):
+        for parent in parents:
+            children[parent].append(i)
+
+    # Kahn's algorithm one level at a time: a task lands on the level after its
+    # last parent's
+    remaining = [len(parents) for parents in deps]
+    level = [i for i, count in enumerate(remaining) if count == 0]
+    levels: List[List[int]] = []
+    while level:
+        levels.append(level)
+        following = []
+        for i in level:
+            for child in children[i]:
+                remaining[child] -= 1
+                if not remaining[child]:
+                    following.append(child)
+        level = following
+
+    order = [i for level in levels for i in level]
+    if len(order) < len(ids):
+        raise WorkflowValidationError(f"Cycle detected: {_find_cycle(ids, deps, remaining)}")
+
+    # Renumber in topological order
+    new = [0] * len(ids)
+    for n, i in enumerate(order):
+        new[i] = n
+    task_ids = tuple(ids[i] for i in order)
+    upstream = tuple(tuple(new[p] for p in deps[i]) for i in order)
+    downstream = tuple(tuple(new[c] for c in children[i]) for i in order)
+    level_of = [0] * len(ids)
+    for depth, members in enumerate(levels):
+        for i in members:
+            level_of[new[i]] = depth
+
+    return ExecutionPlan(
+        task_ids=task_ids,
+        index=MappingProxyType({task_id: n for n, task_id in enumerate(task_ids)}),
+        upstream=upstream,
+        downstream=downstream,
+        levels=tuple(tuple(new[i] for i in members) for members in levels),
+        level_of=tuple(level_of),
+        downstream_ids=MappingProxyType({ids[i]: tuple(ids[c] for c in children[i]) for i in range(len(ids))}),
+        in_degree=MappingProxyType({ids[i]: len(deps[i]) for i in range(len(ids))}),
+        roots=tuple(ids[i] for i in levels[0]) if levels else (),
+    )
+
+
+def _find_cycle(ids: List[str], deps: List[Tuple[int, ...]], remaining: List[int]) -> str:
+    # Every task left with unmet dependencies is on a cycle or downstream of one, and
+    # has a parent that is too: follow parents until one repeats
+    node = next(i for i, count in enumerate(remaining) if count)
+    seen: Dict[int, int] = {}
+    walk: List[int] = []
+    while node not in seen:
+        seen[node] = len(walk)
+        walk.append(node)
+        node = next(p for p in deps[node] if remaining[p])
+    cycle = walk[seen[node]:][::-1]
+    return " -> ".join(ids[i] for i in cycle + [cycle[0]])
@@ -0,0 +1,458 @@
+"""
+Workflow scheduler - many concurrent workflow runs on one shared worker pool.
+
+WorkflowExecutor.execute() blocks its caller and brings up a thread pool per
+run, so a hundred concurrent workflows mean hundreds of threads competing with
+no notion of fairness. WorkflowScheduler is a long-lived service instead:
+submit() returns a WorkflowHandle at once, a single scheduler thread drives
+every run's TaskGraph, and all tasks share one pool of max_workers threads.
+
+Ready tasks wait in flows keyed by (tenant, task domain). Whenever a worker is
+free the scheduler takes the next task from the backlogged flow with the lowest
+virtual time and charges that flow the task's expected duration divided by its
+weight (tenant weight x domain weight), so under contention each flow gets
+worker time in proportion to its weight. A flow that was idle rejoins at the
+current virtual time rather than with banked credit. Inside a flow, tasks go in
+the runs' own priority order (see scheduling), then arrival order.
+
+A task whose retry backoff has expired queues in its flow again like any ready
+task, so retries count against max_workers and their flow's share. Subworkflows
+run their child on a pool of their own: a parent task blocking a shared worker
+while it waits on its child's tasks could otherwise starve the pool.
+
+Finished executions stay registered for cancel(), export_trace() and resume()
+lookups, but only the newest `history` of them, so a long-lived scheduler does
+not keep every run it ever saw.
+"""
+
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from .retry import TimerWheel
+from .scheduling import PriorityReadyQueue
+from .workflow_orchestrator import (
+    TaskExecution, TaskGraph, WorkflowDefinition, WorkflowExecution, WorkflowExecutor, WorkflowStatus
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowHandle:
+    """Non-blocking handle to a submitted workflow run."""
+
+    def __init__(self, scheduler: "WorkflowScheduler", execution: WorkflowExecution, future: Future):
+        self.scheduler = scheduler
+        self.execution = execution
+        self._future = future
+
+    @property
+    def execution_id(self) -> str:
+        return self.execution.execution_id
+
+    def status(self) -> WorkflowStatus:
+        """Current workflow status."""
+        return self.execution.status
+
+    def done(self) -> bool:
+        """True once the run has finished (any final status)."""
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> WorkflowExecution:
+        """Wait for the run to finish; raises TimeoutError after timeout seconds."""
+        return self._future.result(timeout)
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Cancel the run; False if it already finished."""
+        return self.scheduler.cancel(self.execution_id, reason)
+
+    def add_done_callback(self, callback: Callable[["WorkflowHandle"], None]) -> None:
+        """Call callback(handle) once the run finishes."""
+        self._future.add_done_callback(lambda _: callback(self))
+
+
+class _Flow:
+    """Fair-queuing state for one (tenant, domain) pair."""
+
+    def __init__(self, weight: float):
+        self.weight = weight
+        self.virtual_time = 0.0
+        # (priority key, arrival, run, task id)
+        self.queue: List[Tuple[Any, int, "_Run", str]] = []
+
+
+class _Run:
+    """A submitted execution and its scheduling state."""
+
+    def __init__(self, workflow: WorkflowDefinition, execution: WorkflowExecution, graph: TaskGraph,
+                 tenant: str, durations: Dict[str, float]):
+        self.workflow = workflow
+        self.execution = execution
+        self.graph = graph
+        self.tenant = tenant
+        self.durations = durations
+        self.future = Future()
+        self.in_flight: Dict[str, Future] = {}
+        self.backing_off: Set[str] = set()
+        # Retries queued in a flow (their TaskExecution already exists)
+        self.retrying: Set[str] = set()
+        self.queued = 0
+        self.aborted = False
+        self.finished = False
+        self.started = time.perf_counter()
+        self.wake: Optional[Callable[[], None]] = None
+
+    @property
+    def live(self) -> bool:
+        """True while new tasks of this run may start."""
+        return not (self.finished or self.aborted or self.execution.cancel_token.cancelled)
+
+
+class WorkflowScheduler(WorkflowExecutor):
+    """Long-lived executor running many submitted workflows on one shared, fairly shared pool."""
+
+    def __init__(self, max_workers: int = 8, tenant_weights: Optional[Dict[str, float]] = None,
+                 history: int = 1000, **executor_options):
+        """Initialize scheduler and start its thread; executor_options as for WorkflowExecutor.
+
+        tenant_weights and the executor's domain_weights set each flow's share of
+        the workers (default 1.0). history is how many finished executions stay
+        registered with the executor.
+        """
+        super().__init__(max_workers=max_workers, **executor_options)
+        self.tenant_weights = dict(tenant_weights or {})
+        self.history = history
+        self._finished: Deque[str] = deque()
+        self._events: "queue.Queue[Tuple[Any, ...]]" = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow-worker")
+        self._retries = TimerWheel()
+        # Written by the scheduler thread, read by shutdown(); guarded by self.lock
+        self._runs: Dict[str, _Run] = {}
+        self._flows: Dict[Tuple[str, Optional[str]], _Flow] = {}
+        self._backlogged: Set[Tuple[str, Optional[str]]] = set()
+        self._arrival = itertools.count()
+        self._virtual_time = 0.0
+        self._busy = 0
+        self._closing = False
+        self._thread = threading.Thread(target=self._loop, name="workflow-scheduler", daemon=True)
+        self._thread.start()
+
+    # ===== PUBLIC API =====
+
+    def submit(self, workflow: WorkflowDefinition, tenant: str = "default") -> WorkflowHandle:
+        """Queue a workflow run; returns at once with a handle to it."""
+        if self._closing:
+            raise RuntimeError("WorkflowScheduler is shut down")
+        return self._enqueue(workflow, self._start_execution(workflow), tenant)
+
+    def shutdown(self, wait: bool = True, cancel_running: bool = False) -> None:
+        """Stop accepting runs; wait for the submitted ones (or cancel them) and stop the pool."""
+        self._closing = True
+        if cancel_running:
+            with self.lock:
+                running = list(self._runs)
+            for execution_id in running:
+                self.cancel(execution_id, "scheduler shut down")
+        self._events.put(("stop",))
+        if wait:
+            self._thread.join()
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_running)
+        super().shutdown()
+
+    # ===== SUBMISSION =====
+
+    def _run_execution(self, workflow: WorkflowDefinition, execution: WorkflowExecution) -> WorkflowExecution:
+        """Run a started execution on the shared pool and wait for it (execute() and resume())."""
+        if "parent_execution_id" in execution.metadata:
+            return super()._run_execution(workflow, execution)
+        return self._enqueue(workflow, execution, "default").result()
+
+    def _enqueue(self, workflow: WorkflowDefinition, execution: WorkflowExecution,
+                 tenant: str) -> WorkflowHandle:
+        try:
+            graph = self._task_graph(workflow, execution)
+        except Exception as e:
+            self._finish_execution(execution, e)
+            future = Future()
+            future.set_result(execution)
+            return WorkflowHandle(self, execution, future)
+        durations = self.monitor.get_average_task_durations() if self.monitor else {}
+        run = _Run(workflow, execution, graph, tenant, durations)
+        self._events.put(("submit", run))
+        return WorkflowHandle(self, execution, run.future)
+
+    # ===== SCHEDULER LOOP =====
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                if not self._step():
+                    return
+            except Exception:
+                # Per-run errors fail their run (see _guard); nothing else may stop the loop
+                logger.exception("Workflow scheduler loop error")
+
+    def _step(self) -> bool:
+        """One pass: dispatch, then wait for and handle events; False once shut down and idle."""
+        touched: Set[_Run] = set()
+        self._dispatch(touched)
+        self._settle_runs(touched)
+        if self._closing and not self._runs and self._events.empty():
+            return False
+
+        try:
+            events = [self._events.get(timeout=self._retries.next_timeout())]
+        except queue.Empty:
+            events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+
+        for event in events:
+            if event[0] == "stop":
+                continue
+            run = event[1]
+            if event[0] == "submit":
+                self._guard(run, self._register, run)
+            elif event[0] == "done":
+                self._busy -= 1
+                self._guard(run, self._task_done, run, event[2], event[3])
+            touched.add(run)
+
+        for run, task_id in self._retries.expire():
+            if task_id in run.backing_off and run.live:
+                run.backing_off.discard(task_id)
+                run.retrying.add(task_id)
+                self._guard(run, self._queue, run, task_id)
+            touched.add(run)
+        self._settle_runs(touched)
+        return True
+
+    def _guard(self, run: _Run, step: Callable[..., None], *args: Any) -> None:
+        """Run one step for a run; an error there fails that run, not the scheduler thread."""
+        try:
+            step(*args)
+        except Exception as e:
+            logger.exception(f"Scheduler error in execution {run.execution.execution_id}")
+            self._complete(run, e)
+
+    def _register(self, run: _Run) -> None:
+        execution_id = run.execution.execution_id
+        with self.lock:
+            self._runs[execution_id] = run
+        # Cancelling the execution wakes the loop, which settles the run
+        run.wake = lambda: self._events.put(("cancel", run))
+        run.execution.cancel_token.add_callback(run.wake)
+        self._drain(run)
+
+    def _drain(self, run: _Run) -> None:
+        """Move a run's newly ready tasks into their flows."""
+        ready = run.graph.ready
+        while ready:
+            self._queue(run, ready.popleft())
+
+    def _queue(self, run: _Run, task_id: str) -> None:
+        """Put a ready (or retrying) task into its flow."""
+        ready = run.graph.ready
+        key = ready.priorities[task_id] if isinstance(ready, PriorityReadyQueue) else ()
+        domain = run.graph.task_defs[task_id].domain
+        flow_key = (run.tenant, domain)
+        flow = self._flows.get(flow_key)
+        if flow is None:
+            weight = self.tenant_weights.get(run.tenant, 1.0) * self.domain_weights.get(domain, 1.0)
+            flow = self._flows[flow_key] = _Flow(weight)
+        if flow_key not in self._backlogged:
+            # An idle flow rejoins at the current virtual time, without banked credit
+            flow.virtual_time = max(flow.virtual_time, self._virtual_time)
+            self._backlogged.add(flow_key)
+        heapq.heappush(flow.queue, (key, next(self._arrival), run, task_id))
+        run.queued += 1
+
+    def _dispatch(self, touched: Set[_Run]) -> None:
+        """Start queued tasks, fairest flow first, while workers are free."""
+        while self._busy < self.max_workers and self._backlogged:
+            flow_key = min(self._backlogged, key=lambda k: self._flows[k].virtual_time)
+            flow = self._flows[flow_key]
+            _, _, run, task_id = heapq.heappop(flow.queue)
+            if not flow.queue:
+                self._backlogged.discard(flow_key)
+            if not run.live:
+                continue  # dropped when its run was aborted or cancelled
+            run.queued -= 1
+            touched.add(run)
+            self._virtual_time = flow.virtual_time
+            flow.virtual_time += run.durations.get(task_id, 1.0) / flow.weight
+            self._guard(run, self._start_task, run, task_id)
+
+    def _start_task(self, run: _Run, task_id: str) -> None:
+        if task_id in run.retrying:
+            run.retrying.discard(task_id)
+            self._submit_task(run, run.execution.tasks[task_id])
+            return
+        task_exec = self._start_ready(run.graph, task_id)
+        if task_exec is None:
+            self._drain(run)  # settled without a worker (cache hit, map expansion)
+        else:
+            self._submit_task(run, task_exec)
+
+    def _submit_task(self, run: _Run, task_exec: TaskExecution) -> None:
+        task_def = run.graph.task_defs[task_exec.task_id]
+        if self._backend_for(task_def) == "inline":
+            future = Future()
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(self._execute_task(task_def, task_exec, run.execution))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = self._pool.submit(self._execute_task, task_def, task_exec, run.execution)
+        self._busy += 1
+        run.in_flight[task_exec.task_id] = future
+        run.execution.scheduler.tasks_dispatched += 1
+        future.add_done_callback(lambda f: self._events.put(("done", run, task_exec.task_id, f)))
+
+    def _task_done(self, run: _Run, task_id: str, future: Future) -> None:
+        """Handle a finished attempt, as WorkflowExecutor's loop does for its own run."""
+        if run.finished or run.execution.cancel_token.cancelled:
+            # A finished run's straggler, or a cancelled run's task: left in flight
+            # so that settling the run marks it CANCELLED
+            return
+        del run.in_flight[task_id]
+        graph = run.graph
+        if future.cancelled():
+            graph.skip(graph.task_defs[task_id], {"fail_fast": True})
+            return
+        try:
+            retry_delay = future.result()
+        except Exception as e:
+            logger.error(f"Task {task_id} failed with exception: {e}")
+            retry_delay = None
+        if retry_delay is not None:
+            run.backing_off.add(task_id)
+            self._retries.schedule(retry_delay, (run, task_id))
+            return
+
+        if self._should_abort(run.execution.tasks[task_id], run.aborted):
+            # Stop dispatching and drop queued siblings; running ones are cancelled
+            # through their tokens, ones waiting to retry right away
+            run.aborted = True
+            self._abort(run.execution)
+            run.queued = 0
+            graph.ready.clear()
+            for sibling in run.in_flight.values():
+                sibling.cancel()
+            for waiting in [*run.backing_off, *run.retrying]:
+                self._cancel_aborted(graph.task_defs[waiting], run.execution.tasks[waiting], run.execution)
+            run.backing_off.clear()
+            run.retrying.clear()
+        if not run.aborted:
+            self._resolve(graph, task_id)
+            self._drain(run)
+
+    def _settle_runs(self, touched: Set[_Run]) -> None:
+        """Finish touched runs that were cancelled or have nothing left to do."""
+        for run in touched:
+            if not run.finished:
+                self._guard(run, self._settle_run, run)
+
+    def _settle_run(self, run: _Run) -> None:
+        if run.execution.cancel_token.cancelled:
+            for future in run.in_flight.values():
+                future.cancel()
+            self._cancel_in_flight(run.graph, [*run.in_flight, *run.backing_off, *run.retrying])
+            self._complete(run)
+        elif not run.in_flight and not run.backing_off and not run.queued:
+            if run.aborted:
+                run.graph.skip_remaining({"fail_fast": True})
+            self._complete(run)
+        else:
+            # Skips cascaded by this pass go out now, not when the run completes
+            self._record_graph_events(run.graph)
+
+    def _complete(self, run: _Run, error: Optional[Exception] = None) -> None:
+        if run.finished:
+            return
+        run.finished = True
+        run.queued = 0
+        with self.lock:
+            self._runs.pop(run.execution.execution_id, None)
+        if run.wake is not None:
+            run.execution.cancel_token.remove_callback(run.wake)
+        metrics = run.execution.scheduler
+        metrics.wall_time = time.perf_counter() - run.started
+        try:
+            try:
+                self._record_graph_events(run.graph)
+            finally:
+                self._release_shared_results(run.execution)
+        except Exception as e:
+            error = error or e
+        # As execute() would, fail the run on errors above and raise ones from finishing it
+        try:
+            self._finish_execution(run.execution, error)
+        except Exception as e:
+            logger.exception(f"Could not finish execution {run.execution.execution_id}")
+            run.future.set_exception(e)
+        else:
+            run.future.set_result(run.execution)
+
+    def _finish_execution(self, execution: WorkflowExecution, error: Optional[Exception] = None) -> None:
+        # Every execution ends here, subworkflow children included
+        try:
+            super()._finish_execution(execution, error)
+        finally:
+            self._retire(execution)
+
+    def _retire(self, execution: WorkflowExecution) -> None:
+        """Unregister the oldest finished executions beyond history, and workflows none of the rest ran."""
+        with self.lock:
+            self._finished.append(execution.execution_id)
+            while len(self._finished) > self.history:
+                evicted = self.executions.pop(self._finished.popleft(), None)
+                if evicted is None:
+                    continue
+                workflow_id = evicted.workflow_id
+                if not any(e.workflow_id == workflow_id for e in self.executions.values()):
+                    self.workflows.pop(workflow_id, None)
+
+
+if __name__ == '__main__':
+    # Throughput demo: many small workflows on a fixed number of workers
+    import sys
+
+    from .workflow_orchestrator import WorkflowBuilder
+
+    WORKFLOWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    WORKERS, TASK_TIME = 8, 0.01
+
+    def step(context):
+        time.sleep(TASK_TIME)
+        return 1
+
+    builder = WorkflowBuilder("fan", name="Fan")
+    builder.add_task("a", "A", step)
+    builder.add_task("b", "B", step, depends_on=["a"])
+    builder.add_task("c", "C", step, depends_on=["a"])
+    builder.add_task("d", "D", step, depends_on=["b", "c"])
+    workflow = builder.build()
+
+    for workers in (WORKERS // 2, WORKERS):
+        scheduler = WorkflowScheduler(max_workers=workers, tenant_weights={"gold": 2.0})
+        started = time.perf_counter()
+        handles = [scheduler.submit(workflow, tenant="gold" if i % 2 else "basic") for i in range(WORKFLOWS)]
+        peak_threads = threading.active_count()
+        executions = [handle.result() for handle in handles]
+        elapsed = time.perf_counter() - started
+        assert all(e.status == WorkflowStatus.SUCCESS for e in executions)
+        scheduler.shutdown()
+        tasks = WORKFLOWS * len(workflow.tasks)
+        print(f"{WORKFLOWS} workflows, {workers} workers: {tasks / elapsed:.0f} tasks/s "
+              f"(ideal {workers / TASK_TIME:.0f}), {peak_threads} threads")
@@ -0,0 +1,198 @@
+"""
+Ledger archive - columnar (Parquet) copies of closed days of the event ledger.
+
+Closed days are written to one Parquet file per day so analytics scans read
+columnar files instead of the hot SQLite database. LedgerArchive.read_events
+stitches the archived files together with the live SQLite tail.
+
+Requires pyarrow (optional dependency: pip install pyarrow).
+"""
+
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+    ds = None
+    pq = None
+
+from .ledger import EventLedger, EVENT_COLUMNS
+
+# Payload keys promoted to their own columns when flatten_payload is on,
+# keyed by the event types that carry them (see WorkflowExecutor).
+PAYLOAD_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "workflow_started": ("workflow_name", "workflow_id"),
+    "task_running": ("workflow_id", "execution_id"),
+    "task_retrying": ("attempt", "error"),
+    "task_failed": ("error",),
+    "task_succeeded": ("result",),
+}
+
+COLUMN_TYPES = {
+    "id": "int64",
+    "timestamp": "string",
+    "event_type": "string",
+    "actor": "string",
+    "target": "string",
+    "domain": "string",
+    "signal_type": "string",
+    "oracle_tier": "int64",
+    "random_seed": "int64",
+    "completion_promise": "string",
+    "verification_method": "string",
+    "payload_json": "string",
+    "cost_tokens": "int64",
+    "cost_usd": "float64",
+    "cost_carbon": "float64",
+}
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Columnar export requires pyarrow: pip install pyarrow")
+
+
+def payload_columns() -> List[str]:
+    keys = sorted({key for fields in PAYLOAD_FIELDS.values() for key in fields})
+    return [f"payload_{key}" for key in keys]
+
+
+def event_schema(flatten_payload: bool = False):
+    require_pyarrow()
+    fields = [pa.field(name, getattr(pa, COLUMN_TYPES[name])()) for name in ("id", "timestamp") + EVENT_COLUMNS]
+    if flatten_payload:
+        fields.extend(pa.field(name, pa.string()) for name in payload_columns())
+    return pa.schema(fields)
+
+
+def _flatten(event: dict) -> dict:
+    fields = PAYLOAD_FIELDS.get(event.get("event_type"))
+    if not fields or not event.get("payload_json"):
+        return event
+    try:
+        payload = json.loads(event["payload_json"])
+    except (TypeError, json.JSONDecodeError):
+        return event
+    if not isinstance(payload, dict):
+        return event
+    event = dict(event)
+    for key in fields:
+        value = payload.get(key)
+        if value is not None:
+            event[f"payload_{key}"] = value if isinstance(value, str) else json.dumps(value)
+    return event
+
+
+def events_to_table(events: Iterable[dict], flatten_payload: bool = False):
+    """Convert ledger event dicts into an Arrow table with the archive schema."""
+    schema = event_schema(flatten_payload)
+    if flatten_payload:
+        events = (_flatten(e) for e in events)
+    return pa.Table.from_pylist(list(events), schema=schema)
+
+
+def next_day(day: str) -> str:
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+class LedgerArchive:
+    """Per-day Parquet archive of an EventLedger."""
+
+    def __init__(self, ledger: EventLedger, archive_dir: str = "data/archive",
+                 flatten_payload: bool = False, chunk_size: int = 50000):
+        require_pyarrow()
+        self.ledger = ledger
+        self.archive_dir = archive_dir
+        self.flatten_payload = flatten_payload
+        self.chunk_size = chunk_size
+        os.makedirs(archive_dir, exist_ok=True)
+
+    def path_for(self, day: str) -> str:
+        return os.path.join(self.archive_dir, f"events-{day}.parquet")
+
+    def archived_days(self) -> List[str]:
+        """Days that already have an archive file, oldest first."""
+        days = []
+        for name in os.listdir(self.archive_dir):
+            if name.startswith("events-") and name.endswith(".parquet"):
+                days.append(name[len("events-"):-len(".parquet")])
+        return sorted(days)
+
+    def archive_day(self, day: str) -> str:
+        """Write every event stamped on `day` (YYYY-MM-DD) to its Parquet file."""
+        path = self.path_for(day)
+        tmp_path = path + ".tmp"
+        schema = event_schema(self.flatten_payload)
+        # Timestamps always carry a time part, so "<= next day" stops at midnight
+        chunks = self.ledger.iter_event_chunks(
+            chunk_size=self.chunk_size, start_timestamp=day, end_timestamp=next_day(day)
+        )
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for chunk in chunks:
+                writer.write_table(events_to_table(chunk, self.flatten_payload))
+        os.replace(tmp_path, path)
+        return path
+
+    def archive_closed_days(self, before: Optional[str] = None) -> List[str]:
+        """Archive every not-yet-archived day before `before` (default: today, UTC).
+
+        Days are archived oldest first, so the archive always covers a contiguous
+        prefix of the ledger. Events ingested later with timestamps on an already
+        archived day are not picked up; re-run archive_day for that day.
+        """
+        before = before or datetime.now(timezone.utc).date().isoformat()
+        done = set(self.archived_days())
+        start = max(done) if done else None
+        start = next_day(start) if start else None
+        return [self.archive_day(day) for day in self.ledger.event_days(start=start, before=before)
+                if day not in done]
+
+    def watermark(self) -> Optional[str]:
+        """Timestamp from which events are served from SQLite rather than the archive."""
+        days = self.archived_days()
+        return next_day(days[-1]) if days else None
+
+    def read_events(self, start_timestamp: Optional[str] = None, end_timestamp: Optional[str] = None,
+                    event_type: Optional[str] = None, actor: Optional[str] = None,
+                    domain: Optional[str] = None):
+        """Query archived files plus the live SQLite tail as one Arrow table.
+
+        The SQLite ledger is only touched when the requested range reaches past
+        the last archived day.
+        """
+        schema = event_schema(self.flatten_payload)
+        tables = []
+
+        files = [
+            self.path_for(day) for day in self.archived_days()
+            if (not start_timestamp or next_day(day) > start_timestamp)
+            and (not end_timestamp or day <= end_timestamp)
+        ]
+        if files:
+            expr = None
+            for column, op, value in (("timestamp", ">=", start_timestamp), ("timestamp", "<=", end_timestamp),
+                                      ("event_type", "==", event_type), ("actor", "==", actor),
+                                      ("domain", "==", domain)):
+                if value is None:
+                    continue
+                field = ds.field(column)
+                term = field >= value if op == ">=" else field <= value if op == "<=" else field == value
+                expr = term if expr is None else expr & term
+            tables.append(ds.dataset(files, schema=schema, format="parquet").to_table(filter=expr))
+
+        watermark = self.watermark()
+        if not watermark or not end_timestamp or end_timestamp >= watermark:
+            tail_start = max(filter(None, (start_timestamp, watermark)), default=None)
+            tail = self.ledger.iter_events(
+                chunk_size=self.chunk_size, start_timestamp=tail_start, end_timestamp=end_timestamp,
+                event_type=event_type, actor=actor, domain=domain
+            )
+            tables.append(events_to_table(tail, self.flatten_payload))
+
+        return pa.concat_tables(tables) if tables else schema.empty_table()
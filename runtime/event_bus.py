@@ -0,0 +1,195 @@
+"""
+Event bus - in-process fan-out of committed ledger events to live subscribers.
+
+The ledger's writer thread publishes each committed batch once. Subscribers with
+identical filters share one matching pass, so the per-write cost grows with the
+number of distinct filters rather than the number of subscribers. Every
+subscription has a bounded buffer; a subscriber that falls behind is flagged as
+overflowed and catches up by reading the ledger instead of holding memory on (or
+blocking) the writer. tail_events wraps that protocol for async consumers such as
+the /api/events/stream endpoints.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+# query_events filters that can be matched against a single event
+LIVE_FILTERS = ("event_type", "actor", "target", "domain", "signal_type", "oracle_tier")
+
+
+class Subscription:
+    """Bounded buffer of committed events matching one filter set."""
+
+    def __init__(self, bus: "EventBus", key: Tuple, max_pending: int,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Initialize subscription; use EventBus.subscribe."""
+        self.bus = bus
+        self.key = key
+        self.max_pending = max_pending
+        self.overflowed = False
+        self.closed = False
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._loop = loop
+        self._ready = asyncio.Event() if loop is not None else None
+
+    @property
+    def filters(self) -> Dict[str, Any]:
+        return dict(self.key)
+
+    def _deliver(self, events: List[dict]) -> None:
+        # Called from the writer thread
+        with self._cond:
+            if self.overflowed:
+                return  # already lagging; the consumer re-reads from the ledger
+            if len(self._pending) + len(events) > self.max_pending:
+                self._pending.clear()
+                self.overflowed = True
+            else:
+                self._pending.extend(events)
+            self._cond.notify()
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._ready.set)
+            except RuntimeError:
+                pass  # event loop already closed
+
+    def _take(self) -> Tuple[List[dict], bool]:
+        with self._cond:
+            events = list(self._pending)
+            self._pending.clear()
+            overflowed, self.overflowed = self.overflowed, False
+        return events, overflowed
+
+    def get(self, timeout: Optional[float] = None) -> Tuple[List[dict], bool]:
+        """Wait for events; returns (events, overflowed)."""
+        with self._cond:
+            if not self._pending and not self.overflowed and not self.closed:
+                self._cond.wait(timeout)
+        return self._take()
+
+    async def get_async(self, timeout: Optional[float] = None) -> Tuple[List[dict], bool]:
+        """Async get; requires a subscription created with an event loop."""
+        self._ready.clear()
+        events, overflowed = self._take()
+        if events or overflowed or self.closed:
+            return events, overflowed
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._take()
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        self.bus._unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._wake()
+
+
+class EventBus:
+    """Fan committed events out to subscriptions grouped by filter set."""
+
+    def __init__(self):
+        """Initialize bus."""
+        # filter key -> tuple of subscriptions; replaced (never mutated) on change so
+        # publish can read it without taking the lock
+        self._groups: Dict[Tuple, Tuple[Subscription, ...]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return bool(self._groups)
+
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._groups.values())
+
+    def subscribe(self, max_pending: int = 1000, loop: Optional[asyncio.AbstractEventLoop] = None,
+                  **filters) -> Subscription:
+        """Subscribe to events matching equality filters (None means any)."""
+        unknown = set(filters) - set(LIVE_FILTERS)
+        if unknown:
+            raise ValueError(f"Cannot filter live events by {sorted(unknown)}; use {list(LIVE_FILTERS)}")
+        key = tuple(sorted((name, value) for name, value in filters.items() if value is not None))
+        subscription = Subscription(self, key, max(1, max_pending), loop)
+        with self._lock:
+            groups = dict(self._groups)
+            groups[key] = groups.get(key, ()) + (subscription,)
+            self._groups = groups
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            groups = dict(self._groups)
+            remaining = tuple(s for s in groups.get(subscription.key, ()) if s is not subscription)
+            if remaining:
+                groups[subscription.key] = remaining
+            else:
+                groups.pop(subscription.key, None)
+            self._groups = groups
+
+    def publish(self, events: List[dict]) -> None:
+        """Deliver committed events (in id order) to every matching subscription."""
+        for key, subscriptions in self._groups.items():
+            matched = events if not key else [
+                event for event in events if all(event.get(name) == value for name, value in key)
+            ]
+            if matched:
+                for subscription in subscriptions:
+                    subscription._deliver(matched)
+
+    def close(self) -> None:
+        """Close every subscription."""
+        for subscriptions in list(self._groups.values()):
+            for subscription in subscriptions:
+                subscription.close()
+
+
+async def tail_events(ledger, after_id: Optional[int] = None, page_size: int = 500,
+                      heartbeat: float = 15.0, max_pending: int = 1000, **filters):
+    """Yield lists of committed events matching filters, oldest first, until the ledger closes.
+
+    With after_id, events after that id are first read from the ledger (resume after
+    reconnect); otherwise the tail starts with events committed from now on. An
+    empty list is yielded after `heartbeat` seconds without events.
+    """
+    subscription = ledger.bus.subscribe(max_pending=max_pending, loop=asyncio.get_running_loop(), **filters)
+    try:
+        catch_up = after_id is not None
+        # Ledger reads block, so they run off the event loop
+        last_id = after_id if catch_up else await asyncio.to_thread(ledger.last_event_id)
+        while True:
+            if catch_up:
+                # Subscribed first, so anything committed while paging is buffered;
+                # the id check below drops what the pages already covered
+                while True:
+                    page = await asyncio.to_thread(ledger.events_after, last_id, limit=page_size, **filters)
+                    if page:
+                        last_id = page[-1]["id"]
+                        yield page
+                    if len(page) < page_size:
+                        break
+                catch_up = False
+
+            events, overflowed = await subscription.get_async(timeout=heartbeat)
+            if overflowed:
+                catch_up = True
+                continue
+            if not events:
+                if subscription.closed:
+                    return
+                yield []
+                continue
+            events = [event for event in events if event["id"] > last_id]
+            if events:
+                last_id = events[-1]["id"]
+                yield events
+    finally:
+        subscription.close()
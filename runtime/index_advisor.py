@@ -0,0 +1,110 @@
+"""
+Index advisor - records the filter shapes of ledger queries and suggests indexes.
+
+Every query_events call is reduced to a shape: which equality filters were used
+and whether a time range or cursor bounded it. The advisor keeps per-shape
+counts and latencies, captures EXPLAIN QUERY PLAN output for slow queries, and
+reports the (equality columns..., timestamp) index that would serve each shape
+together with whether an existing index already does.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Equality-filter columns in the order suggested indexes list them
+EQUALITY_COLUMNS = ("actor", "target", "domain", "event_type", "signal_type", "oracle_tier")
+RANGE_FILTERS = ("start_timestamp", "end_timestamp", "cursor")
+# Short column names used in ledger index names (idx_events_type_time, ...)
+INDEX_NAME_PARTS = {"event_type": "type", "timestamp": "time", "signal_type": "signal", "oracle_tier": "oracle"}
+
+Shape = Tuple[Tuple[str, ...], bool]
+
+
+class IndexAdvisor:
+    """Collect query shapes and suggest composite indexes for them."""
+
+    def __init__(self, slow_query_ms: float = 50.0, max_slow_queries: int = 20):
+        """Initialize advisor."""
+        self.slow_query_ms = slow_query_ms
+        self.shapes: Dict[Shape, Dict[str, Any]] = {}
+        self.slow_queries: deque = deque(maxlen=max_slow_queries)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def shape_of(filters: Dict[str, Any]) -> Shape:
+        """Reduce query filters to (equality columns, has range)."""
+        equality = tuple(col for col in EQUALITY_COLUMNS if filters.get(col) is not None)
+        return equality, any(filters.get(f) for f in RANGE_FILTERS)
+
+    def observe(self, filters: Dict[str, Any], elapsed: float,
+                explain: Optional[Callable[[], List[str]]] = None) -> None:
+        """Record one query; `explain` is only called when the query was slow."""
+        shape = self.shape_of(filters)
+        elapsed_ms = elapsed * 1000
+        with self.lock:
+            stats = self.shapes.get(shape)
+            if stats is None:
+                stats = self.shapes[shape] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+        if elapsed_ms >= self.slow_query_ms:
+            plan = explain() if explain else []
+            with self.lock:
+                self.slow_queries.append({
+                    "shape": self._describe(shape),
+                    "elapsed_ms": round(elapsed_ms, 3),
+                    "observed_at": time.time(),
+                    "plan": plan,
+                })
+
+    @staticmethod
+    def suggested_columns(shape: Shape) -> Tuple[str, ...]:
+        """Equality columns first, then timestamp for the range and ORDER BY."""
+        return shape[0] + ("timestamp",)
+
+    @staticmethod
+    def is_served_by(shape: Shape, index_columns: Sequence[str]) -> bool:
+        """True when the index seeks all equality filters and then walks timestamp."""
+        equality = shape[0]
+        prefix = tuple(index_columns[:len(equality)])
+        rest = tuple(index_columns[len(equality):])
+        return set(prefix) == set(equality) and rest[:1] == ("timestamp",)
+
+    def report(self, existing_indexes: Dict[str, Sequence[str]], table: str = "events") -> List[Dict[str, Any]]:
+        """Per-shape statistics and index suggestions, busiest shapes first."""
+        with self.lock:
+            shapes = {shape: dict(stats) for shape, stats in self.shapes.items()}
+
+        report = []
+        for shape, stats in shapes.items():
+            serving = [name for name, cols in existing_indexes.items() if self.is_served_by(shape, cols)]
+            columns = self.suggested_columns(shape)
+            name = "idx_{}_{}".format(table, "_".join(INDEX_NAME_PARTS.get(c, c) for c in columns))
+            report.append({
+                "shape": self._describe(shape),
+                "count": stats["count"],
+                "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                "max_ms": round(stats["max_ms"], 3),
+                "served_by": serving,
+                "suggested_index": None if serving else
+                    f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)})",
+            })
+        report.sort(key=lambda r: r["count"] * r["avg_ms"], reverse=True)
+        return report
+
+    def get_slow_queries(self) -> List[Dict[str, Any]]:
+        """Most recent slow queries with their query plans."""
+        with self.lock:
+            return list(self.slow_queries)
+
+    @staticmethod
+    def _describe(shape: Shape) -> str:
+        equality, ranged = shape
+        parts = [f"{col} = ?" for col in equality]
+        if ranged:
+            parts.append("timestamp range")
+        return " AND ".join(parts) or "(no filters)"
@@ -1,23 +1,269 @@
 import sqlite3
+import base64
 import json
+import logging
 import os
+import queue
+import re
 import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+
+from .event_bus import EventBus
+
+logger = logging.getLogger(__name__)
+
+EVENT_COLUMNS = (
+    'event_type', 'actor', 'target', 'domain', 'signal_type', 'oracle_tier',
+    'random_seed', 'completion_promise', 'verification_method', 'payload_json',
+    'cost_tokens', 'cost_usd', 'cost_carbon'
+)
+
+# Connection tuning. WAL lets readers run while the writer commits; synchronous=NORMAL
+# is the usual WAL pairing (consistent after a crash, last commits may be lost on power cut).
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -64 * 1024,  # negative means KiB
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# Pragmas that need a writable connection
+WRITER_ONLY_PRAGMAS = {"journal_mode"}
+
+_STOP = object()
+
+# A NULL timestamp falls back to the same default the column uses.
+INSERT_EVENT_SQL = """
+    INSERT INTO events (timestamp, {columns})
+    VALUES (COALESCE(?, strftime('%Y-%m-%dT%H:%M:%f','now')), {placeholders})
+""".format(columns=", ".join(EVENT_COLUMNS), placeholders=", ".join("?" for _ in EVENT_COLUMNS))
+
+
+def format_timestamp(dt: datetime) -> str:
+    # Matches strftime('%Y-%m-%dT%H:%M:%f','now') so supplied timestamps sort with the rest
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{dt.microsecond // 1000:03d}"
+
+
+def utc_timestamp():
+    # format_timestamp(datetime.now(timezone.utc)) at a third of the cost; it stamps every event
+    ms = int(time.time() * 1000)
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(ms // 1000)) + f".{ms % 1000:03d}"
+
+
+# Partitioned storage: one events_<bucket> table per day or month
+PARTITION_KEY_LENGTH = {"day": 10, "month": 7}
+_PARTITION_KEY = re.compile(r"^\d{4}-\d{2}(-\d{2})?$")
+
+INSERT_PARTITION_SQL = """
+    INSERT INTO {{table}} (id, timestamp, {columns})
+    VALUES (?, ?, {placeholders})
+""".format(columns=", ".join(EVENT_COLUMNS), placeholders=", ".join("?" for _ in EVENT_COLUMNS))
+
+
+def partition_bounds(timestamp: str, partition_by: str):
+    # (table name, bucket start, next bucket start) for the bucket a timestamp falls in
+    key = timestamp[:PARTITION_KEY_LENGTH[partition_by]]
+    if not _PARTITION_KEY.match(key) or len(key) != PARTITION_KEY_LENGTH[partition_by]:
+        raise ValueError(f"Cannot partition event with timestamp {timestamp!r}")
+    if partition_by == "day":
+        end = (date.fromisoformat(key) + timedelta(days=1)).isoformat()
+    else:
+        year, month = int(key[:4]), int(key[5:7])
+        end = f"{year + month // 12:04d}-{month % 12 + 1:02d}"
+    return f"events_{key.replace('-', '')}", key, end
+
+
+def event_row(event_type: str, actor: str, target: str = None, domain: str = None,
+              signal_type: str = None, oracle_tier: int = None, random_seed: int = None,
+              completion_promise: str = None, verification_method: str = None,
+              payload_json: dict = None, cost_tokens: int = None, cost_usd: float = None,
+              cost_carbon: float = None, timestamp: str = None):
+    # Parameter tuple for INSERT_EVENT_SQL; unknown keys raise TypeError like a bad kwarg would
+    if payload_json is not None and isinstance(payload_json, dict):
+        payload_json = json.dumps(payload_json)
+    if isinstance(timestamp, datetime):
+        timestamp = format_timestamp(timestamp)
+    return (
+        timestamp, event_type, actor, target, domain, signal_type, oracle_tier,
+        random_seed, completion_promise, verification_method, payload_json,
+        cost_tokens, cost_usd, cost_carbon
+    )
+
+
+# Cost rollups: three-currency totals per (actor, domain, event_type) and time bucket.
+# The writer thread sums what each transaction inserts and upserts the totals, one row
+# per key, just before it commits. The bucket is the timestamp prefix of the given
+# length. A NULL domain is stored as ''.
+COST_GRAINS = {"minute": 16, "hour": 13, "day": 10}
+ROLLUP_KEYS = ("actor", "domain", "event_type")
+
+COST_ROLLUP_UPSERT = """
+    INSERT INTO cost_rollups (grain, bucket, actor, domain, event_type, events, cost_tokens, cost_usd, cost_carbon)
+    {source}
+    ON CONFLICT DO UPDATE SET
+        events = events + excluded.events,
+        cost_tokens = cost_tokens + excluded.cost_tokens,
+        cost_usd = cost_usd + excluded.cost_usd,
+        cost_carbon = cost_carbon + excluded.cost_carbon;
+"""
+
+INSERT_COST_TOTALS_SQL = COST_ROLLUP_UPSERT.format(source="VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+def add_costs(totals: dict, row) -> None:
+    # Add an event_row tuple (timestamp filled in) to {(grain, bucket, actor, domain,
+    # event_type): [events, cost_tokens, cost_usd, cost_carbon]}
+    timestamp, event_type, actor, domain = row[0], row[1], row[2], row[4] or ''
+    for grain, length in COST_GRAINS.items():
+        key = (grain, timestamp[:length], actor, domain, event_type)
+        total = totals.get(key)
+        if total is None:
+            total = totals[key] = [0, 0, 0.0, 0.0]
+        total[0] += 1
+        total[1] += row[11] or 0
+        total[2] += row[12] or 0
+        total[3] += row[13] or 0
+
+
+class _EventInsert:
+    # A queued single-event write; the writer inserts runs of these with one executemany
+
+    __slots__ = ("ledger", "row")
+
+    def __init__(self, ledger, row):
+        self.ledger = ledger
+        self.row = row
+
+    def __call__(self, conn):
+        return self.ledger._insert_rows(conn, [self.row])[0]
+
+
+def event_dict(event_id: int, row) -> dict:
+    # The query_events shape of an event_row tuple, for publishing without a re-read
+    event = {"id": event_id, "timestamp": row[0]}
+    event.update(zip(EVENT_COLUMNS, row[1:]))
+    return event
+
+
+def encode_cursor(event) -> str:
+    # Opaque keyset cursor for the position just after this event in (timestamp, id) DESC order
+    raw = json.dumps([event['timestamp'], event['id']]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, event_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(timestamp, str) or not isinstance(event_id, int):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return timestamp, event_id
+
 
 class EventLedger:
-    def __init__(self, db_path='data/events.db'):
+    def __init__(self, db_path='data/events.db', group_commit: bool = False,
+                 batch_size: int = 1000, flush_interval: float = 0.05,
+                 pragmas: dict = None, read_pool_size: int = 4,
+                 partition_by: str = None, auto_seal: bool = True, advisor=None):
+        if partition_by is not None and partition_by not in PARTITION_KEY_LENGTH:
+            raise ValueError(f"partition_by must be one of {sorted(PARTITION_KEY_LENGTH)}")
         self.db_path = db_path
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        # Partitioned mode writes each event to an events_<bucket> table (registered in
+        # event_partitions) so index size and write cost stay flat as history grows.
+        # Ids stay globally unique via event_sequence. Closed buckets can be sealed
+        # (read-only) and, once archived, dropped. The original events table is still
+        # read as the oldest partition.
+        self.partition_by = partition_by
+        self.auto_seal = auto_seal
+        self._known_partitions = set()  # writer-thread cache of partitions that exist
+        # Optional IndexAdvisor (runtime/index_advisor.py) fed by every query_events call
+        self.advisor = advisor
+        # Live subscribers; the writer publishes each batch here once it has committed
+        self.bus = EventBus()
+        # Writer-thread record of what the open transaction inserted: (id, row) pairs, or
+        # id ranges for bulk inserts, which are re-read only if someone is subscribed
+        self._published = []
+        # Writer-thread cost totals (see add_costs) of the open transaction's finished
+        # jobs, and of the job running now
+        self._costs = {}
+        self._job_costs = {}
         self._ensure_data_directory_exists()
         self._local = threading.local()
         # Initial table creation from the main thread
         self._create_table()
 
+        # Group commit: submit_event's writes may wait up to flush_interval so that many
+        # events share one commit; record_event and other writes still commit at once.
+        self.group_commit = group_commit
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+
+        # Every write goes through a single writer thread, which commits whatever is
+        # queued in one transaction. Reads use a pool of read-only connections.
+        self._write_queue = queue.Queue()
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(target=self._writer_loop, name="ledger-writer", daemon=True)
+        self._writer.start()
+
+        self.read_pool_size = max(1, read_pool_size)
+        self._read_pool = queue.LifoQueue()
+        self._read_pool_lock = threading.Lock()
+        self._read_connections = 0
+
     @property
     def conn(self):
+        # Thread-local read/write connection for ad-hoc access; the ledger's own
+        # writes go through the writer thread.
         if not hasattr(self._local, 'conn') or self._local.conn is None:
-            self._local.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self._local.conn.row_factory = sqlite3.Row
+            self._local.conn = self._connect()
         return self._local.conn
 
+    def _connect(self, readonly: bool = False):
+        timeout = self.pragmas.get("busy_timeout", 5000) / 1000
+        if readonly:
+            uri = Path(os.path.abspath(self.db_path)).as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=timeout, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            if readonly and name in WRITER_ONLY_PRAGMAS:
+                continue
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    @contextmanager
+    def _reader(self):
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            with self._read_pool_lock:
+                create = self._read_connections < self.read_pool_size
+                if create:
+                    self._read_connections += 1
+            conn = self._connect(readonly=True) if create else self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._read_pool.put(conn)
+
     def _ensure_data_directory_exists(self):
         dirname = os.path.dirname(self.db_path)
         if dirname and not os.path.exists(dirname):
@@ -25,8 +271,70 @@ class EventLedger:
 
     def _create_table(self):
         cursor = self.conn.cursor()
+        backfill_rollups = not cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cost_rollups'"
+        ).fetchone()
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS events (
+            CREATE TABLE IF NOT EXISTS cost_rollups (
+                grain       TEXT NOT NULL,
+                bucket      TEXT NOT NULL,
+                actor       TEXT NOT NULL,
+                domain      TEXT NOT NULL,
+                event_type  TEXT NOT NULL,
+                events      INTEGER NOT NULL,
+                cost_tokens INTEGER NOT NULL,
+                cost_usd    REAL NOT NULL,
+                cost_carbon REAL NOT NULL,
+                PRIMARY KEY (grain, bucket, actor, domain, event_type)
+            ) WITHOUT ROWID
+        """)
+        self._create_events_table(cursor, "events")
+        if self.partition_by:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS event_partitions (
+                    name            TEXT PRIMARY KEY,
+                    start_timestamp TEXT NOT NULL,
+                    end_timestamp   TEXT NOT NULL,
+                    sealed          INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            cursor.execute("CREATE TABLE IF NOT EXISTS event_sequence (next_id INTEGER NOT NULL)")
+            cursor.execute("""
+                INSERT INTO event_sequence (next_id)
+                SELECT COALESCE(MAX(id), 0) + 1 FROM events
+                WHERE NOT EXISTS (SELECT 1 FROM event_sequence)
+            """)
+        else:
+            # Ids of partitioned events come from event_sequence, not the events table
+            partitioned = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'event_partitions'"
+            ).fetchone()
+            if partitioned and cursor.execute("SELECT 1 FROM event_partitions LIMIT 1").fetchone():
+                raise ValueError(f"{self.db_path} holds a partitioned ledger; open it with partition_by")
+        if backfill_rollups:
+            # Ledger created before rollups existed: aggregate its history once
+            tables = ["events"]
+            if self.partition_by:
+                tables += [row[0] for row in cursor.execute("SELECT name FROM event_partitions")]
+            for table in tables:
+                self._backfill_cost_rollups(cursor, table)
+        self.conn.commit()
+
+    def _backfill_cost_rollups(self, cursor, table):
+        grains = ", ".join(f"('{grain}', {length})" for grain, length in COST_GRAINS.items())
+        cursor.execute(COST_ROLLUP_UPSERT.format(source=f"""
+            WITH grains(grain, length) AS (VALUES {grains})
+            SELECT grain, substr(timestamp, 1, length), actor, COALESCE(domain, ''), event_type, COUNT(*),
+                   COALESCE(SUM(cost_tokens), 0), COALESCE(SUM(cost_usd), 0), COALESCE(SUM(cost_carbon), 0)
+            FROM {table}, grains
+            WHERE true
+            GROUP BY 1, 2, 3, 4, 5
+        """))
+
+    def _create_events_table(self, cursor, table):
+        # Same schema, indexes and append-only triggers for events and every partition
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
                 id                  INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp           TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f','now')),
                 event_type          TEXT NOT NULL,
@@ -44,65 +352,449 @@ class EventLedger:
                 cost_carbon         REAL
             )
         """)
-        # Create indexes as defined in ADR-001
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_type ON events(event_type)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_actor ON events(actor)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_domain ON events(domain)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_signal ON events(signal_type)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_oracle ON events(oracle_tier)")
+        # Create indexes as defined in ADR-001. Filter columns are indexed together with
+        # timestamp so a filtered, newest-first page is one index range walk with no
+        # sort step; the leading column still serves plain equality lookups, which is
+        # why the original single-column type/actor/domain indexes are dropped.
+        for name in ("type", "actor", "domain"):
+            cursor.execute(f"DROP INDEX IF EXISTS idx_{table}_{name}")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_type_time ON {table}(event_type, timestamp)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_actor_time ON {table}(actor, timestamp)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_domain_time ON {table}(domain, timestamp)")
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_domain_type_time ON {table}(domain, event_type, timestamp)"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_timestamp ON {table}(timestamp)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_signal ON {table}(signal_type)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_oracle ON {table}(oracle_tier)")
+
+        # Ledgers from before writer-side cost rollups kept them with a per-row trigger
+        cursor.execute(f"DROP TRIGGER IF EXISTS rollup_costs_{table}")
 
         # Append-only enforcement: triggers to prevent UPDATE and DELETE (ADR-001)
-        cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS prevent_update_events
-            BEFORE UPDATE ON events
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS prevent_update_{table}
+            BEFORE UPDATE ON {table}
             BEGIN
                 SELECT RAISE(ABORT, 'Event ledger is append-only: UPDATE not allowed');
             END
         """)
-        cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS prevent_delete_events
-            BEFORE DELETE ON events
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS prevent_delete_{table}
+            BEFORE DELETE ON {table}
             BEGIN
                 SELECT RAISE(ABORT, 'Event ledger is append-only: DELETE not allowed');
             END
         """)
-        self.conn.commit()
+
+    def _ensure_partition(self, conn, timestamp):
+        table, start, end = partition_bounds(timestamp, self.partition_by)
+        if table not in self._known_partitions:
+            self._create_events_table(conn, table)
+            created = conn.execute(
+                "INSERT OR IGNORE INTO event_partitions (name, start_timestamp, end_timestamp) VALUES (?, ?, ?)",
+                (table, start, end)
+            ).rowcount
+            self._known_partitions.add(table)
+            # Rolling over into the current bucket closes the previous ones
+            if created and self.auto_seal and start == partition_bounds(utc_timestamp(), self.partition_by)[1]:
+                self._seal_before(conn, start)
+        return table
+
+    def _insert_partitioned(self, conn, rows):
+        # Hands out a contiguous block of ids, then inserts each row into its bucket's table
+        rows = list(self._costed(rows))
+        conn.execute("UPDATE event_sequence SET next_id = next_id + ?", (len(rows),))
+        first = conn.execute("SELECT next_id FROM event_sequence").fetchone()[0] - len(rows)
+        by_table = defaultdict(list)
+        for event_id, row in enumerate(rows, start=first):
+            by_table[self._ensure_partition(conn, row[0])].append((event_id,) + row)
+        for table, table_rows in by_table.items():
+            conn.executemany(INSERT_PARTITION_SQL.format(table=table), table_rows)
+        ids = list(range(first, first + len(rows)))
+        self._published.extend(zip(ids, rows))
+        return ids
+
+    def _seal_before(self, conn, before):
+        sealed = []
+        for (name,) in conn.execute(
+            "SELECT name FROM event_partitions WHERE sealed = 0 AND end_timestamp <= ?", (before,)
+        ).fetchall():
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS prevent_insert_{name}
+                BEFORE INSERT ON {name}
+                BEGIN
+                    SELECT RAISE(ABORT, 'Event ledger partition is sealed: INSERT not allowed');
+                END
+            """)
+            conn.execute("UPDATE event_partitions SET sealed = 1 WHERE name = ?", (name,))
+            sealed.append(name)
+        return sealed
+
+    def seal_partitions(self, before: str = None):
+        # Makes every partition that ends on or before `before` (default: the start of
+        # the current bucket) read-only. Returns the names sealed.
+        if not self.partition_by:
+            return []
+        before = before or partition_bounds(utc_timestamp(), self.partition_by)[1]
+        return self.submit_write(lambda conn: self._seal_before(conn, before)).result()
+
+    def drop_partition(self, name: str):
+        # Retention: removes a sealed partition, e.g. once LedgerArchive has copied it
+        def drop(conn):
+            row = conn.execute("SELECT sealed FROM event_partitions WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise ValueError(f"Unknown partition: {name}")
+            if not row[0]:
+                raise ValueError(f"Partition {name} is not sealed")
+            conn.execute(f"DROP TABLE {name}")
+            conn.execute("DELETE FROM event_partitions WHERE name = ?", (name,))
+            self._known_partitions.discard(name)
+
+        self.submit_write(drop).result()
+
+    def partitions(self):
+        with self._reader() as conn:
+            return [dict(row) for row in conn.execute(
+                "SELECT * FROM event_partitions ORDER BY start_timestamp"
+            ).fetchall()] if self.partition_by else []
+
+    def _storage_tables(self, conn):
+        # (table, lowest timestamp, highest timestamp bound) for every table holding events,
+        # newest first. The legacy events table is bounded by its actual contents.
+        if not self.partition_by:
+            return [("events", "", "\uffff")]
+        tables = [
+            (row[0], row[1], row[2]) for row in conn.execute(
+                "SELECT name, start_timestamp, end_timestamp FROM event_partitions ORDER BY end_timestamp DESC"
+            )
+        ]
+        low = conn.execute("SELECT MIN(timestamp) FROM events").fetchone()[0]
+        if low is not None:
+            high = conn.execute("SELECT MAX(timestamp) FROM events").fetchone()[0]
+            tables.append(("events", low, high))
+            tables.sort(key=lambda t: t[2], reverse=True)
+        return tables
+
+    def _overlapping_tables(self, conn, lower, upper):
+        # The _storage_tables that can hold events in [lower, upper], newest first
+        return [(table, start, end) for table, start, end in self._storage_tables(conn)
+                if not ((lower and end < lower) or (upper and start > upper))]
 
     def record_event(self, event_type: str, actor: str, target: str = None, domain: str = None,
                      signal_type: str = None, oracle_tier: int = None, random_seed: int = None,
                      completion_promise: str = None, verification_method: str = None,
                      payload_json: dict = None, cost_tokens: int = None, cost_usd: float = None,
                      cost_carbon: float = None):
-        
-        # Ensure payload_json is a string if not None
-        if payload_json is not None and isinstance(payload_json, dict):
-            payload_json = json.dumps(payload_json)
+        # Returns the new event's id once it is committed, in either mode. Concurrent
+        # callers still share commits; submit_event is the form that does not wait.
+        row = event_row(
+            event_type, actor, target, domain, signal_type, oracle_tier,
+            random_seed, completion_promise, verification_method, payload_json,
+            cost_tokens, cost_usd, cost_carbon,
+            # Stamp now rather than at commit time so the timestamp reflects when it happened
+            timestamp=utc_timestamp()
+        )
+        return self._submit_row(row, urgent=True).result()
 
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO events (
-                event_type, actor, target, domain, signal_type, oracle_tier,
-                random_seed, completion_promise, verification_method, payload_json,
-                cost_tokens, cost_usd, cost_carbon
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                event_type, actor, target, domain, signal_type, oracle_tier,
-                random_seed, completion_promise, verification_method, payload_json,
-                cost_tokens, cost_usd, cost_carbon
-            )
+    def submit_event(self, event_type: str, actor: str, target: str = None, domain: str = None,
+                     signal_type: str = None, oracle_tier: int = None, random_seed: int = None,
+                     completion_promise: str = None, verification_method: str = None,
+                     payload_json: dict = None, cost_tokens: int = None, cost_usd: float = None,
+                     cost_carbon: float = None) -> Future:
+        # Queues the event and returns a Future that resolves to its id once the batch
+        # containing it is committed. With group_commit the batch may wait up to
+        # flush_interval for more events, so callers that do not need the id at once
+        # (e.g. executors logging task events) can record at batch speed.
+        row = event_row(
+            event_type, actor, target, domain, signal_type, oracle_tier,
+            random_seed, completion_promise, verification_method, payload_json,
+            cost_tokens, cost_usd, cost_carbon, timestamp=utc_timestamp()
         )
-        self.conn.commit()
-        return cursor.lastrowid
+        return self._submit_row(row, urgent=not self.group_commit)
+
+    def _submit_row(self, row, urgent: bool) -> Future:
+        # Partitioned inserts run several statements, so they need the savepoint
+        return self.submit_write(_EventInsert(self, row), urgent=urgent, savepoint=bool(self.partition_by))
+
+    def _costed(self, rows):
+        # Writer thread: stamp rows that have no timestamp and add them to the running
+        # job's cost totals as they pass through to the insert
+        for row in rows:
+            if not row[0]:
+                row = (utc_timestamp(),) + row[1:]
+            add_costs(self._job_costs, row)
+            yield row
+
+    def _insert_rows(self, conn, rows):
+        # Writer thread: insert event_row tuples, returning their ids in order
+        if self.partition_by:
+            return self._insert_partitioned(conn, rows)
+        for row in rows:
+            add_costs(self._job_costs, row)
+        if len(rows) == 1:
+            ids = [conn.execute(INSERT_EVENT_SQL, rows[0]).lastrowid]
+        else:
+            conn.executemany(INSERT_EVENT_SQL, rows)
+            # AUTOINCREMENT hands the single writer a contiguous block of ids
+            last = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'").fetchone()[0]
+            ids = list(range(last - len(rows) + 1, last + 1))
+        self._published.extend(zip(ids, rows))
+        return ids
+
+    def record_events(self, events):
+        # Bulk insert of dicts keyed like record_event's arguments (plus an optional
+        # timestamp), all in one transaction. Accepts any iterable, so generators
+        # stream straight into executemany. Returns the number of rows inserted.
+        return self.submit_events(events).result()
+
+    def submit_events(self, events) -> Future:
+        # record_events without waiting: returns a Future that resolves to the number
+        # of rows inserted once their transaction commits. events is consumed by the
+        # writer thread, so pass a list unless the iterable is safe to read from there.
+        rows = (event_row(**event) for event in events)
+
+        def insert_many(conn):
+            if not self.partition_by:
+                count = conn.executemany(INSERT_EVENT_SQL, self._costed(rows)).rowcount
+                if count:
+                    # AUTOINCREMENT hands the single writer a contiguous block of ids
+                    last = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'").fetchone()[0]
+                    self._published.append(range(last - count + 1, last + 1))
+                return count
+            count = 0
+            while True:
+                chunk = list(islice(rows, 10000))
+                if not chunk:
+                    return count
+                count += len(self._insert_partitioned(conn, chunk))
+
+        return self.submit_write(insert_many)
+
+    def submit_write(self, fn, urgent: bool = True, savepoint: bool = True) -> Future:
+        # Queue fn(conn) for the writer thread. Each call is atomic within the batch
+        # transaction; savepoint=False skips the savepoint for single-statement writes,
+        # which SQLite already rolls back on their own. Urgent writes commit as soon as
+        # the queue is drained; non-urgent ones may wait up to flush_interval for more
+        # work in group-commit mode.
+        future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("EventLedger is closed")
+            self._write_queue.put((fn, future, urgent, savepoint))
+        return future
+
+    def read(self, fn):
+        # Run fn(conn) on a pooled read-only connection, in the calling thread, and
+        # return its result. The read-side counterpart of submit_write for stores that
+        # keep their own tables in the ledger's database; rows are sqlite3.Row.
+        with self._reader() as conn:
+            return fn(conn)
+
+    def flush(self):
+        # Commits everything queued before this call
+        self.submit_write(lambda conn: None, savepoint=False).result()
+
+    def _writer_loop(self):
+        conn = self._connect()
+        conn.isolation_level = None  # explicit BEGIN/COMMIT: one transaction per batch
+        stopping = False
+        while not stopping:
+            job = self._write_queue.get()
+            if job is _STOP:
+                break
+            batch = [job]
+            urgent = job[2] or not self.group_commit
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    if urgent:
+                        job = self._write_queue.get_nowait()
+                    else:
+                        job = self._write_queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stopping = True
+                    break
+                batch.append(job)
+                urgent = urgent or job[2]
+            self._write_batch(conn, batch)
+        # Refresh planner statistics for the indexes above before the writer goes away
+        conn.execute("PRAGMA optimize")
+        conn.close()
+
+    def _write_batch(self, conn, batch):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            jobs = [job for job in batch if job[1].set_running_or_notify_cancel()]
+            start = 0
+            while start < len(jobs):
+                # Consecutive single-event inserts go in as one executemany; if any of
+                # them fails, each is retried on its own so only that one fails
+                end = start
+                while end < len(jobs) and isinstance(jobs[end][0], _EventInsert):
+                    end += 1
+                if end - start > 1:
+                    group = jobs[start:end]
+                    ids, error = self._run_job(conn, lambda c: self._insert_rows(c, [j[0].row for j in group]), True)
+                    if error is None:
+                        results.extend((future, event_id, None) for (_, future, _, _), event_id in zip(group, ids))
+                        start = end
+                        continue
+                fn, future, _, savepoint = jobs[start]
+                results.append((future, *self._run_job(conn, fn, savepoint)))
+                start += 1
+            if self._costs:
+                conn.executemany(INSERT_COST_TOTALS_SQL, [key + tuple(total) for key, total in self._costs.items()])
+                self._costs = {}
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._known_partitions.clear()
+            self._published.clear()
+            self._costs = {}
+            # Fail the whole batch, including futures not yet started when e.g. BEGIN
+            # IMMEDIATE itself gave up on a busy database
+            for _, future, _, _ in batch:
+                if not future.done() and (future.running() or future.set_running_or_notify_cancel()):
+                    future.set_exception(e)
+            return
+        published, self._published = self._published, []
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        # The batch is committed and its writers answered; a failing fan-out must not
+        # take down the only writer thread
+        if published and self.bus.active:
+            try:
+                self.bus.publish(self._published_events(conn, published))
+            except Exception:
+                logger.exception("Could not publish committed events")
+
+    def _run_job(self, conn, fn, savepoint):
+        # (result, None) or (None, error); a failing job (e.g. a constraint violation)
+        # only rolls back itself
+        published = len(self._published)
+        self._job_costs = {}
+        if savepoint:
+            conn.execute("SAVEPOINT write_job")
+        try:
+            result = fn(conn)
+        except Exception as e:
+            if savepoint:
+                conn.execute("ROLLBACK TO write_job")
+            # Partitions created by the rolled-back job no longer exist
+            self._known_partitions.clear()
+            del self._published[published:]
+            return None, e
+        finally:
+            if savepoint:
+                conn.execute("RELEASE write_job")
+        # The job's rows are in, so its costs count towards the transaction's totals
+        for key, total in self._job_costs.items():
+            batch_total = self._costs.get(key)
+            if batch_total is None:
+                self._costs[key] = total
+            else:
+                for i, value in enumerate(total):
+                    batch_total[i] += value
+        return result, None
+
+    def _published_events(self, conn, published):
+        events = []
+        for item in published:
+            if isinstance(item, range):
+                events.extend(dict(row) for row in conn.execute(
+                    "SELECT * FROM events WHERE id BETWEEN ? AND ? ORDER BY id", (item.start, item.stop - 1)
+                ))
+            else:
+                events.append(event_dict(*item))
+        return events
 
     def query_events(self, event_type: str = None, actor: str = None, target: str = None,
                      domain: str = None, signal_type: str = None, oracle_tier: int = None,
                      start_timestamp: str = None, end_timestamp: str = None,
-                     limit: int = 100, offset: int = 0):
-        
-        query = "SELECT * FROM events WHERE 1=1"
+                     limit: int = 100, offset: int = 0, cursor: str = None):
+
+        # Read-your-writes: anything still queued is committed before querying
+        if self.group_commit:
+            self.flush()
+
+        where, params = self._filter_clause(
+            event_type=event_type, actor=actor, target=target, domain=domain,
+            signal_type=signal_type, oracle_tier=oracle_tier,
+            start_timestamp=start_timestamp, end_timestamp=end_timestamp, cursor=cursor
+        )
+
+        started = time.perf_counter()
+        upper = end_timestamp
+        if self.partition_by:
+            if cursor:
+                cursor_timestamp = decode_cursor(cursor)[0]
+                upper = min(upper, cursor_timestamp) if upper else cursor_timestamp
+            rows = self._query_partitions(where, params, limit, offset, start_timestamp, upper)
+        else:
+            query = f"SELECT * FROM events WHERE {where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+            with self._reader() as conn:
+                rows = [dict(row) for row in conn.execute(query, params + [limit, offset]).fetchall()]
+
+        if self.advisor is not None:
+            filters = dict(event_type=event_type, actor=actor, target=target, domain=domain,
+                           signal_type=signal_type, oracle_tier=oracle_tier,
+                           start_timestamp=start_timestamp, end_timestamp=end_timestamp, cursor=cursor)
+            self.advisor.observe(filters, time.perf_counter() - started,
+                                 explain=lambda: self.explain_query(where, params, start_timestamp, upper))
+        return rows
+
+    def explain_query(self, where, params, lower: str = None, upper: str = None):
+        # EXPLAIN QUERY PLAN detail lines for a query_events filter, against the tables
+        # query_events reads: events, or each partition overlapping [lower, upper]
+        # (lines prefixed with the partition name)
+        with self._reader() as conn:
+            tables = [t[0] for t in self._overlapping_tables(conn, lower, upper)]
+            plan = []
+            for table in tables:
+                query = f"SELECT * FROM {table} WHERE {where} ORDER BY timestamp DESC, id DESC LIMIT ?"
+                details = [row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params + [1])]
+                if self.partition_by:
+                    details = [f"{table}: {detail}" for detail in details]
+                plan.extend(details)
+        return plan
+
+    def _index_table(self):
+        # The table new events land in, whose indexes the advisor reports on: the newest
+        # partition when partitioned
+        with self._reader() as conn:
+            tables = self._storage_tables(conn)
+        return tables[0][0] if tables else "events"
+
+    def index_columns(self, table: str = None):
+        # {index name: [columns]} for the table's indexes (default: _index_table), for
+        # IndexAdvisor.report
+        table = table or self._index_table()
+        indexes = {}
+        with self._reader() as conn:
+            for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+                indexes[index["name"]] = [
+                    col["name"] for col in conn.execute(f"PRAGMA index_info({index['name']})").fetchall()
+                ]
+        return indexes
+
+    def index_report(self):
+        if self.advisor is None:
+            raise ValueError("index_report needs an EventLedger created with advisor=IndexAdvisor()")
+        table = self._index_table()
+        return self.advisor.report(self.index_columns(table), table)
+
+    def _filter_clause(self, event_type: str = None, actor: str = None, target: str = None,
+                       domain: str = None, signal_type: str = None, oracle_tier: int = None,
+                       start_timestamp: str = None, end_timestamp: str = None, cursor: str = None):
+        query = "1=1"
         params = []
 
         if event_type:
@@ -129,15 +821,146 @@ class EventLedger:
         if end_timestamp:
             query += " AND timestamp <= ?"
             params.append(end_timestamp)
-        
-        query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+        if cursor:
+            # Keyset pagination: seek past the cursor instead of counting an OFFSET,
+            # so every page costs the same as the first one.
+            query += " AND (timestamp, id) < (?, ?)"
+            params.extend(decode_cursor(cursor))
 
-        cursor = self.conn.cursor()
-        cursor.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+        return query, params
+
+    def _query_partitions(self, where, params, limit, offset, lower, upper):
+        # Visits only partitions overlapping [lower, upper], newest first, and stops as
+        # soon as no older partition can contribute to the requested page.
+        need = limit + offset
+        rows = []
+        with self._reader() as conn:
+            for table, start, end in self._overlapping_tables(conn, lower, upper):
+                if len(rows) >= need and end < rows[need - 1]['timestamp']:
+                    break
+                rows.extend(dict(row) for row in conn.execute(
+                    f"SELECT * FROM {table} WHERE {where} ORDER BY timestamp DESC, id DESC LIMIT ?",
+                    params + [need]
+                ))
+                rows.sort(key=lambda r: (r['timestamp'], r['id']), reverse=True)
+                del rows[need:]
+        return rows[offset:]
+
+    def query_costs(self, grain: str = "hour", start_timestamp: str = None, end_timestamp: str = None,
+                    actor: str = None, domain: str = None, event_type: str = None,
+                    group_by=ROLLUP_KEYS):
+        # Cost totals per bucket from cost_rollups, oldest bucket first. Buckets that
+        # overlap [start_timestamp, end_timestamp] are included whole. group_by picks
+        # which of actor/domain/event_type to break totals down by; the rest are summed.
+        if grain not in COST_GRAINS:
+            raise ValueError(f"grain must be one of {sorted(COST_GRAINS)}")
+        group_by = tuple(group_by)
+        unknown = set(group_by) - set(ROLLUP_KEYS)
+        if unknown:
+            raise ValueError(f"Cannot group costs by {sorted(unknown)}; use {list(ROLLUP_KEYS)}")
+
+        if self.group_commit:
+            self.flush()
+
+        length = COST_GRAINS[grain]
+        query = "grain = ?"
+        params = [grain]
+        if start_timestamp:
+            query += " AND bucket >= ?"
+            params.append(start_timestamp[:length])
+        if end_timestamp:
+            query += " AND bucket <= ?"
+            params.append(end_timestamp[:length])
+        for column, value in (("actor", actor), ("domain", domain), ("event_type", event_type)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+
+        keys = ", ".join(("bucket",) + group_by)
+        with self._reader() as conn:
+            rows = [dict(row) for row in conn.execute(f"""
+                SELECT {keys}, SUM(events) AS events, SUM(cost_tokens) AS cost_tokens,
+                       SUM(cost_usd) AS cost_usd, SUM(cost_carbon) AS cost_carbon
+                FROM cost_rollups WHERE {query}
+                GROUP BY {keys} ORDER BY {keys}
+            """, params)]
+        if "domain" in group_by:
+            for row in rows:
+                row["domain"] = row["domain"] or None
+        return rows
+
+    def events_after(self, after_id: int, limit: int = 1000, **filters):
+        # Events with id > after_id in id (commit) order; how live tails catch up.
+        # Takes the equality filters of query_events.
+        where, params = self._filter_clause(**filters)
+        rows = []
+        with self._reader() as conn:
+            for table, _, _ in self._storage_tables(conn):
+                rows.extend(dict(row) for row in conn.execute(
+                    f"SELECT * FROM {table} WHERE id > ? AND {where} ORDER BY id LIMIT ?",
+                    [after_id] + params + [limit]
+                ))
+        rows.sort(key=lambda r: r["id"])
+        return rows[:limit]
+
+    def last_event_id(self):
+        with self._reader() as conn:
+            if self.partition_by:
+                return conn.execute("SELECT next_id - 1 FROM event_sequence").fetchone()[0]
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'").fetchone()
+            return row[0] if row else 0
+
+    def event_days(self, start: str = None, before: str = None):
+        # Distinct YYYY-MM-DD days that have events, oldest first. Hops from day to day
+        # with one index seek each instead of scanning every row.
+        days = set()
+        with self._reader() as conn:
+            for table, low, high in self._storage_tables(conn):
+                if (start and high < start) or (before and low >= before):
+                    continue
+                day_start = start or ""
+                while True:
+                    ts = conn.execute(
+                        f"SELECT MIN(timestamp) FROM {table} WHERE timestamp >= ?", (day_start,)
+                    ).fetchone()[0]
+                    if ts is None or (before and ts >= before):
+                        break
+                    days.add(ts[:10])
+                    day_start = (date.fromisoformat(ts[:10]) + timedelta(days=1)).isoformat()
+        return sorted(days)
+
+    def iter_event_chunks(self, chunk_size: int = 1000, **filters):
+        # Walks every matching event (newest first) in keyset-paged chunks. Each chunk is
+        # its own short read, so memory stays flat and no read transaction is held open
+        # for the whole walk. Takes the same filters as query_events.
+        cursor = None
+        while True:
+            chunk = self.query_events(limit=chunk_size, cursor=cursor, **filters)
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            cursor = encode_cursor(chunk[-1])
+
+    def iter_events(self, chunk_size: int = 1000, **filters):
+        for chunk in self.iter_event_chunks(chunk_size=chunk_size, **filters):
+            yield from chunk
 
     def close(self):
+        with self._submit_lock:
+            if not self._closed:
+                self._closed = True
+                self._write_queue.put(_STOP)
+        if self._writer.is_alive() and threading.current_thread() is not self._writer:
+            self._writer.join()
+        # Only now, so events still queued at close reach live tails too
+        self.bus.close()
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
         if hasattr(self._local, 'conn') and self._local.conn is not None:
             self._local.conn.close()
             self._local.conn = None
@@ -1,14 +1,19 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from typing import Optional, Dict, Any, List
 import datetime
 import json
 import os
 import csv
+import threading
 import io
+import zlib
 
-from .ledger import EventLedger # Import the EventLedger class
+from .ledger import EventLedger, EVENT_COLUMNS, encode_cursor # Import the EventLedger class
+from .archive import pq, event_schema, events_to_table
+from .index_advisor import IndexAdvisor
+from .event_bus import tail_events
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -17,14 +22,20 @@ app = FastAPI(
     version="1.0.0",
 )
 
-# Initialize EventLedger
-# Assuming data/events.db is relative to the project root,
-# but the ledger expects it relative to where the script is run
-# or absolute. For FastAPI, it's usually relative to the project root
-# where uvicorn is started.
+# The EventLedger is opened on first use, not at import, so importing the app (e.g.
+# in tests, which set `ledger` themselves) never touches the real database. Its path
+# comes from EVENT_LEDGER_DB, else data/events.db at the project root.
 script_dir = os.path.dirname(__file__)
-db_path = os.path.join(script_dir, "..", "data", "events.db")
-ledger = EventLedger(db_path=os.path.abspath(db_path))
+db_path = os.getenv("EVENT_LEDGER_DB", os.path.join(script_dir, "..", "data", "events.db"))
+ledger: Optional[EventLedger] = None
+_ledger_lock = threading.Lock()
+
+def get_ledger() -> EventLedger:
+    global ledger
+    with _ledger_lock:
+        if ledger is None:
+            ledger = EventLedger(db_path=os.path.abspath(db_path), advisor=IndexAdvisor())
+        return ledger
 
 # Pydantic model for the POST /api/events request body
 class EventCreate(BaseModel):
@@ -46,7 +57,7 @@ class EventCreate(BaseModel):
 @app.post("/api/events", summary="Record a new event in the ledger")
 async def record_event_endpoint(event: EventCreate):
     try:
-        event_id = ledger.record_event(
+        event_id = get_ledger().record_event(
             event_type=event.event_type,
             actor=event.actor,
             target=event.target,
@@ -65,6 +76,72 @@ async def record_event_endpoint(event: EventCreate):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
 
+# Bulk ingest rows may carry their own (e.g. simulated) timestamp
+class EventIngest(EventCreate):
+    timestamp: Optional[datetime.datetime] = None
+
+BATCH_MEDIA_TYPES = ("application/json", "application/x-ndjson", "application/ndjson")
+
+def _parse_event_batch(body: bytes, content_type: str) -> List[Any]:
+    """Split a JSON array, single JSON object or NDJSON body into raw rows; bad NDJSON lines become errors."""
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type and media_type not in BATCH_MEDIA_TYPES:
+        raise HTTPException(status_code=415, detail=f"Content-Type must be one of {', '.join(BATCH_MEDIA_TYPES)}")
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Body is not valid UTF-8: {e}")
+    if "ndjson" not in media_type and text.lstrip().startswith("["):
+        try:
+            rows = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON array: {e}")
+        return rows
+    if "ndjson" not in media_type and text.lstrip().startswith("{"):
+        # One (possibly pretty-printed) object is a batch of one; anything else that
+        # starts with "{" is read as NDJSON below
+        try:
+            return [json.loads(text)]
+        except json.JSONDecodeError:
+            pass
+
+    rows = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            rows.append(e)
+    return rows
+
+# Endpoint to record many events at once (JSON array or NDJSON body)
+@app.post("/api/events/batch", summary="Record a batch of events in the ledger")
+@app.post("/api/v1/simulation/ingest", summary="Ingest simulation results (ADR-011)")
+async def record_events_batch_endpoint(request: Request):
+    rows = _parse_event_batch(await request.body(), request.headers.get("content-type", ""))
+
+    # Validate every row; invalid rows are reported instead of failing the batch
+    valid = []
+    errors = []
+    for index, row in enumerate(rows):
+        if isinstance(row, json.JSONDecodeError):
+            errors.append({"index": index, "errors": [{"msg": f"Invalid JSON: {row}"}]})
+            continue
+        try:
+            event = EventIngest.model_validate(row)
+        except ValidationError as e:
+            errors.append({"index": index, "errors": e.errors(include_url=False, include_context=False)})
+            continue
+        valid.append(event.model_dump())
+
+    try:
+        accepted = get_ledger().record_events(valid) if valid else 0
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
+
+    return {"status": "ok", "accepted": accepted, "rejected": len(errors), "errors": errors}
+
 # Endpoint to query events
 @app.get("/api/events", summary="Query events from the ledger")
 async def query_events_endpoint(
@@ -77,14 +154,17 @@ async def query_events_endpoint(
     start: Optional[datetime.datetime] = Query(None, description="Start of time range (ISO 8601)"),
     end: Optional[datetime.datetime] = Query(None, description="End of time range (ISO 8601)"),
     limit: int = Query(100, ge=1, le=1000, description="Max results"),
-    offset: int = Query(0, ge=0, description="Pagination offset")
+    offset: int = Query(0, ge=0, description="Pagination offset (prefer cursor for deep pages)"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page")
 ):
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
     try:
         # Convert datetime objects to ISO 8601 strings for ledger
         start_str = start.isoformat() if start else None
         end_str = end.isoformat() if end else None
 
-        events = ledger.query_events(
+        events = get_ledger().query_events(
             event_type=event_type,
             actor=actor,
             target=target,
@@ -94,8 +174,12 @@ async def query_events_endpoint(
             start_timestamp=start_str,
             end_timestamp=end_str,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
+        # A full page means there may be more; hand back where to continue from
+        next_cursor = encode_cursor(events[-1]) if len(events) == limit else None
+
         # Convert Row objects to dicts and payload_json back to dict
         parsed_events = []
         for event_row in events:
@@ -107,52 +191,221 @@ async def query_events_endpoint(
                     pass # Keep as string if decoding fails
             parsed_events.append(event_dict)
             
-        return {"status": "ok", "data": parsed_events}
+        return {"status": "ok", "data": parsed_events, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
 
-# Endpoint to export events (JSON or CSV format per ADR-002)
-@app.get("/api/events/export", summary="Export all events from the ledger")
-async def export_events_endpoint(
-    format: str = Query("json", pattern="^(json|csv)$", description="Export format: json or csv")
-):
-    try:
-        events = ledger.query_events(limit=1000000)
+EXPORT_FIELDNAMES = ['id', 'timestamp'] + list(EVENT_COLUMNS)
 
-        # Parse events
-        parsed_events = []
-        for event_row in events:
-            event_dict = dict(event_row)
-            if event_dict.get('payload_json') and format == "json":
+def _export_chunks(chunks, format: str):
+    """Render chunks of event dicts as CSV, NDJSON or the JSON envelope, one text block per chunk."""
+    if format == "csv":
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=EXPORT_FIELDNAMES)
+        writer.writeheader()
+        for chunk in chunks:
+            writer.writerows(chunk)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+        yield output.getvalue()
+        return
+
+    if format == "json":
+        yield '{"status": "ok", "data": ['
+    first = True
+    for chunk in chunks:
+        lines = []
+        for event_dict in chunk:
+            if event_dict.get('payload_json'):
                 try:
                     event_dict['payload_json'] = json.loads(event_dict['payload_json'])
                 except json.JSONDecodeError:
                     pass
-            parsed_events.append(event_dict)
+            lines.append(json.dumps(event_dict))
+        if format == "ndjson":
+            yield "\n".join(lines) + "\n"
+        elif lines:
+            yield ("" if first else ", ") + ", ".join(lines)
+            first = False
+    if format == "json":
+        yield ']}'
+
+def _parquet_chunks(chunks):
+    """Write chunks as Parquet row groups, yielding the bytes produced so far after each one."""
+    sink = io.BytesIO()
+    with pq.ParquetWriter(sink, event_schema()) as writer:
+        for chunk in chunks:
+            writer.write_table(events_to_table(chunk))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+def _gzip_stream(blocks):
+    """Compress a stream of text or byte blocks into gzip bytes incrementally."""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for block in blocks:
+        data = compressor.compress(block.encode("utf-8") if isinstance(block, str) else block)
+        if data:
+            yield data
+    yield compressor.flush()
+
+# Endpoint to export events (JSON or CSV format per ADR-002)
+@app.get("/api/events/export", summary="Export all events from the ledger")
+async def export_events_endpoint(
+    format: str = Query("json", pattern="^(json|csv|ndjson|parquet)$", description="Export format: json, csv, ndjson or parquet"),
+    gzip: bool = Query(False, description="Gzip-compress the export"),
+    event_type: Optional[str] = Query(None, description="Filter by event type"),
+    actor: Optional[str] = Query(None, description="Filter by actor (universal entity ID)"),
+    domain: Optional[str] = Query(None, description="Filter by domain"),
+    start: Optional[datetime.datetime] = Query(None, description="Start of time range (ISO 8601)"),
+    end: Optional[datetime.datetime] = Query(None, description="End of time range (ISO 8601)"),
+    chunk_size: int = Query(5000, ge=100, le=50000, description="Rows fetched per database round trip")
+):
+    if format == "parquet" and pq is None:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow on the server")
+
+    # Rows are pulled from the ledger in keyset-paged chunks and rendered as they go,
+    # so memory stays constant no matter how many events are exported.
+    chunks = get_ledger().iter_event_chunks(
+        chunk_size=chunk_size,
+        event_type=event_type,
+        actor=actor,
+        domain=domain,
+        start_timestamp=start.isoformat() if start else None,
+        end_timestamp=end.isoformat() if end else None
+    )
+    body = _parquet_chunks(chunks) if format == "parquet" else _export_chunks(chunks, format)
+
+    media_types = {"json": "application/json", "csv": "text/csv", "ndjson": "application/x-ndjson",
+                   "parquet": "application/vnd.apache.parquet"}
+    filename = f"events.{format}"
+    media_type = media_types[format]
+    if gzip:
+        body = _gzip_stream(body)
+        filename += ".gz"
+        media_type = "application/gzip"
 
-        if format == "csv":
-            # Generate CSV
-            output = io.StringIO()
-            if parsed_events:
-                fieldnames = [
-                    'id', 'timestamp', 'event_type', 'actor', 'target', 'domain',
-                    'signal_type', 'oracle_tier', 'random_seed', 'completion_promise',
-                    'verification_method', 'payload_json', 'cost_tokens', 'cost_usd', 'cost_carbon'
-                ]
-                writer = csv.DictWriter(output, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(parsed_events)
-
-            return StreamingResponse(
-                iter([output.getvalue()]),
-                media_type="text/csv",
-                headers={"Content-Disposition": "attachment; filename=events.csv"}
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+def _decode_payload(event_dict: dict) -> dict:
+    # Decodes into a copy: live events are shared by every subscriber's stream
+    event_dict = dict(event_dict)
+    if event_dict.get('payload_json'):
+        try:
+            event_dict['payload_json'] = json.loads(event_dict['payload_json'])
+        except json.JSONDecodeError:
+            pass # Keep as string if decoding fails
+    return event_dict
+
+# Server-sent events tail of the ledger. Reconnecting clients resume via the
+# standard Last-Event-ID header (or after_id); each message's id is the event id.
+@app.get("/api/events/stream", summary="Live tail of new events (server-sent events)")
+async def stream_events_endpoint(
+    request: Request,
+    event_type: Optional[str] = Query(None, description="Filter by event type"),
+    actor: Optional[str] = Query(None, description="Filter by actor (universal entity ID)"),
+    target: Optional[str] = Query(None, description="Filter by target"),
+    domain: Optional[str] = Query(None, description="Filter by domain"),
+    signal_type: Optional[str] = Query(None, pattern="^(gravity|light|internal)$", description="Filter by signal_type (gravity/light/internal)"),
+    oracle_tier: Optional[int] = Query(None, ge=0, le=4, description="Filter by oracle tier (0-4)"),
+    after_id: Optional[int] = Query(None, ge=0, description="Replay events after this id before going live")
+):
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id:
+        try:
+            after_id = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be an event id")
+
+    async def body():
+        tail = tail_events(
+            get_ledger(), after_id=after_id, event_type=event_type, actor=actor, target=target,
+            domain=domain, signal_type=signal_type, oracle_tier=oracle_tier
+        )
+        async for events in tail:
+            if await request.is_disconnected():
+                break
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            yield "".join(
+                f"id: {event['id']}\nevent: ledger_event\ndata: {json.dumps(_decode_payload(event))}\n\n"
+                for event in events
             )
-        else:
-            return {"status": "ok", "data": parsed_events}
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# WebSocket flavour of the same tail; filters and after_id come from the query string
+@app.websocket("/api/events/stream")
+async def stream_events_websocket(websocket: WebSocket):
+    params = websocket.query_params
+    try:
+        filters = {name: params.get(name) for name in ("event_type", "actor", "target", "domain", "signal_type")}
+        filters["oracle_tier"] = int(params["oracle_tier"]) if params.get("oracle_tier") else None
+        after_id = int(params["after_id"]) if params.get("after_id") else None
+    except ValueError:
+        await websocket.close(code=1008, reason="oracle_tier and after_id must be integers")
+        return
+
+    await websocket.accept()
+    try:
+        async for events in tail_events(get_ledger(), after_id=after_id, **filters):
+            if events:
+                await websocket.send_json({"type": "events", "data": [_decode_payload(e) for e in events]})
+            else:
+                await websocket.send_json({"type": "heartbeat"})
+    except WebSocketDisconnect:
+        pass
+
+# Endpoint to read three-currency cost totals from the ledger's rollup tables
+@app.get("/api/events/costs", summary="Cost totals per time bucket")
+async def event_costs_endpoint(
+    grain: str = Query("hour", pattern="^(minute|hour|day)$", description="Bucket size: minute, hour or day"),
+    start: Optional[datetime.datetime] = Query(None, description="Start of time range (ISO 8601)"),
+    end: Optional[datetime.datetime] = Query(None, description="End of time range (ISO 8601)"),
+    actor: Optional[str] = Query(None, description="Filter by actor (universal entity ID)"),
+    domain: Optional[str] = Query(None, description="Filter by domain"),
+    event_type: Optional[str] = Query(None, description="Filter by event type"),
+    group_by: str = Query("actor,domain,event_type", description="Comma-separated breakdown keys (actor, domain, event_type); empty for bucket totals")
+):
+    try:
+        costs = get_ledger().query_costs(
+            grain=grain,
+            start_timestamp=start.isoformat() if start else None,
+            end_timestamp=end.isoformat() if end else None,
+            actor=actor,
+            domain=domain,
+            event_type=event_type,
+            group_by=[key.strip() for key in group_by.split(",") if key.strip()]
+        )
+        return {"status": "ok", "grain": grain, "data": costs}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
 
+# Endpoint to inspect which query shapes the ledger indexes serve
+@app.get("/api/events/index-advice", summary="Query shapes, latencies and suggested indexes")
+async def index_advice_endpoint():
+    ledger = get_ledger()
+    return {
+        "status": "ok",
+        "shapes": ledger.index_report(),
+        "slow_queries": ledger.advisor.get_slow_queries(),
+    }
 
 # Health check endpoint
 @app.get("/api/health", summary="Health check endpoint")
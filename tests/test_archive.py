@@ -0,0 +1,84 @@
+"""
+Tests for runtime/archive.py - Parquet archive of closed ledger days
+"""
+import unittest
+import os
+import shutil
+from unittest import mock
+from runtime.ledger import EventLedger
+
+try:
+    import pyarrow.parquet as pq
+    from runtime.archive import LedgerArchive
+except ImportError:
+    pq = None
+
+
+@unittest.skipIf(pq is None, "pyarrow not installed")
+class TestLedgerArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_archive.db"
+        self.archive_dir = "data/test_archive"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+        self.ledger = EventLedger(db_path=self.db_path)
+        self.ledger.record_events([
+            {"event_type": "task_running", "actor": "system:workflow_executor", "domain": "test",
+             "timestamp": "2026-01-01T10:00:00.000", "payload_json": {"workflow_id": "wf-1", "execution_id": "ex-1"}},
+            {"event_type": "task_failed", "actor": "system:workflow_executor", "domain": "test",
+             "timestamp": "2026-01-01T23:59:59.999", "payload_json": {"error": "boom"}},
+            {"event_type": "message_sent", "actor": "human:dave", "domain": "communication",
+             "timestamp": "2026-01-03T08:00:00.000"},
+            {"event_type": "message_sent", "actor": "human:dave", "domain": "communication",
+             "timestamp": "2026-01-04T08:00:00.000"},
+        ])
+        self.archive = LedgerArchive(self.ledger, archive_dir=self.archive_dir)
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+
+    def test_event_days(self):
+        self.assertEqual(self.ledger.event_days(), ["2026-01-01", "2026-01-03", "2026-01-04"])
+        self.assertEqual(self.ledger.event_days(before="2026-01-04"), ["2026-01-01", "2026-01-03"])
+
+    def test_archive_closed_days(self):
+        paths = self.archive.archive_closed_days(before="2026-01-04")
+        self.assertEqual(self.archive.archived_days(), ["2026-01-01", "2026-01-03"])
+        self.assertEqual(pq.read_table(paths[0]).num_rows, 2)
+        self.assertEqual(pq.read_table(paths[1]).num_rows, 1)
+        # Already archived days are not rewritten
+        self.assertEqual(self.archive.archive_closed_days(before="2026-01-04"), [])
+        self.assertEqual(self.archive.watermark(), "2026-01-04")
+
+    def test_read_events_spans_archive_and_tail(self):
+        self.archive.archive_closed_days(before="2026-01-04")
+        table = self.archive.read_events()
+        self.assertEqual(sorted(table.column("timestamp").to_pylist()), [
+            "2026-01-01T10:00:00.000", "2026-01-01T23:59:59.999",
+            "2026-01-03T08:00:00.000", "2026-01-04T08:00:00.000",
+        ])
+        dave = self.archive.read_events(actor="human:dave")
+        self.assertEqual(dave.num_rows, 2)
+
+    def test_read_events_before_watermark_skips_sqlite(self):
+        self.archive.archive_closed_days(before="2026-01-04")
+        with mock.patch.object(self.ledger, "iter_events", side_effect=AssertionError("hit SQLite")):
+            table = self.archive.read_events(end_timestamp="2026-01-02")
+        self.assertEqual(table.num_rows, 2)
+
+    def test_flatten_payload(self):
+        archive = LedgerArchive(self.ledger, archive_dir=self.archive_dir, flatten_payload=True)
+        path = archive.archive_day("2026-01-01")
+        rows = {r["event_type"]: r for r in pq.read_table(path).to_pylist()}
+        self.assertEqual(rows["task_running"]["payload_workflow_id"], "wf-1")
+        self.assertEqual(rows["task_failed"]["payload_error"], "boom")
+        self.assertIsNotNone(rows["task_failed"]["payload_json"])
+
+
+if __name__ == '__main__':
+    unittest.main()
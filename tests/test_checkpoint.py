@@ -0,0 +1,110 @@
+"""
+Tests for core/checkpoint.py - durable checkpoints and WorkflowExecutor.resume()
+"""
+import unittest
+import os
+from simdecisions.runtime.ledger import EventLedger
+from simdecisions.core.checkpoint import CheckpointStore, JsonSerializer
+from simdecisions.core.workflow_orchestrator import (
+    WorkflowBuilder, WorkflowExecutor, WorkflowStatus, TaskStatus
+)
+
+
+class TestCheckpointResume(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_checkpoints.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path, group_commit=True)
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def build(self, calls, broken):
+        def step(name, fail=False):
+            def handler(context):
+                calls.append(name)
+                if fail and broken:
+                    raise RuntimeError(f"{name} crashed")
+                return {"step": name, "inputs": sorted(context)}
+            return handler
+
+        builder = WorkflowBuilder(workflow_id="wf-long", name="Long Workflow")
+        builder.add_task(task_id="extract", name="Extract", handler=step("extract"))
+        builder.add_task(task_id="transform", name="Transform", handler=step("transform", fail=True),
+                         depends_on=["extract"])
+        builder.add_task(task_id="load", name="Load", handler=step("load"), depends_on=["transform"])
+        builder.add_task(task_id="report", name="Report", handler=step("report"), depends_on=["extract"])
+        return builder.build()
+
+    def test_resume_after_restart_runs_only_unfinished_tasks(self):
+        calls = []
+        executor = WorkflowExecutor(ledger=self.ledger, checkpoints=CheckpointStore(self.ledger))
+        first = executor.execute(self.build(calls, broken=True))
+        self.assertEqual(first.status, WorkflowStatus.FAILED)
+        self.assertEqual(sorted(calls), ["extract", "report", "transform"])
+
+        # Simulate a restart: fresh ledger, store and executor on the same database
+        self.ledger.close()
+        self.ledger = EventLedger(db_path=self.db_path, group_commit=True)
+        store = CheckpointStore(self.ledger)
+        saved = store.load(first.execution_id)
+        self.assertEqual(saved["status"], "failed")
+        self.assertEqual(saved["tasks"]["extract"]["result"], {"step": "extract", "inputs": []})
+        self.assertEqual(saved["tasks"]["transform"]["status"], "failed")
+
+        calls.clear()
+        executor = WorkflowExecutor(ledger=self.ledger, checkpoints=store)
+        resumed = executor.resume(first.execution_id, self.build(calls, broken=False))
+
+        self.assertEqual(resumed.execution_id, first.execution_id)
+        self.assertEqual(resumed.status, WorkflowStatus.SUCCESS)
+        self.assertEqual(sorted(calls), ["load", "transform"])
+        self.assertTrue(resumed.tasks["extract"].metadata["restored"])
+        self.assertEqual(resumed.tasks["transform"].result, {"step": "transform", "inputs": ["extract"]})
+        self.assertEqual(resumed.outputs["report"], {"step": "report", "inputs": ["extract"]})
+        self.assertEqual(store.load(first.execution_id)["status"], "success")
+        self.assertEqual(len(self.ledger.query_events(event_type="workflow_resumed")), 1)
+
+        # Nothing left to do: a second resume restores everything and runs nothing
+        calls.clear()
+        again = executor.resume(first.execution_id)
+        self.assertEqual(again.status, WorkflowStatus.SUCCESS)
+        self.assertEqual(calls, [])
+
+    def test_unserializable_results_rerun(self):
+        calls = []
+
+        def handler(context):
+            calls.append(1)
+            return {1, 2, 3}  # sets are not JSON
+
+        builder = WorkflowBuilder(workflow_id="wf-json", name="JSON Workflow")
+        builder.add_task(task_id="a", name="A", handler=handler)
+        builder.add_task(task_id="b", name="B", handler=lambda context: ["plain", "json"])
+        executor = WorkflowExecutor(checkpoints=CheckpointStore(self.ledger, serializer=JsonSerializer()))
+        execution = executor.execute(builder.build())
+
+        saved = executor.checkpoints.load(execution.execution_id)
+        self.assertEqual(set(saved["tasks"]), {"b"})
+        self.assertEqual(saved["tasks"]["b"]["result"], ["plain", "json"])
+
+        resumed = executor.resume(execution.execution_id)
+        self.assertEqual(resumed.tasks["a"].status, TaskStatus.SUCCESS)
+        self.assertEqual(len(calls), 2)
+
+        with self.assertRaises(ValueError):
+            CheckpointStore(self.ledger).load(execution.execution_id)
+
+    def test_resume_requires_checkpoints(self):
+        with self.assertRaises(ValueError):
+            WorkflowExecutor().resume("missing")
+        with self.assertRaises(KeyError):
+            WorkflowExecutor(checkpoints=CheckpointStore(self.ledger)).resume("missing")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+"""
+Tests for runtime/event_bus.py - live fan-out of committed ledger events
+"""
+import unittest
+import os
+import asyncio
+import threading
+from unittest import mock
+from runtime.ledger import EventLedger
+from runtime.event_bus import EventBus, tail_events
+
+try:
+    from fastapi.testclient import TestClient
+    from runtime import main
+except ImportError:
+    main = None
+
+
+class TestEventBus(unittest.TestCase):
+
+    def test_filtered_fan_out(self):
+        bus = EventBus()
+        everything = bus.subscribe()
+        dave = bus.subscribe(actor="human:dave")
+        dave_too = bus.subscribe(actor="human:dave")
+        self.assertEqual(bus.subscriber_count(), 3)
+
+        bus.publish([{"id": 1, "actor": "human:dave"}, {"id": 2, "actor": "agent:BEE-001"}])
+        self.assertEqual([e["id"] for e in everything.get(timeout=0)[0]], [1, 2])
+        self.assertEqual([e["id"] for e in dave.get(timeout=0)[0]], [1])
+        self.assertEqual([e["id"] for e in dave_too.get(timeout=0)[0]], [1])
+
+        dave.close()
+        self.assertEqual(bus.subscriber_count(), 2)
+
+    def test_overflow_drops_buffer(self):
+        bus = EventBus()
+        slow = bus.subscribe(max_pending=2)
+        bus.publish([{"id": 1}, {"id": 2}])
+        bus.publish([{"id": 3}])
+        self.assertEqual(slow.get(timeout=0), ([], True))
+        bus.publish([{"id": 4}])
+        self.assertEqual(slow.get(timeout=0), ([{"id": 4}], False))
+
+    def test_unknown_filter(self):
+        with self.assertRaises(ValueError):
+            EventBus().subscribe(start_timestamp="2026-01-01")
+
+
+class TestLedgerPublishing(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_event_bus.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_committed_events_are_published(self):
+        sub = self.ledger.bus.subscribe(domain="coding")
+        event_id = self.ledger.record_event("task_created", "agent:BEE-001", domain="coding", payload_json={"a": 1})
+        self.ledger.record_event("message_sent", "human:dave", domain="communication")
+        self.ledger.record_events([
+            {"event_type": "task_completed", "actor": "agent:BEE-001", "domain": "coding"},
+            {"event_type": "task_created", "actor": "agent:BEE-002", "domain": "coding"},
+        ])
+
+        # Writers are answered before the fan-out, so the batches may arrive separately
+        events, overflowed = [], False
+        while len(events) < 3:
+            batch, lagged = sub.get(timeout=1)
+            self.assertTrue(batch)
+            events += batch
+            overflowed = overflowed or lagged
+        self.assertFalse(overflowed)
+        self.assertEqual([e["event_type"] for e in events], ["task_created", "task_completed", "task_created"])
+        self.assertEqual(events[0]["id"], event_id)
+        self.assertEqual(events[0]["payload_json"], '{"a": 1}')
+        self.assertEqual(events, self.ledger.events_after(0, domain="coding"))
+
+    def test_rejected_events_are_not_published(self):
+        sub = self.ledger.bus.subscribe()
+        with self.assertRaises(Exception):
+            self.ledger.record_event("test", "test:actor", signal_type="invalid")
+        self.ledger.record_event("test", "test:actor")
+        events, _ = sub.get(timeout=1)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["signal_type"], None)
+
+    def test_failed_fan_out_keeps_the_writer(self):
+        sub = self.ledger.bus.subscribe()
+        with mock.patch.object(sub, "_deliver", side_effect=RuntimeError("subscriber bug")):
+            with self.assertLogs(level="ERROR"):
+                first = self.ledger.record_event("test", "test:actor")
+                # Writers are answered before the fan-out; by the next write it has failed
+                self.ledger.record_event("test", "test:actor")
+        self.assertEqual(self.ledger.record_event("test", "test:actor"), first + 2)
+        events, _ = sub.get(timeout=1)
+        self.assertIn(first + 2, [e["id"] for e in events])
+        self.assertNotIn(first, [e["id"] for e in events])
+
+    def test_events_queued_at_close_are_published(self):
+        db_path = "data/test_event_bus_close.db"
+        ledger = EventLedger(db_path=db_path, group_commit=True, flush_interval=5.0)
+        try:
+            sub = ledger.bus.subscribe()
+            futures = [ledger.submit_event("test", "test:actor") for _ in range(3)]
+            ledger.close()
+            events, _ = sub.get(timeout=0)
+            self.assertEqual([e["id"] for e in events], [f.result() for f in futures])
+            self.assertTrue(sub.closed)
+        finally:
+            ledger.close()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+
+    def test_tail_resumes_and_goes_live(self):
+        first = self.ledger.record_event("task_created", "agent:BEE-001")
+        self.ledger.record_event("task_created", "agent:BEE-001")
+
+        async def run():
+            tail = tail_events(self.ledger, after_id=first, page_size=10, heartbeat=0.05)
+            replayed = await tail.__anext__()
+            self.assertEqual(await tail.__anext__(), [])  # heartbeat
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: self.ledger.record_event("task_completed", "agent:BEE-001"))
+            live = await tail.__anext__()
+            await tail.aclose()
+            return replayed, live
+
+        replayed, live = asyncio.run(run())
+        self.assertEqual([e["id"] for e in replayed], [first + 1])
+        self.assertEqual([e["event_type"] for e in live], ["task_completed"])
+        self.assertEqual(self.ledger.bus.subscriber_count(), 0)
+
+    def test_tail_catches_up_after_overflow(self):
+        async def run():
+            tail = tail_events(self.ledger, max_pending=2, page_size=2, heartbeat=0.05)
+            self.assertEqual(await tail.__anext__(), [])
+            await asyncio.get_running_loop().run_in_executor(None, lambda: self.ledger.record_events(
+                {"event_type": "tick", "actor": "system:clock"} for _ in range(5)))
+            received = []
+            while len(received) < 5:
+                received.extend(await tail.__anext__())
+            await tail.aclose()
+            return received
+
+        received = asyncio.run(run())
+        self.assertEqual([e["id"] for e in received], [1, 2, 3, 4, 5])
+
+    def test_tail_reads_ledger_off_the_event_loop(self):
+        first = self.ledger.record_event("task_created", "agent:BEE-001")
+        self.ledger.record_event("task_created", "agent:BEE-001")
+        reader_threads = []
+        events_after = self.ledger.events_after
+
+        def recording_events_after(*args, **kwargs):
+            reader_threads.append(threading.get_ident())
+            return events_after(*args, **kwargs)
+
+        self.ledger.events_after = recording_events_after
+
+        async def run():
+            tail = tail_events(self.ledger, after_id=first, page_size=10, heartbeat=0.05)
+            await tail.__anext__()
+            await tail.aclose()
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+        self.assertTrue(reader_threads)
+        self.assertNotIn(loop_thread, reader_threads)
+
+    @unittest.skipIf(main is None, "fastapi not installed")
+    def test_stream_endpoint_serves_concurrent_subscribers(self):
+        original, main.ledger = main.ledger, self.ledger
+        try:
+            # A caught-up event shows both tails are subscribed and past their ledger read,
+            # so the next one reaches them through the bus as one shared dict
+            self.ledger.record_event("task_created", "agent:BEE-001", payload_json={"task": 6})
+            with TestClient(main.app) as client, \
+                    client.websocket_connect("/api/events/stream?after_id=0") as first, \
+                    client.websocket_connect("/api/events/stream?after_id=0") as second:
+                for websocket in (first, second):
+                    self.assertEqual(websocket.receive_json()["data"][0]["payload_json"], {"task": 6})
+                self.ledger.record_event("task_created", "agent:BEE-001", payload_json={"task": 7})
+                for websocket in (first, second):
+                    message = websocket.receive_json()
+                    self.assertEqual(message["type"], "events")
+                    self.assertEqual(message["data"][0]["payload_json"], {"task": 7})
+        finally:
+            main.ledger = original
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,9 @@ import unittest
 import os
 import sqlite3
 import json
-from runtime.ledger import EventLedger
+import threading
+from runtime.ledger import EventLedger, decode_cursor, encode_cursor
+from runtime.index_advisor import IndexAdvisor
 
 
 class TestEventLedgerSchema(unittest.TestCase):
@@ -206,6 +208,339 @@ class TestEventLedgerFilters(unittest.TestCase):
         self.assertEqual(len(page3), 1)
 
 
+class TestEventLedgerIndexes(unittest.TestCase):
+    """Composite indexes and the index advisor."""
+
+    def setUp(self):
+        self.db_path = "data/test_ledger_indexes.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.advisor = IndexAdvisor(slow_query_ms=0)
+        self.ledger = EventLedger(db_path=self.db_path, advisor=self.advisor)
+        self.ledger.record_events([
+            {"event_type": "task_created", "actor": "agent:BEE-001", "domain": "coding"},
+            {"event_type": "message_sent", "actor": "human:dave", "domain": "communication"},
+        ])
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_composite_indexes_exist(self):
+        indexes = self.ledger.index_columns()
+        self.assertEqual(indexes["idx_events_actor_time"], ["actor", "timestamp"])
+        self.assertEqual(indexes["idx_events_domain_type_time"], ["domain", "event_type", "timestamp"])
+        self.assertNotIn("idx_events_actor", indexes)
+
+    def test_filtered_queries_need_no_sort(self):
+        for filters in ({"actor": "human:dave"}, {"event_type": "task_created"}, {"domain": "coding"},
+                        {"domain": "coding", "event_type": "task_created", "start_timestamp": "2026-01-01"}):
+            where, params = self.ledger._filter_clause(**filters)
+            plan = " ".join(self.ledger.explain_query(where, params))
+            self.assertIn("USING INDEX", plan, filters)
+            self.assertNotIn("TEMP B-TREE", plan, filters)
+
+    def test_advisor_records_shapes_and_plans(self):
+        self.ledger.query_events(actor="human:dave")
+        self.ledger.query_events(actor="agent:BEE-001")
+        self.ledger.query_events(target="task:TASK-009", start_timestamp="2026-01-01")
+
+        report = {r["shape"]: r for r in self.ledger.index_report()}
+        self.assertEqual(report["actor = ?"]["count"], 2)
+        self.assertEqual(report["actor = ?"]["served_by"], ["idx_events_actor_time"])
+        self.assertIsNone(report["actor = ?"]["suggested_index"])
+        self.assertEqual(report["target = ? AND timestamp range"]["suggested_index"],
+                         "CREATE INDEX IF NOT EXISTS idx_events_target_time ON events(target, timestamp)")
+
+        slow = self.advisor.get_slow_queries()
+        self.assertEqual(len(slow), 3)
+        self.assertTrue(slow[0]["plan"])
+
+    def test_index_report_requires_advisor(self):
+        ledger = EventLedger(db_path=self.db_path)
+        try:
+            with self.assertRaises(ValueError):
+                ledger.index_report()
+        finally:
+            ledger.close()
+
+
+class TestEventLedgerCostRollups(unittest.TestCase):
+    """Cost rollups maintained on insert (ADR-001 three-currency costs)."""
+
+    def setUp(self):
+        self.db_path = "data/test_ledger_costs.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+        self.ledger.record_events([
+            {"event_type": "llm_call", "actor": "agent:BEE-001", "domain": "coding",
+             "timestamp": "2026-01-01T10:05:00.000", "cost_tokens": 100, "cost_usd": 0.5, "cost_carbon": 1.0},
+            {"event_type": "llm_call", "actor": "agent:BEE-001", "domain": "coding",
+             "timestamp": "2026-01-01T10:45:00.000", "cost_tokens": 50, "cost_usd": 0.25},
+            {"event_type": "llm_call", "actor": "agent:BEE-002",
+             "timestamp": "2026-01-01T11:00:00.000", "cost_tokens": 10},
+            {"event_type": "task_created", "actor": "agent:BEE-001", "domain": "coding",
+             "timestamp": "2026-01-02T09:00:00.000"},
+        ])
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_hourly_costs_per_actor(self):
+        costs = self.ledger.query_costs(grain="hour", group_by=["actor"])
+        self.assertEqual(costs[0], {"bucket": "2026-01-01T10", "actor": "agent:BEE-001", "events": 2,
+                                    "cost_tokens": 150, "cost_usd": 0.75, "cost_carbon": 1.0})
+        self.assertEqual([(c["bucket"], c["actor"]) for c in costs[1:]],
+                         [("2026-01-01T11", "agent:BEE-002"), ("2026-01-02T09", "agent:BEE-001")])
+
+    def test_daily_totals_and_filters(self):
+        totals = self.ledger.query_costs(grain="day", group_by=[])
+        self.assertEqual([(c["bucket"], c["events"], c["cost_tokens"]) for c in totals],
+                         [("2026-01-01", 3, 160), ("2026-01-02", 1, 0)])
+
+        coding = self.ledger.query_costs(grain="minute", domain="coding", start_timestamp="2026-01-01T10:30",
+                                         end_timestamp="2026-01-01T23:59")
+        self.assertEqual(len(coding), 1)
+        self.assertEqual(coding[0]["bucket"], "2026-01-01T10:45")
+
+        no_domain = self.ledger.query_costs(grain="day", actor="agent:BEE-002")
+        self.assertIsNone(no_domain[0]["domain"])
+
+    def test_backfills_existing_ledger(self):
+        self.ledger.close()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DROP TABLE cost_rollups")
+        conn.commit()
+        conn.close()
+        self.ledger = EventLedger(db_path=self.db_path)
+        costs = self.ledger.query_costs(grain="day", group_by=[])
+        self.assertEqual([c["events"] for c in costs], [3, 1])
+
+    def test_failed_writes_are_not_counted(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.ledger.record_events([
+                {"event_type": "llm_call", "actor": "agent:BEE-003", "cost_tokens": 5},
+                {"event_type": "llm_call", "actor": "agent:BEE-003", "oracle_tier": 9},
+            ])
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.ledger.record_event("llm_call", "agent:BEE-003", oracle_tier=9, cost_tokens=5)
+        self.assertEqual(self.ledger.query_costs(grain="day", actor="agent:BEE-003"), [])
+
+    def test_group_commit_batches_are_rolled_up(self):
+        self.ledger.close()
+        self.ledger = EventLedger(db_path=self.db_path, group_commit=True, flush_interval=60)
+        futures = [self.ledger.submit_event("llm_call", "agent:BEE-003", cost_tokens=tokens, oracle_tier=tier)
+                   for tokens, tier in ((5, 1), (7, 9), (11, 2))]
+        totals = self.ledger.query_costs(grain="day", actor="agent:BEE-003", group_by=[])
+        self.assertEqual([(c["events"], c["cost_tokens"]) for c in totals], [(2, 16)])
+        with self.assertRaises(sqlite3.IntegrityError):
+            futures[1].result(timeout=1)
+
+    def test_drops_legacy_rollup_trigger(self):
+        self.ledger.close()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TRIGGER rollup_costs_events AFTER INSERT ON events
+            BEGIN SELECT RAISE(ABORT, 'legacy trigger'); END
+        """)
+        conn.commit()
+        conn.close()
+        self.ledger = EventLedger(db_path=self.db_path)
+        self.ledger.record_event("llm_call", "agent:BEE-001", cost_tokens=1)
+        costs = self.ledger.query_costs(grain="day", group_by=[])
+        self.assertEqual([c["events"] for c in costs], [3, 1, 1])
+
+    def test_partitioned_rollups_survive_drop(self):
+        self.ledger.close()
+        os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path, partition_by="day")
+        self.ledger.record_events([
+            {"event_type": "llm_call", "actor": "agent:BEE-001", "timestamp": "2026-01-01T10:00:00.000",
+             "cost_usd": 1.0},
+            {"event_type": "llm_call", "actor": "agent:BEE-001", "timestamp": "2026-01-02T10:00:00.000",
+             "cost_usd": 2.0},
+        ])
+        self.ledger.seal_partitions(before="2026-01-02")
+        self.ledger.drop_partition("events_20260101")
+        costs = self.ledger.query_costs(grain="day", group_by=[])
+        self.assertEqual([c["cost_usd"] for c in costs], [1.0, 2.0])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            self.ledger.query_costs(grain="week")
+        with self.assertRaises(ValueError):
+            self.ledger.query_costs(group_by=["target"])
+
+
+class TestEventLedgerCursorPagination(unittest.TestCase):
+    """Test keyset pagination on (timestamp, id)."""
+
+    def setUp(self):
+        self.db_path = "data/test_ledger_cursor.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+        # Shared timestamps force the id tie-breaker to do its job
+        self.ledger.record_events(
+            {"event_type": "tick", "actor": "system:sim", "random_seed": i,
+             "timestamp": f"2026-01-01T00:00:{i // 3:02d}.000"}
+            for i in range(10)
+        )
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_cursor_walks_every_event_once(self):
+        seen = []
+        cursor = None
+        while True:
+            page = self.ledger.query_events(limit=4, cursor=cursor)
+            seen.extend(e['random_seed'] for e in page)
+            if len(page) < 4:
+                break
+            cursor = encode_cursor(page[-1])
+        self.assertEqual(seen, list(range(9, -1, -1)))
+
+    def test_cursor_matches_offset_pages(self):
+        first = self.ledger.query_events(limit=3)
+        by_cursor = self.ledger.query_events(limit=3, cursor=encode_cursor(first[-1]))
+        by_offset = self.ledger.query_events(limit=3, offset=3)
+        self.assertEqual(by_cursor, by_offset)
+
+    def test_cursor_combines_with_filters(self):
+        self.ledger.record_event(event_type="other", actor="system:sim")
+        first = self.ledger.query_events(event_type="tick", limit=5)
+        rest = self.ledger.query_events(event_type="tick", limit=100, cursor=encode_cursor(first[-1]))
+        self.assertEqual(len(rest), 5)
+        self.assertTrue(all(e['event_type'] == "tick" for e in rest))
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.ledger.query_events(cursor="not-a-cursor")
+
+    def test_cursor_token_format(self):
+        # backend/app/crud.py mints and reads the same tokens without importing this module
+        token = "WyIyMDI2LTAxLTAxVDEwOjAwOjAwLjAwMCIsIDQyXQ"
+        self.assertEqual(encode_cursor({"timestamp": "2026-01-01T10:00:00.000", "id": 42}), token)
+        self.assertEqual(decode_cursor(token), ("2026-01-01T10:00:00.000", 42))
+
+class TestEventLedgerIterEvents(unittest.TestCase):
+    """Test chunked iteration used by the streaming export."""
+
+    def setUp(self):
+        self.db_path = "data/test_ledger_iter.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+        self.ledger.record_events(
+            {"event_type": "even" if i % 2 == 0 else "odd", "actor": "system:sim", "random_seed": i}
+            for i in range(25)
+        )
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_chunks_are_bounded(self):
+        chunks = list(self.ledger.iter_event_chunks(chunk_size=10))
+        self.assertEqual([len(c) for c in chunks], [10, 10, 5])
+
+    def test_iter_events_has_no_row_cap(self):
+        seeds = [e['random_seed'] for e in self.ledger.iter_events(chunk_size=4)]
+        self.assertEqual(seeds, list(range(24, -1, -1)))
+
+    def test_iter_events_applies_filters(self):
+        events = list(self.ledger.iter_events(chunk_size=4, event_type="odd"))
+        self.assertEqual(len(events), 12)
+        self.assertTrue(all(e['random_seed'] % 2 == 1 for e in events))
+
+class TestEventLedgerPartitions(unittest.TestCase):
+    """Test time-partitioned storage."""
+
+    def setUp(self):
+        self.db_path = "data/test_ledger_partitions.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path, partition_by="day")
+        self.ledger.record_events(
+            {"event_type": "tick", "actor": "system:sim", "random_seed": i,
+             "timestamp": f"2026-01-0{1 + i // 4}T0{i % 4}:00:00.000"}
+            for i in range(12)
+        )
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_events_routed_to_day_partitions(self):
+        names = [p['name'] for p in self.ledger.partitions()]
+        self.assertEqual(names, ["events_20260101", "events_20260102", "events_20260103"])
+        count = self.ledger.conn.execute("SELECT COUNT(*) FROM events_20260102").fetchone()[0]
+        self.assertEqual(count, 4)
+        self.assertEqual(self.ledger.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0], 0)
+
+    def test_ids_unique_across_partitions(self):
+        event_id = self.ledger.record_event(event_type="live", actor="test:actor")
+        events = self.ledger.query_events(limit=100)
+        ids = [e['id'] for e in events]
+        self.assertEqual(len(ids), 13)
+        self.assertEqual(len(set(ids)), 13)
+        self.assertEqual(event_id, max(ids))
+
+    def test_query_spans_partitions_in_order(self):
+        seeds = [e['random_seed'] for e in self.ledger.query_events(limit=100)]
+        self.assertEqual(seeds, list(range(11, -1, -1)))
+        page = self.ledger.query_events(limit=3, offset=3)
+        self.assertEqual([e['random_seed'] for e in page], [8, 7, 6])
+
+    def test_time_range_and_cursor(self):
+        events = self.ledger.query_events(start_timestamp="2026-01-02", end_timestamp="2026-01-02T23:59:59.999")
+        self.assertEqual([e['random_seed'] for e in events], [7, 6, 5, 4])
+        seeds = [e['random_seed'] for e in self.ledger.iter_events(chunk_size=5)]
+        self.assertEqual(seeds, list(range(11, -1, -1)))
+        self.assertEqual(self.ledger.event_days(), ["2026-01-01", "2026-01-02", "2026-01-03"])
+
+    def test_index_advice_uses_partitions(self):
+        where, params = self.ledger._filter_clause(actor="system:sim", start_timestamp="2026-01-02T12")
+        plan = self.ledger.explain_query(where, params, "2026-01-02T12", None)
+        self.assertEqual({line.split(":")[0] for line in plan}, {"events_20260102", "events_20260103"})
+        self.assertIn("USING INDEX idx_events_20260103_actor_time", " ".join(plan))
+        self.assertIn("idx_events_20260103_actor_time", self.ledger.index_columns())
+
+        self.ledger.advisor = IndexAdvisor(slow_query_ms=0)
+        self.ledger.query_events(target="task:TASK-009")
+        report = self.ledger.index_report()
+        self.assertEqual(report[0]["suggested_index"], "CREATE INDEX IF NOT EXISTS idx_events_20260103_target_time"
+                                                       " ON events_20260103(target, timestamp)")
+        self.assertTrue(self.ledger.advisor.get_slow_queries()[0]["plan"][0].startswith("events_2026"))
+
+    def test_sealed_partition_is_read_only(self):
+        self.assertEqual(self.ledger.seal_partitions(before="2026-01-03"), ["events_20260101", "events_20260102"])
+        with self.assertRaises(sqlite3.IntegrityError) as ctx:
+            self.ledger.record_events([{"event_type": "late", "actor": "x", "timestamp": "2026-01-01T12:00:00.000"}])
+        self.assertIn("sealed", str(ctx.exception))
+        self.ledger.record_events([{"event_type": "ok", "actor": "x", "timestamp": "2026-01-03T12:00:00.000"}])
+
+    def test_drop_sealed_partition(self):
+        with self.assertRaises(ValueError):
+            self.ledger.drop_partition("events_20260101")
+        self.ledger.seal_partitions(before="2026-01-02")
+        self.ledger.drop_partition("events_20260101")
+        self.assertEqual(len(self.ledger.query_events(limit=100)), 8)
+
+    def test_reopening_unpartitioned_is_refused(self):
+        with self.assertRaises(ValueError):
+            EventLedger(db_path=self.db_path)
+
+
 class TestEventLedgerAppendOnly(unittest.TestCase):
     """Test append-only enforcement per ADR-001."""
 
@@ -278,5 +613,218 @@ class TestUniversalEntityIds(unittest.TestCase):
         self.assertEqual(events[0]['target'], "task:TASK-009")
 
 
+class TestEventLedgerGroupCommit(unittest.TestCase):
+    """Test buffered group-commit writes."""
+
+    def setUp(self):
+        self.db_path = "data/test_ledger_group_commit.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path, group_commit=True,
+                                  batch_size=10, flush_interval=60)
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def _committed_count(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_events_buffered_until_flush(self):
+        future = self.ledger.submit_event(event_type="test", actor="test:actor")
+        self.assertFalse(future.done())
+        self.assertEqual(self._committed_count(), 0)
+
+        self.ledger.flush()
+        self.assertTrue(future.done())
+        self.assertIsNotNone(future.result())
+        self.assertEqual(self._committed_count(), 1)
+
+    def test_batch_size_triggers_flush(self):
+        futures = [self.ledger.submit_event(event_type="test", actor="test:actor") for _ in range(10)]
+        ids = [f.result(timeout=1) for f in futures]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(self._committed_count(), 10)
+
+    def test_flush_interval_triggers_flush(self):
+        self.ledger.close()
+        os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path, group_commit=True,
+                                  batch_size=1000, flush_interval=0.01)
+        future = self.ledger.submit_event(event_type="test", actor="test:actor")
+        self.assertIsNotNone(future.result(timeout=5))
+
+    def test_close_flushes_pending_events(self):
+        future = self.ledger.submit_event(event_type="test", actor="test:actor")
+        self.ledger.close()
+        self.assertTrue(future.done())
+        self.assertEqual(self._committed_count(), 1)
+
+    def test_invalid_event_fails_only_its_future(self):
+        good = self.ledger.submit_event(event_type="test", actor="test:actor")
+        bad = self.ledger.submit_event(event_type="test", actor="test:actor", oracle_tier=9)
+        self.ledger.flush()
+        self.assertIsNotNone(good.result(timeout=1))
+        with self.assertRaises(sqlite3.IntegrityError):
+            bad.result(timeout=1)
+        self.assertEqual(self._committed_count(), 1)
+
+    def test_record_event_returns_committed_id(self):
+        event_id = self.ledger.record_event(event_type="test", actor="test:actor")
+        self.assertIsInstance(event_id, int)
+        self.assertEqual(self._committed_count(), 1)
+
+    def test_buffered_events_inserted_together(self):
+        futures = [self.ledger.submit_event(event_type="test", actor="test:actor", oracle_tier=tier)
+                   for tier in (1, 9, 2)]
+        self.ledger.flush()
+        ids = [futures[0].result(timeout=1), futures[2].result(timeout=1)]
+        with self.assertRaises(sqlite3.IntegrityError):
+            futures[1].result(timeout=1)
+        events = self.ledger.query_events(limit=10)
+        self.assertEqual(sorted(e["id"] for e in events), ids)
+        self.assertEqual(sorted(e["oracle_tier"] for e in events), [1, 2])
+
+    def test_query_sees_buffered_events(self):
+        self.ledger.submit_event(event_type="task_running", actor="system:workflow_executor")
+        events = self.ledger.query_events(event_type="task_running")
+        self.assertEqual(len(events), 1)
+        self.assertIn('T', events[0]['timestamp'])
+
+
+class TestEventLedgerBulkInsert(unittest.TestCase):
+    """Test record_events bulk ingest."""
+
+    def setUp(self):
+        self.db_path = "data/test_ledger_bulk.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_record_events_from_generator(self):
+        events = (
+            {"event_type": "sim_tick", "actor": "system:sim", "random_seed": i, "payload_json": {"i": i}}
+            for i in range(500)
+        )
+        self.assertEqual(self.ledger.record_events(events), 500)
+        rows = self.ledger.query_events(event_type="sim_tick", limit=1000)
+        self.assertEqual(len(rows), 500)
+        self.assertEqual(json.loads(rows[0]['payload_json'])['i'], rows[0]['random_seed'])
+
+    def test_record_events_keeps_supplied_timestamp(self):
+        self.ledger.record_events([
+            {"event_type": "sim_tick", "actor": "system:sim", "timestamp": "2020-01-01T00:00:00.000"},
+            {"event_type": "sim_tick", "actor": "system:sim"},
+        ])
+        rows = self.ledger.query_events(limit=10)
+        self.assertEqual(rows[-1]['timestamp'], "2020-01-01T00:00:00.000")
+        self.assertGreater(rows[0]['timestamp'], rows[-1]['timestamp'])
+
+    def test_record_events_is_one_transaction(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.ledger.record_events([
+                {"event_type": "ok", "actor": "test:actor"},
+                {"event_type": "bad", "actor": "test:actor", "signal_type": "invalid"},
+            ])
+        self.assertEqual(self.ledger.query_events(), [])
+
+    def test_record_events_rejects_unknown_fields(self):
+        with self.assertRaises(TypeError):
+            self.ledger.record_events([{"event_type": "x", "actor": "y", "bogus": 1}])
+
+
+class TestEventLedgerConnections(unittest.TestCase):
+    """Test WAL pragmas, the writer thread and the read-only pool."""
+
+    def setUp(self):
+        self.db_path = "data/test_ledger_connections.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path, read_pool_size=2)
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_wal_and_pragmas_applied(self):
+        self.assertEqual(self.ledger.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(self.ledger.conn.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+        # synchronous=NORMAL is 1
+        self.assertEqual(self.ledger.conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+
+    def test_write_fails_instead_of_hanging_when_database_busy(self):
+        self.ledger.close()
+        self.ledger = EventLedger(db_path=self.db_path, pragmas={"busy_timeout": 50})
+        competing = sqlite3.connect(self.db_path, timeout=0)
+        competing.execute("BEGIN IMMEDIATE")
+        try:
+            future = self.ledger.submit_write(lambda conn: None)
+            with self.assertRaises(sqlite3.OperationalError):
+                future.result(timeout=5)
+        finally:
+            competing.rollback()
+            competing.close()
+        self.assertIsNotNone(self.ledger.record_event(event_type="test", actor="test:actor"))
+
+    def test_custom_pragmas_override_defaults(self):
+        self.ledger.close()
+        self.ledger = EventLedger(db_path=self.db_path, pragmas={"synchronous": "FULL"})
+        self.assertEqual(self.ledger.conn.execute("PRAGMA synchronous").fetchone()[0], 2)
+
+    def test_read_connections_are_read_only(self):
+        with self.ledger._reader() as conn:
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO events (event_type, actor) VALUES ('x', 'y')")
+
+    def test_read_runs_on_read_only_connection(self):
+        self.ledger.record_event(event_type="test", actor="test:actor")
+        count = self.ledger.read(lambda conn: conn.execute("SELECT COUNT(*) FROM events").fetchone()[0])
+        self.assertEqual(count, 1)
+        with self.assertRaises(sqlite3.OperationalError):
+            self.ledger.read(lambda conn: conn.execute("INSERT INTO events (event_type, actor) VALUES ('x', 'y')"))
+
+    def test_concurrent_writers(self):
+        def write(worker):
+            for i in range(50):
+                self.ledger.record_event(event_type="task_running", actor=f"agent:BEE-{worker:03d}")
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        events = self.ledger.query_events(event_type="task_running", limit=1000)
+        self.assertEqual(len(events), 400)
+        self.assertEqual(len({e['id'] for e in events}), 400)
+
+    def test_failed_write_job_does_not_affect_batch(self):
+        def bad(conn):
+            conn.execute("INSERT INTO events (event_type, actor) VALUES ('partial', 'x')")
+            raise ValueError("boom")
+
+        future = self.ledger.submit_write(bad)
+        with self.assertRaises(ValueError):
+            future.result(timeout=5)
+        self.ledger.record_event(event_type="after", actor="x")
+        self.assertEqual([e['event_type'] for e in self.ledger.query_events()], ["after"])
+
+    def test_closed_ledger_rejects_writes(self):
+        self.ledger.close()
+        with self.assertRaises(RuntimeError):
+            self.ledger.record_event(event_type="late", actor="x")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,227 @@
+"""
+Tests for runtime/main.py - the Event Ledger HTTP API
+"""
+import unittest
+import csv
+import gzip
+import io
+import json
+import os
+from unittest import mock
+from runtime.ledger import EventLedger
+
+try:
+    from fastapi.testclient import TestClient
+    from runtime import main
+except ImportError:
+    main = None
+
+
+@unittest.skipIf(main is None, "fastapi not installed")
+class TestEventBatchEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_main_batch.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+        self.original, main.ledger = main.ledger, self.ledger
+        self.client = TestClient(main.app)
+
+    def tearDown(self):
+        main.ledger = self.original
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_json_array_batch(self):
+        rows = [
+            {"event_type": "sim_step", "actor": "system:sim", "timestamp": "2026-01-01T10:00:00Z"},
+            {"event_type": "sim_step", "actor": "system:sim", "oracle_tier": 9},
+            {"event_type": "sim_step", "actor": "system:sim", "cost_tokens": 5},
+        ]
+        response = self.client.post("/api/events/batch", json=rows)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["accepted"], body["rejected"]), (2, 1))
+        self.assertEqual(body["errors"][0]["index"], 1)
+
+        events = self.ledger.query_events(event_type="sim_step")
+        self.assertEqual(len(events), 2)
+        self.assertIn("2026-01-01T10:00:00.000", [e["timestamp"] for e in events])
+
+    def test_ndjson_ingest(self):
+        body = '{"event_type": "sim_step", "actor": "system:sim"}\nnot json\n\n{"event_type": "sim_end", "actor": "system:sim"}\n'
+        response = self.client.post("/api/v1/simulation/ingest", content=body,
+                                    headers={"Content-Type": "application/x-ndjson"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["accepted"], response.json()["rejected"]), (2, 1))
+        self.assertEqual(len(self.ledger.query_events(actor="system:sim")), 2)
+
+    def test_single_object_is_a_batch_of_one(self):
+        body = json.dumps({"event_type": "sim_step", "actor": "system:sim", "payload_json": {"step": 1}}, indent=2)
+        response = self.client.post("/api/events/batch", content=body,
+                                    headers={"Content-Type": "application/json"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["accepted"], response.json()["rejected"]), (1, 0))
+        self.assertEqual(len(self.ledger.query_events(event_type="sim_step")), 1)
+
+    def test_malformed_batch(self):
+        response = self.client.post("/api/events/batch", content='[{"event_type": "sim_step",',
+                                    headers={"Content-Type": "application/json"})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post("/api/events/batch", content=b'[{"actor": "\xff"}]',
+                                    headers={"Content-Type": "application/json"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.ledger.query_events(), [])
+
+    def test_wrong_content_type(self):
+        for path in ("/api/events/batch", "/api/v1/simulation/ingest"):
+            response = self.client.post(path, content="event_type,actor\nsim_step,system:sim\n",
+                                        headers={"Content-Type": "text/csv"})
+            self.assertEqual(response.status_code, 415)
+        self.assertEqual(self.ledger.query_events(), [])
+
+
+@unittest.skipIf(main is None, "fastapi not installed")
+class TestEventExportEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_main_export.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+        # 250 rows so a chunk_size=100 export spans three chunks
+        self.ledger.record_events([
+            {"event_type": "sim_step" if i % 2 else "task_created",
+             "actor": f"agent:BEE-{i % 3:03d}",
+             "domain": "coding" if i % 5 else "design",
+             "timestamp": f"2026-01-01T{10 + i // 120:02d}:{i // 2 % 60:02d}:{i % 2 * 30:02d}.000",
+             "payload_json": {"step": i}}
+            for i in range(250)
+        ])
+        self.original, main.ledger = main.ledger, self.ledger
+        self.client = TestClient(main.app)
+
+    def tearDown(self):
+        main.ledger = self.original
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def export(self, **params):
+        params.setdefault("chunk_size", 100)
+        response = self.client.get("/api/events/export", params=params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_json(self):
+        response = self.export()
+        self.assertEqual(response.headers["content-type"], "application/json")
+        self.assertIn("filename=events.json", response.headers["content-disposition"])
+        events = response.json()["data"]
+        self.assertEqual(len(events), 250)
+        self.assertEqual(len({e["id"] for e in events}), 250)
+        self.assertEqual(events[0]["payload_json"], {"step": 249})  # newest first
+
+    def test_csv(self):
+        response = self.export(format="csv")
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        self.assertEqual(len(rows), 250)
+        self.assertEqual(list(rows[0]), main.EXPORT_FIELDNAMES)
+        self.assertEqual(json.loads(rows[-1]["payload_json"]), {"step": 0})
+
+    def test_ndjson(self):
+        response = self.export(format="ndjson")
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        events = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(len(events), 250)
+        self.assertEqual(events[-1]["payload_json"], {"step": 0})
+
+    def test_gzip(self):
+        response = self.client.get("/api/events/export", params={"format": "ndjson", "gzip": "true"},
+                                   headers={"Accept-Encoding": "identity"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/gzip")
+        self.assertIn("filename=events.ndjson.gz", response.headers["content-disposition"])
+        lines = gzip.decompress(response.content).decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 250)
+
+        plain = self.export(format="csv").text
+        self.assertEqual(gzip.decompress(self.export(format="csv", gzip="true").content).decode("utf-8"), plain)
+
+    @unittest.skipIf(main is None or main.pq is None, "pyarrow not installed")
+    def test_parquet(self):
+        response = self.export(format="parquet")
+        self.assertEqual(response.headers["content-type"], "application/vnd.apache.parquet")
+        table = main.pq.read_table(io.BytesIO(response.content))
+        self.assertEqual(table.num_rows, 250)
+
+    def test_parquet_without_pyarrow(self):
+        with mock.patch.object(main, "pq", None):
+            response = self.client.get("/api/events/export", params={"format": "parquet"})
+        self.assertEqual(response.status_code, 501)
+
+    def test_filters(self):
+        def exported(**params):
+            return self.export(format="ndjson", **params).text.splitlines()
+
+        by_type = [json.loads(line) for line in exported(event_type="sim_step")]
+        self.assertEqual(len(by_type), 125)
+        self.assertTrue(all(e["event_type"] == "sim_step" for e in by_type))
+
+        by_actor = [json.loads(line) for line in exported(actor="agent:BEE-001", domain="design")]
+        self.assertEqual(sorted(e["payload_json"]["step"] for e in by_actor),
+                         [i for i in range(250) if i % 3 == 1 and i % 5 == 0])
+
+        in_range = [json.loads(line) for line in exported(start="2026-01-01T11:00:00", end="2026-01-01T11:59:59")]
+        self.assertEqual(sorted(e["payload_json"]["step"] for e in in_range), list(range(120, 240)))
+
+        self.assertEqual(exported(actor="agent:nobody"), [])
+        self.assertEqual(self.client.get("/api/events/export", params={"format": "xml"}).status_code, 422)
+
+
+@unittest.skipIf(main is None, "fastapi not installed")
+class TestEventCostsEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_main_costs.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+        self.ledger.record_events([
+            {"event_type": "llm_call", "actor": "agent:BEE-001", "domain": "coding",
+             "timestamp": "2026-01-01T10:05:00.000", "cost_tokens": 100, "cost_usd": 0.5},
+            {"event_type": "llm_call", "actor": "agent:BEE-002", "domain": "coding",
+             "timestamp": "2026-01-01T11:00:00.000", "cost_tokens": 10, "cost_usd": 0.25},
+        ])
+        self.original, main.ledger = main.ledger, self.ledger
+        self.client = TestClient(main.app)
+
+    def tearDown(self):
+        main.ledger = self.original
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_costs_per_bucket(self):
+        response = self.client.get("/api/events/costs", params={"grain": "day", "group_by": ""})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"], [
+            {"bucket": "2026-01-01", "events": 2, "cost_tokens": 110, "cost_usd": 0.75, "cost_carbon": 0.0}
+        ])
+
+        hourly = self.client.get("/api/events/costs", params={"grain": "hour", "actor": "agent:BEE-002"}).json()
+        self.assertEqual(hourly["grain"], "hour")
+        self.assertEqual([(c["bucket"], c["actor"], c["domain"]) for c in hourly["data"]],
+                         [("2026-01-01T11", "agent:BEE-002", "coding")])
+
+    def test_invalid_arguments(self):
+        self.assertEqual(self.client.get("/api/events/costs", params={"grain": "week"}).status_code, 422)
+        self.assertEqual(self.client.get("/api/events/costs", params={"group_by": "target"}).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Tests for core/monitoring.py - streaming workflow statistics
+"""
+import unittest
+import random
+import statistics
+import threading
+from simdecisions.core.monitoring import QuantileSketch, RunningStats, StreamingAggregator
+from simdecisions.core.workflow_orchestrator import (
+    TaskExecution, TaskStatus, WorkflowExecution, WorkflowMonitor, WorkflowStatus
+)
+
+
+class FakeClock:
+    def __init__(self, now=10_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestRunningStats(unittest.TestCase):
+
+    def test_matches_exact_statistics_and_merges(self):
+        values = [random.Random(1).gauss(5, 2) for _ in range(1000)]
+        whole, left, right = RunningStats(), RunningStats(), RunningStats()
+        for i, value in enumerate(values):
+            whole.add(value)
+            (left if i % 3 else right).add(value)
+        left.merge(right)
+        for stats in (whole, left):
+            self.assertEqual(stats.count, 1000)
+            self.assertAlmostEqual(stats.mean, statistics.mean(values))
+            self.assertAlmostEqual(stats.variance, statistics.variance(values))
+            self.assertEqual(stats.min, min(values))
+            self.assertEqual(stats.max, max(values))
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(7)
+        values = sorted(rng.lognormvariate(0, 1.5) for _ in range(20000))
+        sketch, merged, other = QuantileSketch(0.01), QuantileSketch(0.01), QuantileSketch(0.01)
+        for i, value in enumerate(values):
+            sketch.add(value)
+            (merged if i % 2 else other).add(value)
+        merged.merge(other)
+        for q in (0.5, 0.95, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            for s in (sketch, merged):
+                self.assertLess(abs(s.quantile(q) - exact) / exact, 0.011)
+
+    def test_bounded_bins_and_zeros(self):
+        sketch = QuantileSketch(0.01, max_bins=64)
+        for i in range(10000):
+            sketch.add(i * 0.01)
+        self.assertLessEqual(len(sketch.bins), 64)
+        self.assertEqual(sketch.zero_count, 1)
+        self.assertAlmostEqual(sketch.quantile(0.99), 99.0, delta=1.0)
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+        with self.assertRaises(ValueError):
+            sketch.merge(QuantileSketch(0.05))
+
+
+class TestStreamingAggregator(unittest.TestCase):
+
+    def test_windows_age_out(self):
+        clock = FakeClock()
+        aggregator = StreamingAggregator(horizon=3600, resolution=60, clock=clock)
+        aggregator.record("a", 1.0, True)
+        clock.now += 600
+        aggregator.record("a", 3.0, False)
+        aggregator.record("b", None, None)
+
+        self.assertEqual(aggregator.summary("a").count, 2)
+        recent = aggregator.summary("a", window=300)
+        self.assertEqual((recent.count, recent.failures, recent.durations.mean), (1, 1, 3.0))
+        self.assertEqual(aggregator.summary("a", window=3600).durations.mean, 2.0)
+
+        clock.now += 7200
+        self.assertEqual(aggregator.summaries(window=3600), {})
+        self.assertEqual(aggregator.total().count, 3)
+        with self.assertRaises(ValueError):
+            aggregator.summaries(window=7200)
+
+    def test_memory_is_bounded(self):
+        clock = FakeClock()
+        aggregator = StreamingAggregator(horizon=600, resolution=60, shards=1, clock=clock)
+        for i in range(5000):
+            clock.now += 1
+            aggregator.record("a", i % 50 * 0.1, True)
+        shard = aggregator.shards[0]
+        self.assertEqual(len(shard.ring), aggregator.slots)
+        self.assertEqual(len(shard.totals), 1)
+        self.assertEqual(aggregator.summary("a").count, 5000)
+        self.assertLessEqual(aggregator.summary("a", window=600).count, 660)
+
+    def test_concurrent_writers(self):
+        aggregator = StreamingAggregator(shards=4)
+
+        def write():
+            for i in range(2000):
+                aggregator.record(f"task-{i % 5}", 0.5, True)
+
+        threads = [threading.Thread(target=write) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        summaries = aggregator.summaries()
+        self.assertEqual(sum(summary.count for summary in summaries.values()), 16000)
+        self.assertEqual(summaries["task-0"].durations.mean, 0.5)
+        self.assertTrue(all(shard.totals for shard in aggregator.shards))
+
+
+class TestWorkflowMonitor(unittest.TestCase):
+
+    def execution(self, status, durations, start=0.0):
+        execution = WorkflowExecution(execution_id="x", workflow_id="wf", name="WF", status=status,
+                                      start_time=1.0 + start, end_time=1.0 + start + sum(durations.values()))
+        for task_id, duration in durations.items():
+            execution.tasks[task_id] = TaskExecution(task_id=task_id, name=task_id, status=TaskStatus.SUCCESS,
+                                                     start_time=1.0, end_time=1.0 + duration)
+        return execution
+
+    def test_statistics_and_windows(self):
+        clock = FakeClock()
+        monitor = WorkflowMonitor(clock=clock)
+        for duration in (1.0, 2.0, 3.0, 4.0):
+            monitor.record_execution(self.execution(WorkflowStatus.SUCCESS, {"a": duration}))
+        clock.now += 1800
+        monitor.record_execution(self.execution(WorkflowStatus.FAILED, {"a": 10.0}))
+
+        # A true mean, not a running pairwise average
+        self.assertAlmostEqual(monitor.get_average_task_durations()["a"], 4.0)
+        stats = monitor.get_task_statistics()["a"]
+        self.assertEqual(stats["executions"], 5)
+        self.assertAlmostEqual(stats["p50_duration"], 3.0, delta=0.03)
+        self.assertAlmostEqual(stats["max_duration"], 10.0)
+        self.assertEqual(monitor.get_execution_count(), 5)
+        self.assertAlmostEqual(monitor.get_success_rate(), 0.8)
+        self.assertEqual(monitor.get_success_rate("5m"), 0.0)
+        self.assertEqual(monitor.get_execution_count("1h"), 5)
+        self.assertAlmostEqual(monitor.get_task_statistics(window=300)["a"]["avg_duration"], 10.0)
+        self.assertEqual(monitor.get_workflow_statistics()["wf"]["failures"], 1)
+        self.assertIn("Total Executions: 5", monitor.get_report())
+
+    def test_map_items_share_one_key(self):
+        monitor = WorkflowMonitor(clock=FakeClock())
+        for size in (10, 100):
+            execution = self.execution(WorkflowStatus.SUCCESS, {"work": 5.0})
+            for index in range(size):
+                execution.tasks[f"work[{index}]"] = TaskExecution(
+                    task_id=f"work[{index}]", name="Work", status=TaskStatus.SUCCESS,
+                    start_time=1.0, end_time=1.5, metadata={"map_task": "work", "map_index": index})
+            monitor.record_execution(execution)
+
+        stats = monitor.get_task_statistics()
+        self.assertEqual(sorted(stats), ["work", "work[*]"])
+        self.assertEqual(stats["work[*]"]["executions"], 110)
+        self.assertAlmostEqual(stats["work"]["avg_duration"], 5.0)
+
+    def test_tasks_that_did_not_run_are_not_timed(self):
+        monitor = WorkflowMonitor(clock=FakeClock())
+        execution = self.execution(WorkflowStatus.SUCCESS, {"a": 2.0, "b": 0.0, "c": 0.0, "d": 0.0})
+        execution.tasks["b"].status = TaskStatus.SKIPPED
+        execution.tasks["c"].status = TaskStatus.CANCELLED
+        execution.tasks["d"].metadata["cache_hit"] = True
+        monitor.record_execution(execution)
+        monitor.record_execution(self.execution(WorkflowStatus.SUCCESS, {"a": 4.0, "b": 6.0, "c": 8.0, "d": 10.0}))
+
+        stats = monitor.get_task_statistics()
+        self.assertEqual([stats[t]["executions"] for t in "abcd"], [2, 2, 2, 2])
+        self.assertEqual(stats["d"]["successes"], 2)
+        self.assertEqual(monitor.get_average_task_durations(), {"a": 3.0, "b": 6.0, "c": 8.0, "d": 10.0})
+        self.assertAlmostEqual(stats["b"]["min_duration"], 6.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
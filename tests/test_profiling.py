@@ -0,0 +1,116 @@
+"""
+Tests for core/profiling.py - per-task resource profiling
+"""
+import unittest
+import asyncio
+import json
+import os
+import shutil
+import time
+from simdecisions.runtime.ledger import EventLedger
+from simdecisions.core.profiling import TaskProfiler
+from simdecisions.core.workflow_orchestrator import (
+    AsyncWorkflowExecutor, WorkflowBuilder, WorkflowExecutor, WorkflowStatus
+)
+
+
+def burn_cpu(context):
+    deadline = time.thread_time() + 0.1
+    while time.thread_time() < deadline:
+        pass
+    return "burned"
+
+
+def sleep_a_bit(context):
+    time.sleep(0.1)
+    return "slept"
+
+
+def allocate(context):
+    block = bytearray(4 * 1024 * 1024)
+    return len(block)
+
+
+class TestTaskProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_profiling.db"
+        self.flamegraph_dir = "data/test_flamegraphs"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        shutil.rmtree(self.flamegraph_dir, ignore_errors=True)
+        self.ledger = EventLedger(db_path=self.db_path)
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        shutil.rmtree(self.flamegraph_dir, ignore_errors=True)
+
+    def build(self):
+        builder = WorkflowBuilder(workflow_id="wf-profiled", name="Profiled")
+        builder.add_task(task_id="cpu", name="CPU", handler=burn_cpu)
+        builder.add_task(task_id="sleep", name="Sleep", handler=sleep_a_bit)
+        builder.add_task(task_id="memory", name="Memory", handler=allocate, depends_on=["cpu"])
+        return builder.build()
+
+    def test_measures_cpu_memory_and_waits(self):
+        profiler = TaskProfiler()
+        executor = WorkflowExecutor(max_workers=1, ledger=self.ledger, profiler=profiler)
+        execution = executor.execute(self.build())
+        self.assertEqual(execution.status, WorkflowStatus.SUCCESS)
+
+        cpu = execution.tasks["cpu"].metadata["profile"]
+        sleep = execution.tasks["sleep"].metadata["profile"]
+        memory = execution.tasks["memory"].metadata["profile"]
+        self.assertGreaterEqual(cpu["cpu_time"], 0.09)
+        self.assertGreaterEqual(sleep["run_time"], 0.09)
+        self.assertLess(sleep["cpu_time"], 0.05)
+        self.assertGreaterEqual(memory["peak_memory"], 4 * 1024 * 1024)
+        # One worker: whichever root went second waited for the first
+        self.assertGreaterEqual(max(cpu["queue_wait"], sleep["queue_wait"]), 0.09)
+        self.assertLess(memory["queue_wait"], 0.2)
+
+        succeeded = self.ledger.query_events(event_type="task_succeeded", target="cpu")
+        self.assertIn("cpu_time", json.loads(succeeded[0]["payload_json"])["profile"])
+        self.assertIsNone(execution.metadata.get("flamegraph"))
+
+    def test_flamegraph_for_slow_tasks(self):
+        profiler = TaskProfiler(memory=False, sample_after=0.02, sample_interval=0.002,
+                                flamegraph_dir=self.flamegraph_dir)
+        executor = WorkflowExecutor(max_workers=2, ledger=self.ledger, profiler=profiler)
+        execution = executor.execute(self.build())
+
+        path = execution.metadata["flamegraph"]
+        self.assertEqual(path, os.path.join(self.flamegraph_dir, f"{execution.execution_id}.folded"))
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(any(line.startswith("Profiled;cpu;burn_cpu (test_profiling.py") for line in lines))
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+        self.assertGreater(execution.tasks["cpu"].metadata["profile"]["samples"], 0)
+        self.assertIsNone(execution.tasks["memory"].metadata["profile"]["peak_memory"])
+        succeeded = self.ledger.query_events(event_type="workflow_succeeded")
+        self.assertIn("flamegraph", succeeded[0]["payload_json"])
+
+    def test_async_and_unprofiled_executors(self):
+        async def wait(context):
+            await asyncio.sleep(0.05)
+
+        builder = WorkflowBuilder(workflow_id="wf-async-profiled", name="Async profiled")
+        builder.add_task(task_id="wait", name="Wait", handler=wait)
+        builder.add_task(task_id="cpu", name="CPU", handler=burn_cpu)
+        workflow = builder.build()
+
+        executor = AsyncWorkflowExecutor(profiler=TaskProfiler())
+        execution = asyncio.run(executor.execute_async(workflow))
+        wait_profile = execution.tasks["wait"].metadata["profile"]
+        self.assertGreaterEqual(wait_profile["run_time"], 0.04)
+        self.assertIsNone(wait_profile["cpu_time"])
+        self.assertGreaterEqual(execution.tasks["cpu"].metadata["profile"]["cpu_time"], 0.09)
+
+        execution = WorkflowExecutor().execute(self.build())
+        self.assertNotIn("profile", execution.tasks["cpu"].metadata)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Tests for core/result_cache.py - content-addressed task result memoization
+"""
+import unittest
+import os
+import json
+import shutil
+import time
+from simdecisions.runtime.ledger import EventLedger
+from simdecisions.core.result_cache import ResultCache, cache_key
+from simdecisions.core.workflow_orchestrator import WorkflowBuilder, WorkflowExecutor, TaskStatus
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = "data/test_result_cache"
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_key_is_content_addressed(self):
+        key = cache_key(("summarize", "v1"), {"fetch": {"b": 2, "a": 1}})
+        self.assertEqual(key, cache_key(("summarize", "v1"), {"fetch": {"a": 1, "b": 2}}))
+        self.assertNotEqual(key, cache_key(("summarize", "v2"), {"fetch": {"a": 1, "b": 2}}))
+        self.assertNotEqual(key, cache_key(("summarize", "v1"), {"fetch": {"a": 1, "b": 3}}))
+        # Non-JSON contexts fall back to pickle
+        self.assertEqual(cache_key(("t",), {"x": b"bytes"}), cache_key(("t",), {"x": b"bytes"}))
+
+    def test_lru_and_byte_budget(self):
+        cache = ResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # a is now most recent
+        cache.put("c", 3)
+        self.assertEqual(cache.lookup("b"), (False, None))
+        self.assertEqual(cache.lookup("a"), (True, 1))
+
+        small = ResultCache(max_bytes=1000)
+        small.put("big", b"x" * 2000)
+        self.assertFalse(small.lookup("big")[0])
+        stats = small.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["memory_entries"]), (0, 1, 0))
+
+    def test_ttl(self):
+        cache = ResultCache(ttl=60)
+        cache.put("short", "value", ttl=0.01)
+        cache.put("long", "value")
+        time.sleep(0.02)
+        self.assertFalse(cache.lookup("short")[0])
+        self.assertTrue(cache.lookup("long")[0])
+
+    def test_disk_tier_survives_restart_and_evicts(self):
+        cache = ResultCache(max_entries=1, directory=self.directory, max_disk_bytes=10_000)
+        cache.put("a", {"answer": 42})
+        cache.put("b", "x" * 100)
+
+        restarted = ResultCache(directory=self.directory, max_disk_bytes=10_000)
+        self.assertEqual(restarted.get("a"), {"answer": 42})
+        self.assertEqual(restarted.stats()["disk_hits"], 1)
+
+        for i in range(20):
+            restarted.put(f"k{i}", "y" * 1000)
+        self.assertLessEqual(restarted.stats()["disk_bytes"], 10_000)
+        # Least recently used entries left the disk tier first
+        on_disk = ResultCache(directory=self.directory)
+        self.assertFalse(on_disk.lookup("b")[0])
+        self.assertTrue(on_disk.lookup("k19")[0])
+
+        restarted.clear()
+        self.assertEqual(restarted.stats()["disk_entries"], 0)
+        self.assertEqual(ResultCache(directory=self.directory).stats()["disk_entries"], 0)
+
+
+class TestCachedTasks(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_result_cache_events.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_identical_reruns_hit_the_cache(self):
+        calls = []
+
+        def llm(context):
+            calls.append(context)
+            return f"summary of {context['fetch']}"
+
+        def build(document, version="1"):
+            builder = WorkflowBuilder(workflow_id="wf-nightly", name="Nightly Workflow")
+            builder.add_task(task_id="fetch", name="Fetch", handler=lambda context: document)
+            builder.add_task(task_id="summarize", name="Summarize", handler=llm, depends_on=["fetch"],
+                             cache=True, cache_version=version)
+            return builder.build()
+
+        executor = WorkflowExecutor(ledger=self.ledger, result_cache=ResultCache())
+        first = executor.execute(build("doc-1"))
+        second = executor.execute(build("doc-1"))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second.tasks["summarize"].status, TaskStatus.SUCCESS)
+        self.assertEqual(second.tasks["summarize"].result, "summary of doc-1")
+        self.assertTrue(second.tasks["summarize"].metadata["cache_hit"])
+        self.assertEqual(second.tasks["summarize"].attempts, 0)
+        self.assertLess(second.tasks["summarize"].duration or 0.0, 0.001)
+        self.assertEqual((first.scheduler.cache_hits, first.scheduler.cache_misses), (0, 1))
+        self.assertEqual((second.scheduler.cache_hits, second.scheduler.cache_misses), (1, 0))
+
+        # Changed inputs or a new cache_version miss
+        executor.execute(build("doc-2"))
+        executor.execute(build("doc-1", version="2"))
+        self.assertEqual(len(calls), 3)
+
+        hits = self.ledger.query_events(event_type="task_cache_hit")
+        self.assertEqual([e["target"] for e in hits], ["summarize"])
+        finished = self.ledger.query_events(event_type="workflow_succeeded", limit=10)
+        self.assertEqual(sorted(json.loads(e["payload_json"])["cache"]["hits"] for e in finished), [0, 0, 0, 1])
+
+    def test_failures_are_not_cached(self):
+        attempts = []
+
+        def flaky(context):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("provider error")
+            return "ok"
+
+        builder = WorkflowBuilder(workflow_id="wf-flaky-cache", name="Flaky Cache Workflow")
+        builder.add_task(task_id="call", name="Call", handler=flaky, cache=True)
+        executor = WorkflowExecutor(result_cache=ResultCache())
+        self.assertEqual(executor.execute(builder.build()).tasks["call"].status, TaskStatus.FAILED)
+        self.assertEqual(executor.execute(builder.build()).tasks["call"].result, "ok")
+        self.assertEqual(executor.execute(builder.build()).tasks["call"].result, "ok")
+        self.assertEqual(len(attempts), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
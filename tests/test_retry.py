@@ -0,0 +1,91 @@
+"""
+Tests for core/retry.py - retry policies and the timer wheel
+"""
+import unittest
+import random
+from simdecisions.core.retry import BackoffStrategy, RetryPolicy, TimerWheel
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_retry_filter(self):
+        policy = RetryPolicy(max_retries=2, retry_on=(ConnectionError,),
+                             retry_if=lambda e: "429" in str(e))
+        self.assertTrue(policy.should_retry(ConnectionError("429 Too Many Requests"), 0))
+        self.assertTrue(policy.should_retry(ConnectionError("429 Too Many Requests"), 1))
+        self.assertFalse(policy.should_retry(ConnectionError("429 Too Many Requests"), 2))
+        self.assertFalse(policy.should_retry(ConnectionError("500"), 0))
+        self.assertFalse(policy.should_retry(ValueError("429"), 0))
+
+    def test_exponential_backoff(self):
+        policy = RetryPolicy(max_retries=10, base_delay=0.5, max_delay=5.0, jitter=False)
+        self.assertEqual([policy.next_delay(a) for a in range(6)], [0.5, 1.0, 2.0, 4.0, 5.0, 5.0])
+
+        jittered = RetryPolicy(max_retries=10, base_delay=0.5, max_delay=5.0)
+        rng = random.Random(7)
+        for attempt in range(6):
+            delay = jittered.next_delay(attempt, rng=rng.uniform)
+            self.assertGreaterEqual(delay, 0.0)
+            self.assertLessEqual(delay, min(5.0, 0.5 * 2 ** attempt))
+
+    def test_decorrelated_jitter(self):
+        policy = RetryPolicy(max_retries=10, backoff="decorrelated_jitter", base_delay=0.1, max_delay=2.0)
+        self.assertEqual(policy.backoff, BackoffStrategy.DECORRELATED_JITTER)
+        rng = random.Random(1)
+        delay = None
+        for attempt in range(20):
+            previous = delay
+            delay = policy.next_delay(attempt, previous, rng=rng.uniform)
+            self.assertGreaterEqual(delay, 0.1)
+            self.assertLessEqual(delay, min(2.0, max(0.1, (previous or 0.1) * 3)))
+
+    def test_fixed(self):
+        policy = RetryPolicy.fixed(3, delay=0.2)
+        self.assertEqual(policy.max_retries, 3)
+        self.assertEqual({policy.next_delay(a) for a in range(3)}, {0.2})
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_retries=-1)
+
+
+class TestTimerWheel(unittest.TestCase):
+
+    def test_expires_in_order(self):
+        clock = FakeClock()
+        wheel = TimerWheel(tick=0.01, slots=8, clock=clock)
+        wheel.schedule(0.05, "b")
+        wheel.schedule(0.02, "a")
+        wheel.schedule(0.5, "far")  # several laps out
+        self.assertEqual(len(wheel), 3)
+        self.assertEqual(wheel.expire(), [])
+        self.assertAlmostEqual(wheel.next_timeout(), 0.03, places=6)
+
+        clock.now += 0.035
+        self.assertEqual(wheel.expire(), ["a"])
+        clock.now += 0.1
+        self.assertEqual(wheel.expire(), ["b"])
+        self.assertEqual(len(wheel), 1)
+        clock.now += 0.1
+        self.assertEqual(wheel.expire(), [])
+        clock.now += 1.0
+        self.assertEqual(wheel.expire(), ["far"])
+        self.assertIsNone(wheel.next_timeout())
+
+    def test_clear(self):
+        wheel = TimerWheel(clock=FakeClock())
+        for i in range(100):
+            wheel.schedule(i * 0.1, i)
+        self.assertEqual(sorted(wheel.clear()), list(range(100)))
+        self.assertEqual(len(wheel), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests for core/scheduling.py - critical-path priority scheduling
+"""
+import unittest
+import asyncio
+import threading
+import time
+from simdecisions.core.scheduling import PriorityReadyQueue, critical_path_priorities
+from simdecisions.core.workflow_orchestrator import (
+    AsyncWorkflowExecutor, WorkflowBuilder, WorkflowExecutor, WorkflowMonitor, WorkflowStatus
+)
+
+
+def noop(context):
+    return None
+
+
+class TestScheduling(unittest.TestCase):
+
+    def wide_and_deep(self, record=None, sleep=0.0):
+        lock = threading.Lock()
+
+        def task(task_id):
+            def handler(context):
+                if record is not None:
+                    with lock:
+                        record.append(task_id)
+                time.sleep(sleep)
+            return handler
+
+        # Wide tasks first: a FIFO queue would start the chain last
+        builder = WorkflowBuilder(workflow_id="wf-wide-deep", name="Wide and deep")
+        for i in range(4):
+            builder.add_task(task_id=f"w{i}", name=f"W{i}", handler=task(f"w{i}"))
+        for i in range(4):
+            builder.add_task(task_id=f"c{i}", name=f"C{i}", handler=task(f"c{i}"),
+                             depends_on=[f"c{i - 1}"] if i else [])
+        return builder.build()
+
+    def test_priority_queue_order(self):
+        queue = PriorityReadyQueue({"a": (0, -1.0), "b": (0, -5.0), "c": (-1, 0.0), "d": (0, -5.0)})
+        queue.extend(["a", "b", "c", "d"])
+        self.assertEqual(len(queue), 4)
+        self.assertEqual([queue.popleft() for _ in range(4)], ["c", "b", "d", "a"])
+
+    def test_priorities_follow_remaining_work(self):
+        workflow = self.wide_and_deep()
+        priorities = critical_path_priorities(workflow.plan, workflow.tasks, {})
+        self.assertLess(priorities["c0"], priorities["w0"])
+        self.assertLess(priorities["c0"], priorities["c1"])
+
+        # History, estimates, user priorities and domain weights all move the order
+        history = {**{f"w{i}": 10.0 for i in range(4)}, **{f"c{i}": 1.0 for i in range(4)}}
+        priorities = critical_path_priorities(workflow.plan, workflow.tasks, history)
+        self.assertLess(priorities["w0"], priorities["c0"])
+        workflow.tasks["c3"].estimated_duration = 50.0
+        priorities = critical_path_priorities(workflow.plan, workflow.tasks, history)
+        self.assertLess(priorities["c0"], priorities["w0"])
+        workflow.tasks["w1"].priority = 1
+        priorities = critical_path_priorities(workflow.plan, workflow.tasks, history)
+        self.assertLess(priorities["w1"], priorities["c0"])
+        workflow.tasks["w2"].domain = "cheap"
+        priorities = critical_path_priorities(workflow.plan, workflow.tasks, history, {"cheap": 0.01})
+        self.assertGreater(priorities["w2"], priorities["w0"])
+
+    def test_critical_path_starts_chain_first(self):
+        for scheduling, first in [("fifo", "w0"), ("critical_path", "c0")]:
+            record = []
+            executor = WorkflowExecutor(max_workers=1, scheduling=scheduling)
+            execution = executor.execute(self.wide_and_deep(record))
+            self.assertEqual(execution.status, WorkflowStatus.SUCCESS)
+            self.assertEqual(record[0], first)
+
+    def test_critical_path_shortens_makespan(self):
+        durations = {}
+        for scheduling in ("fifo", "critical_path"):
+            executor = WorkflowExecutor(max_workers=2, scheduling=scheduling)
+            durations[scheduling] = executor.execute(self.wide_and_deep(sleep=0.05)).duration
+        # fifo: two rounds of wide tasks, then the chain (~6 slots); critical path: ~4
+        self.assertLess(durations["critical_path"], durations["fifo"] - 0.05)
+
+    def test_monitor_history_drives_order(self):
+        monitor = WorkflowMonitor()
+        executor = WorkflowExecutor(max_workers=1, monitor=monitor)
+        executor.execute(self.wide_and_deep())
+        self.assertEqual(monitor.get_execution_count(), 1)
+        self.assertEqual(set(monitor.get_average_task_durations()), {"w0", "w1", "w2", "w3", "c0", "c1", "c2", "c3"})
+
+    def test_async_executor_uses_priorities(self):
+        record = []
+        executor = AsyncWorkflowExecutor(max_concurrency=1)
+        execution = asyncio.run(executor.execute_async(self.wide_and_deep(record)))
+        self.assertEqual(execution.status, WorkflowStatus.SUCCESS)
+        self.assertEqual(record[0], "c0")
+
+    def test_unknown_policy_rejected(self):
+        with self.assertRaises(ValueError):
+            WorkflowExecutor(scheduling="random")
+
+
+if __name__ == '__main__':
+    unittest.main()
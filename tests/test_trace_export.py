@@ -0,0 +1,111 @@
+"""
+Tests for core/trace_export.py - Chrome trace and OTLP span export
+"""
+import unittest
+import json
+import os
+import shutil
+import time
+from simdecisions.core.retry import RetryPolicy
+from simdecisions.core.trace_export import execution_spans, to_chrome_trace, trace_id
+from simdecisions.core.workflow_orchestrator import WorkflowBuilder, WorkflowExecutor, WorkflowStatus
+
+
+class TestTraceExport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = "data/test_traces"
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def run_workflow(self):
+        calls = []
+
+        def flaky(context):
+            calls.append(1)
+            if len(calls) == 1:
+                raise ValueError("first try fails")
+            time.sleep(0.02)
+
+        def step(context):
+            time.sleep(0.05)
+
+        builder = WorkflowBuilder(workflow_id="wf-traced", name="Traced")
+        builder.add_task(task_id="a", name="A", handler=step, domain="prep")
+        builder.add_task(task_id="b", name="B", handler=step)
+        builder.add_task(task_id="c", name="C", handler=step)
+        builder.add_task(task_id="flaky", name="Flaky", handler=flaky, depends_on=["a"],
+                         retry_policy=RetryPolicy.fixed(1, delay=0.03))
+        workflow = builder.build()
+        self.executor = WorkflowExecutor(max_workers=2)
+        execution = self.executor.execute(workflow)
+        self.assertEqual(execution.status, WorkflowStatus.SUCCESS)
+        return workflow, execution
+
+    def test_spans_cover_waits_attempts_and_backoff(self):
+        workflow, execution = self.run_workflow()
+        spans = execution_spans(execution, workflow)
+        root = spans[0]
+        self.assertEqual(root.kind, "workflow")
+        by_kind = {}
+        for span in spans:
+            by_kind.setdefault(span.kind, []).append(span)
+            self.assertLessEqual(span.start, span.end)
+            if span is not root:
+                self.assertGreaterEqual(span.start, root.start)
+                self.assertLessEqual(span.end, root.end)
+
+        self.assertEqual(sorted(s.name for s in by_kind["task"]), ["a", "b", "c", "flaky"])
+        flaky_attempts = [s for s in by_kind["attempt"] if s.attributes["task.id"] == "flaky"]
+        self.assertEqual(len(flaky_attempts), 2)
+        self.assertEqual(flaky_attempts[0].error, "first try fails")
+        backoff = [s for s in by_kind["backoff"] if s.attributes["task.id"] == "flaky"]
+        self.assertEqual(len(backoff), 1)
+        self.assertGreaterEqual(backoff[0].end - backoff[0].start, 0.02)
+        # Two workers, three roots: one of them queued behind the others
+        self.assertTrue(any(s.end - s.start >= 0.04 for s in by_kind["queue_wait"]))
+
+    def test_chrome_trace(self):
+        workflow, execution = self.run_workflow()
+        trace = to_chrome_trace(execution_spans(execution, workflow))
+        events = trace["traceEvents"]
+        attempts = [e for e in events if e.get("cat") == "attempt"]
+        self.assertEqual(len(attempts), 5)
+        # Attempts on the same worker row never overlap, and two workers need two rows
+        rows = {}
+        for event in sorted(attempts, key=lambda e: e["ts"]):
+            self.assertGreaterEqual(event["ts"], rows.get(event["tid"], 0))
+            rows[event["tid"]] = event["ts"] + event["dur"]
+        self.assertEqual(len(rows), 2)
+        counters = [e["args"]["running"] for e in events if e["ph"] == "C"]
+        self.assertEqual(max(counters), 2)
+        self.assertEqual(counters[-1], 0)
+
+        path = self.executor.export_trace(execution.execution_id, os.path.join(self.directory, "run.json"))
+        with open(path) as f:
+            self.assertEqual(len(json.load(f)["traceEvents"]), len(events))
+
+    def test_otlp_file(self):
+        workflow, execution = self.run_workflow()
+        path = self.executor.export_trace(execution.execution_id,
+                                          os.path.join(self.directory, "run.otlp.json"), format="otlp")
+        with open(path) as f:
+            document = json.load(f)
+        spans = document["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        self.assertEqual({s["traceId"] for s in spans}, {trace_id(execution)})
+        self.assertEqual(len(trace_id(execution)), 32)
+        ids = {s["spanId"] for s in spans}
+        self.assertEqual(len(ids), len(spans))
+        self.assertTrue(all(s["parentSpanId"] in ids for s in spans if "parentSpanId" in s))
+        self.assertEqual(sum("parentSpanId" not in s for s in spans), 1)
+        failed = [s for s in spans if s["status"]["code"] == 2]
+        self.assertEqual([s["name"] for s in failed], ["flaky #1"])
+        self.assertTrue(all(int(s["endTimeUnixNano"]) >= int(s["startTimeUnixNano"]) for s in spans))
+        with self.assertRaises(ValueError):
+            self.executor.export_trace(execution.execution_id, path, format="svg")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,17 @@
 import unittest
 import time
 import os
+import json
+import asyncio
+import threading
+import multiprocessing
+from unittest import mock
 from simdecisions.runtime.ledger import EventLedger
-from simdecisions.core.workflow_orchestrator import WorkflowBuilder, WorkflowExecutor, WorkflowStatus, TaskStatus
+from simdecisions.core.workflow_orchestrator import (
+    WorkflowBuilder, WorkflowExecutor, AsyncWorkflowExecutor, WorkflowStatus, TaskStatus, BranchCondition
+)
+from simdecisions.core.result_cache import ResultCache
+from simdecisions.core.retry import RetryPolicy
 
 # Simple task handlers for testing
 def handler_success(context):
@@ -13,6 +22,26 @@ def handler_fail(context):
     time.sleep(0.1)
     raise ValueError("This task is designed to fail")
 
+# Process-backend handlers must be importable from worker processes
+def handler_pid(context):
+    return os.getpid()
+
+def handler_big_payload(context):
+    return b"x" * (2 * 1024 * 1024)
+
+def handler_payload_size(context):
+    return len(context["produce"])
+
+def handler_process_fail(context):
+    raise ValueError("This process task is designed to fail")
+
+def handler_slow(context):
+    time.sleep(2)
+
+def handler_nap_pid(context):
+    time.sleep(1)
+    return os.getpid()
+
 class TestWorkflowOrchestrator(unittest.TestCase):
 
     def setUp(self):
@@ -91,5 +120,814 @@ class TestWorkflowOrchestrator(unittest.TestCase):
         self.assertEqual(event_types.count("task_retrying"), 1) # task_bad
         self.assertEqual(event_types.count("task_failed"), 1) # task_bad after retry
 
+    def test_ready_queue_runs_large_dag(self):
+        """
+        Tests that a wide, layered DAG runs every task exactly once, after its dependencies.
+        """
+        finished = []
+
+        def record(task_id):
+            def handler(context):
+                finished.append(task_id)
+                return task_id
+            return handler
+
+        builder = WorkflowBuilder(workflow_id="wf-large", name="Large Workflow")
+        width, depth = 50, 40
+        for layer in range(depth):
+            for i in range(width):
+                deps = [f"t{layer - 1}_{j}" for j in (i, (i + 1) % width)] if layer else []
+                builder.add_task(task_id=f"t{layer}_{i}", name=f"T{layer}.{i}", handler=record(f"t{layer}_{i}"),
+                                 depends_on=deps)
+        workflow = builder.build()
+
+        result = WorkflowExecutor(max_workers=4).execute(workflow)
+
+        self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+        self.assertEqual(len(finished), width * depth)
+        position = {task_id: i for i, task_id in enumerate(finished)}
+        for task_id, task_def in workflow.tasks.items():
+            for dep in task_def.depends_on:
+                self.assertLess(position[dep], position[task_id])
+
+        metrics = result.scheduler
+        self.assertEqual(metrics.tasks_dispatched, width * depth)
+        self.assertGreater(metrics.dispatch_rate, 0)
+        self.assertGreater(metrics.scheduler_time, 0)
+        self.assertLessEqual(metrics.scheduler_time + metrics.wait_time, metrics.wall_time + 1e-6)
+
+    def test_failure_skips_descendants(self):
+        """
+        Tests that every descendant of a failed task ends SKIPPED and is logged as such.
+        """
+        builder = WorkflowBuilder(workflow_id="wf-blocked", name="Blocked Workflow")
+        builder.add_task(task_id="task_bad", name="Bad Task", handler=handler_fail, domain="test")
+        builder.add_task(task_id="task_after", name="After", handler=handler_success, depends_on=["task_bad"])
+        builder.add_task(task_id="task_later", name="Later", handler=handler_success, depends_on=["task_after"])
+        builder.add_task(task_id="task_other", name="Other", handler=handler_success)
+        result = self.executor.execute(builder.build())
+
+        self.assertEqual(result.status, WorkflowStatus.FAILED)
+        self.assertEqual(result.tasks["task_after"].status, TaskStatus.SKIPPED)
+        self.assertEqual(result.tasks["task_later"].status, TaskStatus.SKIPPED)
+        self.assertEqual(result.tasks["task_other"].status, TaskStatus.SUCCESS)
+        self.assertEqual(result.tasks["task_after"].metadata["skip_reason"]["upstream"], "task_bad")
+        self.assertEqual(result.scheduler.tasks_dispatched, 2)
+
+        skipped = self.ledger.query_events(event_type="task_skipped")
+        self.assertEqual(sorted(e["target"] for e in skipped), ["task_after", "task_later"])
+
+    def test_skip_events_are_written_as_they_happen(self):
+        """
+        Tests that a cascade skip reaches the ledger, stamped with its own time, while the run goes on.
+        """
+        for executor in (self.executor, AsyncWorkflowExecutor(ledger=self.ledger)):
+            after = f"later_{type(executor).__name__}"
+
+            def watch(context, after=after):
+                time.sleep(0.5)  # well after task_bad fails
+                return len(self.ledger.query_events(event_type="task_skipped", target=after))
+
+            builder = WorkflowBuilder(workflow_id="wf-live-skips", name="Live Skips")
+            builder.add_task(task_id="task_bad", name="Bad Task", handler=handler_fail)
+            builder.add_task(task_id=after, name="Later", handler=handler_success, depends_on=["task_bad"])
+            builder.add_task(task_id="watch", name="Watch", handler=watch)
+            result = executor.execute(builder.build())
+
+            self.assertEqual(result.tasks["watch"].result, 1)
+            skipped = self.ledger.query_events(event_type="task_skipped", target=after)[0]
+            failed = self.ledger.query_events(event_type="task_failed", target="task_bad")[0]
+            watched = self.ledger.query_events(event_type="task_succeeded", target="watch")[0]
+            self.assertGreaterEqual(skipped["timestamp"], failed["timestamp"])
+            self.assertLess(skipped["timestamp"], watched["timestamp"])
+
+    def test_skip_events_survive_a_scheduler_error(self):
+        """
+        Tests that cascade-skip events queued before the scheduling loop raises still reach the ledger.
+        """
+        for executor in (self.executor, AsyncWorkflowExecutor(ledger=self.ledger)):
+            resolve = executor._resolve
+
+            def failing_resolve(graph, task_id, resolve=resolve):
+                resolve(graph, task_id)
+                raise RuntimeError("scheduler bug")
+
+            executor._resolve = failing_resolve
+            after = f"after_{type(executor).__name__}"
+            builder = WorkflowBuilder(workflow_id="wf-crash", name="Crash")
+            builder.add_task(task_id="task_bad", name="Bad Task", handler=handler_fail)
+            builder.add_task(task_id=after, name="After", handler=handler_success, depends_on=["task_bad"])
+            result = executor.execute(builder.build())
+
+            self.assertEqual(result.status, WorkflowStatus.FAILED)
+            self.assertEqual(result.tasks[after].status, TaskStatus.SKIPPED)
+            self.assertEqual(len(self.ledger.query_events(event_type="task_skipped", target=after)), 1)
+
+    def test_branch_conditions(self):
+        """
+        Tests IF_FAILED, IF_SKIPPED and ALWAYS edges.
+        """
+        builder = WorkflowBuilder(workflow_id="wf-branch", name="Branching Workflow")
+        builder.add_task(task_id="work", name="Work", handler=handler_fail)
+        builder.add_task(task_id="on_success", name="On Success", handler=handler_success, depends_on=["work"])
+        builder.add_task(task_id="on_failure", name="On Failure", handler=handler_success, depends_on=["work"],
+                         branch_conditions={"work": BranchCondition.IF_FAILED})
+        builder.add_task(task_id="on_skip", name="On Skip", handler=handler_success, depends_on=["on_success"],
+                         branch_conditions={"on_success": "if_skipped"})
+        builder.add_task(task_id="cleanup", name="Cleanup", handler=handler_success,
+                         depends_on=["work", "on_success", "on_failure"],
+                         branch_conditions={dep: BranchCondition.ALWAYS for dep in ("work", "on_success", "on_failure")})
+        result = WorkflowExecutor(max_workers=2).execute(builder.build())
+
+        statuses = {task_id: task.status for task_id, task in result.tasks.items()}
+        self.assertEqual(statuses, {
+            "work": TaskStatus.FAILED,
+            "on_success": TaskStatus.SKIPPED,
+            "on_failure": TaskStatus.SUCCESS,
+            "on_skip": TaskStatus.SUCCESS,
+            "cleanup": TaskStatus.SUCCESS,
+        })
+        self.assertEqual(result.status, WorkflowStatus.FAILED)
+
+    def test_fail_fast_cancels_queued_tasks(self):
+        """
+        Tests that fail-fast stops dispatching and skips everything not yet started.
+        """
+        started = []
+
+        def slow(context):
+            started.append(True)
+            time.sleep(0.2)
+            return "done"
+
+        builder = WorkflowBuilder(workflow_id="wf-fast", name="Fail Fast Workflow")
+        builder.add_task(task_id="task_bad", name="Bad Task", handler=lambda context: 1 / 0)
+        for i in range(10):
+            builder.add_task(task_id=f"sibling_{i}", name=f"Sibling {i}", handler=slow)
+        builder.add_task(task_id="task_after", name="After", handler=handler_success, depends_on=["sibling_0"])
+
+        begin = time.time()
+        result = WorkflowExecutor(max_workers=2, fail_fast=True).execute(builder.build())
+
+        self.assertEqual(result.status, WorkflowStatus.FAILED)
+        self.assertLess(time.time() - begin, 1.0)
+        self.assertLess(len(started), 10)
+        self.assertEqual(len(result.tasks), 12)
+        skipped = [t for t in result.tasks.values() if t.status == TaskStatus.SKIPPED]
+        self.assertEqual(len(skipped), 12 - 1 - len(started))
+        self.assertTrue(all(t.metadata["skip_reason"] == {"fail_fast": True} for t in skipped))
+
+    def test_fail_fast_stops_running_siblings(self):
+        """
+        Tests that fail-fast cancels the tokens of siblings already running.
+        """
+        def polling(context, token):
+            for _ in range(300):
+                token.raise_if_cancelled()
+                time.sleep(0.01)
+            return "finished"
+
+        def failing(context):
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        builder = WorkflowBuilder(workflow_id="wf-fast-running", name="Fail Fast Running")
+        builder.add_task(task_id="task_bad", name="Bad Task", handler=failing)
+        builder.add_task(task_id="sibling", name="Sibling", handler=polling)
+        workflow = builder.build()
+
+        for executor in (WorkflowExecutor(max_workers=2, fail_fast=True),
+                         AsyncWorkflowExecutor(fail_fast=True)):
+            begin = time.time()
+            result = executor.execute(workflow)
+            self.assertLess(time.time() - begin, 1.0)
+            self.assertEqual(result.status, WorkflowStatus.FAILED)
+            self.assertIn(result.tasks["sibling"].status, (TaskStatus.CANCELLED, TaskStatus.SKIPPED))
+            self.assertEqual(result.errors, ["task_bad: boom"])
+
+    def test_backoff_does_not_hold_a_worker(self):
+        """
+        Tests that a task backing off before a retry gives its worker to other tasks.
+        """
+        order = []
+
+        def flaky(context):
+            order.append("flaky")
+            if order.count("flaky") == 1:
+                raise ConnectionError("429 Too Many Requests")
+            return "ok"
+
+        def other(context):
+            order.append("other")
+            time.sleep(0.05)
+
+        builder = WorkflowBuilder(workflow_id="wf-backoff", name="Backoff Workflow")
+        builder.add_task(task_id="flaky", name="Flaky", handler=flaky,
+                         retry_policy=RetryPolicy(max_retries=2, base_delay=0.3, jitter=False))
+        for i in range(3):
+            builder.add_task(task_id=f"other_{i}", name=f"Other {i}", handler=other)
+        builder.add_task(task_id="picky", name="Picky", handler=handler_fail,
+                         retry_policy=RetryPolicy(max_retries=3, retry_on=(ConnectionError,)))
+        result = WorkflowExecutor(max_workers=1, ledger=self.ledger).execute(builder.build())
+
+        self.assertEqual(order, ["flaky", "other", "other", "other", "flaky"])
+        self.assertEqual(result.tasks["flaky"].status, TaskStatus.SUCCESS)
+        self.assertEqual(result.tasks["flaky"].attempts, 2)
+        # ValueError is not in retry_on, so no retry
+        self.assertEqual(result.tasks["picky"].attempts, 1)
+
+        retrying = self.ledger.query_events(event_type="task_retrying")
+        self.assertEqual(len(retrying), 1)
+        self.assertEqual(json.loads(retrying[0]["payload_json"])["delay"], 0.3)
+        self.assertEqual(len(self.ledger.query_events(event_type="task_running", target="flaky")), 1)
+
+    def test_due_retry_waits_in_ready_queue(self):
+        """
+        Tests that a retry coming due while the worker is busy queues behind tasks already ready.
+        """
+        for executor in [WorkflowExecutor(max_workers=1, scheduling="fifo"),
+                         AsyncWorkflowExecutor(max_concurrency=1, scheduling="fifo")]:
+            order = []
+
+            def flaky(context):
+                order.append("flaky")
+                if order.count("flaky") == 1:
+                    raise ConnectionError("429 Too Many Requests")
+
+            def other(context):
+                order.append("other")
+                time.sleep(0.05)
+
+            builder = WorkflowBuilder(workflow_id="wf-due-retry", name="Due Retry Workflow")
+            builder.add_task(task_id="flaky", name="Flaky", handler=flaky,
+                             retry_policy=RetryPolicy(max_retries=1, base_delay=0.001, jitter=False))
+            for i in range(3):
+                builder.add_task(task_id=f"other_{i}", name=f"Other {i}", handler=other)
+            result = executor.execute(builder.build())
+
+            self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+            self.assertEqual(order, ["flaky", "other", "other", "other", "flaky"])
+
+
+class TestExecutionBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_backend_events.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+        self.executor = WorkflowExecutor(max_workers=2, ledger=self.ledger, share_threshold=1024,
+                                         domain_backends={"glue": "inline"})
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_backend_selection(self):
+        builder = WorkflowBuilder(workflow_id="wf-backends", name="Backends Workflow")
+        builder.add_task(task_id="cpu", name="CPU", handler=handler_pid, backend="process")
+        builder.add_task(task_id="io", name="IO", handler=lambda context: threading.current_thread().name)
+        builder.add_task(task_id="glue", name="Glue", handler=lambda context: threading.current_thread().name,
+                         domain="glue")
+        result = self.executor.execute(builder.build())
+
+        self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+        self.assertNotEqual(result.tasks["cpu"].result, os.getpid())
+        self.assertEqual(result.tasks["glue"].result, threading.current_thread().name)
+        self.assertNotEqual(result.tasks["io"].result, threading.current_thread().name)
+
+        with self.assertRaises(ValueError):
+            builder.add_task(task_id="bad", name="Bad", handler=handler_pid, backend="gpu")
+
+    def test_process_workers_are_reused(self):
+        builder = WorkflowBuilder(workflow_id="wf-process-pool", name="Process Pool Workflow")
+        for i in range(200):
+            builder.add_task(task_id=f"t{i}", name=f"T{i}", handler=handler_pid, backend="process")
+        workflow = builder.build()
+        executor = WorkflowExecutor(max_workers=4, process_workers=4)
+        try:
+            executor.execute(workflow)  # start the workers
+            begin = time.time()
+            result = executor.execute(workflow)
+            elapsed = time.time() - begin
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+        # A process per task would show up as 200 pids and seconds of start-up cost
+        self.assertLessEqual(len({task.result for task in result.tasks.values()}), 4)
+        self.assertLess(elapsed, 2.0)
+
+    def test_shutdown_stops_busy_workers(self):
+        builder = WorkflowBuilder(workflow_id="wf-process-shutdown", name="Process Shutdown Workflow")
+        builder.add_task(task_id="quick", name="Quick", handler=handler_pid, backend="process")
+        builder.add_task(task_id="nap", name="Nap", handler=handler_nap_pid, backend="process")
+        executor = WorkflowExecutor(max_workers=2, process_workers=2)
+        results = []
+        runner = threading.Thread(target=lambda: results.append(executor.execute(builder.build())))
+        runner.start()
+        time.sleep(0.5)
+        executor.shutdown()  # "quick" is idle by now, "nap" still running
+        runner.join()
+
+        result = results[0]
+        self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+        pids = {result.tasks["quick"].result, result.tasks["nap"].result}
+        self.assertFalse(pids & {p.pid for p in multiprocessing.active_children()})
+
+        # No worker starts after shutdown
+        rerun = executor.execute(builder.build())
+        self.assertEqual(rerun.tasks["quick"].status, TaskStatus.FAILED)
+
+    def test_large_results_pass_through_shared_memory(self):
+        shm_before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+        builder = WorkflowBuilder(workflow_id="wf-shared", name="Shared Memory Workflow")
+        builder.add_task(task_id="produce", name="Produce", handler=handler_big_payload, backend="process")
+        builder.add_task(task_id="consume", name="Consume", handler=handler_payload_size, backend="process",
+                         depends_on=["produce"])
+        builder.add_task(task_id="local", name="Local", handler=lambda context: len(context["produce"]),
+                         depends_on=["produce"])
+        result = self.executor.execute(builder.build())
+
+        self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+        self.assertEqual(result.tasks["consume"].result, 2 * 1024 * 1024)
+        self.assertEqual(result.tasks["local"].result, 2 * 1024 * 1024)
+        # Handles are swapped for values and their blocks freed once the run ends
+        self.assertEqual(result.outputs["produce"], b"x" * (2 * 1024 * 1024))
+        if os.path.isdir("/dev/shm"):
+            self.assertEqual(set(os.listdir("/dev/shm")) - shm_before, set())
+
+        succeeded = self.ledger.query_events(event_type="task_succeeded", target="produce")
+        self.assertIn("SharedResult", succeeded[0]["payload_json"])
+
+    def test_shared_memory_freed_when_run_fails(self):
+        class BrokenCache(ResultCache):
+            def lookup(self, key):
+                raise OSError("cache down")
+
+        shm_before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+        executor = WorkflowExecutor(share_threshold=1024, result_cache=BrokenCache())
+        builder = WorkflowBuilder(workflow_id="wf-shared-fail", name="Shared Memory Failure Workflow")
+        builder.add_task(task_id="produce", name="Produce", handler=handler_big_payload, backend="process")
+        builder.add_task(task_id="consume", name="Consume", handler=handler_payload_size, backend="process",
+                         depends_on=["produce"], cache=True)
+        try:
+            result = executor.execute(builder.build())
+        finally:
+            executor.shutdown()
+
+        # The cache error escapes the scheduling loop after produce shared its result
+        self.assertEqual(result.status, WorkflowStatus.FAILED)
+        self.assertIn("cache down", result.errors)
+        if os.path.isdir("/dev/shm"):
+            self.assertEqual(set(os.listdir("/dev/shm")) - shm_before, set())
+
+    def test_process_retries_and_timeout(self):
+        builder = WorkflowBuilder(workflow_id="wf-process-fail", name="Process Failure Workflow")
+        builder.add_task(task_id="flaky", name="Flaky", handler=handler_process_fail, backend="process", retries=1)
+        builder.add_task(task_id="slow", name="Slow", handler=handler_slow, backend="process", timeout=0.2)
+        result = self.executor.execute(builder.build())
+
+        self.assertEqual(result.status, WorkflowStatus.FAILED)
+        self.assertEqual(result.tasks["flaky"].attempts, 2)
+        self.assertIn("flaky: This process task is designed to fail", result.errors)
+        self.assertEqual(result.tasks["slow"].error, "Task slow timeout")
+
+        event_types = [e['event_type'] for e in self.ledger.query_events(limit=100)]
+        self.assertEqual(event_types.count("task_retrying"), 1)
+        self.assertEqual(event_types.count("task_failed"), 2)
+
+    def test_async_executor_process_backend(self):
+        builder = WorkflowBuilder(workflow_id="wf-async-process", name="Async Process Workflow")
+        builder.add_task(task_id="produce", name="Produce", handler=handler_big_payload, backend="process")
+        builder.add_task(task_id="consume", name="Consume", handler=handler_payload_size, backend="process",
+                         depends_on=["produce"])
+        executor = AsyncWorkflowExecutor(share_threshold=1024)
+        try:
+            result = executor.execute(builder.build())
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+        self.assertEqual(result.tasks["consume"].result, 2 * 1024 * 1024)
+
+
+class TestAsyncWorkflowExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_async_workflow_events.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path, group_commit=True)
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_many_concurrent_async_tasks(self):
+        async def call_llm(context):
+            await asyncio.sleep(0.2)
+            return "ok"
+
+        builder = WorkflowBuilder(workflow_id="wf-async", name="Async Workflow")
+        for i in range(500):
+            builder.add_task(task_id=f"call_{i}", name=f"Call {i}", handler=call_llm, domain="llm")
+        builder.add_task(task_id="gather", name="Gather", handler=lambda context: len(context),
+                         depends_on=[f"call_{i}" for i in range(500)])
+
+        begin = time.time()
+        result = AsyncWorkflowExecutor(max_workers=2).execute(builder.build())
+
+        self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+        self.assertLess(time.time() - begin, 2.0)
+        self.assertEqual(result.tasks["gather"].result, 500)
+
+    def test_domain_limits(self):
+        running = {"llm": 0, "db": 0}
+        peak = {"llm": 0, "db": 0}
+
+        def track(domain):
+            async def handler(context):
+                running[domain] += 1
+                peak[domain] = max(peak[domain], running[domain])
+                await asyncio.sleep(0.02)
+                running[domain] -= 1
+            return handler
+
+        builder = WorkflowBuilder(workflow_id="wf-limits", name="Limited Workflow")
+        for i in range(20):
+            builder.add_task(task_id=f"llm_{i}", name="LLM", handler=track("llm"), domain="llm")
+            builder.add_task(task_id=f"db_{i}", name="DB", handler=track("db"), domain="db")
+        executor = AsyncWorkflowExecutor(max_concurrency=10, domain_limits={"llm": 3})
+        result = asyncio.run(executor.execute_async(builder.build()))
+
+        self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+        self.assertEqual(peak["llm"], 3)
+        self.assertLessEqual(peak["db"], 10)
+
+    def test_ledger_writes_do_not_block_the_loop(self):
+        """
+        Tests that with a plain (not group-commit) ledger, events are queued from the loop and committed by the time the run returns.
+        """
+        self.ledger.close()
+        os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+        builder = WorkflowBuilder(workflow_id="wf-nonblocking", name="Non-blocking Workflow")
+        builder.add_task(task_id="task_bad", name="Bad Task", handler=handler_fail)
+        builder.add_task(task_id="task_after", name="After", handler=handler_success, depends_on=["task_bad"])
+        builder.add_task(task_id="task_good", name="Good Task", handler=handler_success)
+        executor = AsyncWorkflowExecutor(ledger=self.ledger)
+
+        blocking = AssertionError("blocking ledger call on the event loop")
+        with mock.patch.object(self.ledger, "record_event", side_effect=blocking), \
+                mock.patch.object(self.ledger, "record_events", side_effect=blocking):
+            result = asyncio.run(executor.execute_async(builder.build()))
+
+        self.assertEqual(result.status, WorkflowStatus.FAILED)
+        event_types = [e["event_type"] for e in self.ledger.query_events(limit=100)]
+        self.assertEqual(event_types.count("task_succeeded"), 1)
+        self.assertEqual(event_types.count("task_skipped"), 1)
+        self.assertEqual(event_types.count("workflow_started"), 1)
+        self.assertEqual(event_types.count("workflow_failed"), 1)
+
+    def test_matches_sync_executor_events(self):
+        """
+        Tests that mixed sync/async handlers produce the same statuses and events as the thread executor.
+        """
+        async def handler_async(context):
+            return {"result": "async"}
+
+        builder = WorkflowBuilder(workflow_id="wf-mixed", name="Mixed Workflow")
+        builder.add_task(task_id="task_good", name="Good Task", handler=handler_async, domain="test")
+        builder.add_task(task_id="task_sync", name="Sync Task", handler=handler_success, domain="test",
+                         depends_on=["task_good"])
+        builder.add_task(task_id="task_bad", name="Bad Task", handler=handler_fail, domain="test",
+                         depends_on=["task_sync"], retries=1)
+        builder.add_task(task_id="task_after", name="After", handler=handler_async, depends_on=["task_bad"])
+        result = AsyncWorkflowExecutor(ledger=self.ledger).execute(builder.build())
+
+        self.assertEqual(result.status, WorkflowStatus.FAILED)
+        self.assertEqual(result.tasks["task_good"].result, {"result": "async"})
+        self.assertEqual(result.tasks["task_bad"].attempts, 2)
+        self.assertEqual(result.tasks["task_after"].status, TaskStatus.SKIPPED)
+        self.assertIn("task_bad: This task is designed to fail", result.errors)
+
+        event_types = [e['event_type'] for e in self.ledger.query_events(limit=100)]
+        self.assertEqual(event_types.count("workflow_started"), 1)
+        self.assertEqual(event_types.count("task_running"), 3)
+        self.assertEqual(event_types.count("task_succeeded"), 2)
+        self.assertEqual(event_types.count("task_retrying"), 1)
+        self.assertEqual(event_types.count("task_failed"), 1)
+        self.assertEqual(event_types.count("task_skipped"), 1)
+        self.assertEqual(event_types.count("workflow_failed"), 1)
+
+    def test_async_timeout(self):
+        async def hang(context):
+            await asyncio.sleep(5)
+
+        builder = WorkflowBuilder(workflow_id="wf-timeout", name="Timeout Workflow")
+        builder.add_task(task_id="hang", name="Hang", handler=hang, timeout=0.1)
+        result = AsyncWorkflowExecutor().execute(builder.build())
+
+        self.assertEqual(result.status, WorkflowStatus.FAILED)
+        self.assertEqual(result.tasks["hang"].error, "Task hang timeout")
+
+
+
+class TestTimeoutsAndCancellation(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_cancellation_events.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path)
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_sub_second_timeouts_in_worker_threads(self):
+        stopped = threading.Event()
+
+        def cooperative(context, token):
+            token.wait(5)
+            stopped.set()
+
+        builder = WorkflowBuilder(workflow_id="wf-thread-timeout", name="Thread Timeout Workflow")
+        builder.add_task(task_id="hang", name="Hang", handler=lambda context: time.sleep(1), timeout=0.1)
+        builder.add_task(task_id="polite", name="Polite", handler=cooperative, timeout=0.1)
+        builder.add_task(task_id="quick", name="Quick", handler=handler_success, timeout=0.5)
+
+        begin = time.time()
+        result = WorkflowExecutor(max_workers=3).execute(builder.build())
+
+        self.assertLess(time.time() - begin, 0.5)
+        self.assertEqual(result.tasks["hang"].error, "Task hang timeout")
+        self.assertEqual(result.tasks["polite"].error, "Task polite timeout")
+        self.assertEqual(result.tasks["quick"].status, TaskStatus.SUCCESS)
+        # The timeout reached the handler through its token
+        self.assertTrue(stopped.wait(1))
+
+    def test_process_task_is_killed_on_timeout(self):
+        builder = WorkflowBuilder(workflow_id="wf-kill", name="Kill Workflow")
+        builder.add_task(task_id="slow", name="Slow", handler=handler_slow, backend="process", timeout=0.2)
+        executor = WorkflowExecutor()
+
+        begin = time.time()
+        result = executor.execute(builder.build())
+
+        self.assertLess(time.time() - begin, 1.5)
+        self.assertEqual(result.tasks["slow"].error, "Task slow timeout")
+
+    def test_cancel_stops_run_mid_flight(self):
+        running = threading.Event()
+
+        def wait_for_cancel(context, token):
+            running.set()
+            token.wait(5)
+            token.raise_if_cancelled()
+
+        builder = WorkflowBuilder(workflow_id="wf-cancel", name="Cancel Workflow")
+        builder.add_task(task_id="first", name="First", handler=handler_success)
+        builder.add_task(task_id="polite", name="Polite", handler=wait_for_cancel, depends_on=["first"])
+        builder.add_task(task_id="stubborn", name="Stubborn", handler=lambda context: time.sleep(1),
+                         depends_on=["first"])
+        builder.add_task(task_id="killed", name="Killed", handler=handler_slow, backend="process",
+                         depends_on=["first"])
+        builder.add_task(task_id="after", name="After", handler=handler_success, depends_on=["polite"])
+
+        executor = WorkflowExecutor(max_workers=4, ledger=self.ledger)
+
+        def cancel_when_running():
+            running.wait(5)
+            execution_id = next(iter(executor.executions))
+            self.assertTrue(executor.cancel(execution_id, "user request"))
+
+        threading.Thread(target=cancel_when_running).start()
+        begin = time.time()
+        result = executor.execute(builder.build())
+
+        self.assertLess(time.time() - begin, 0.8)
+        self.assertEqual(result.status, WorkflowStatus.CANCELLED)
+        self.assertEqual(result.tasks["first"].status, TaskStatus.SUCCESS)
+        for task_id in ["polite", "stubborn", "killed", "after"]:
+            self.assertEqual(result.tasks[task_id].status, TaskStatus.CANCELLED)
+            self.assertEqual(result.tasks[task_id].metadata["cancel_reason"], "user request")
+
+        event_types = [e['event_type'] for e in self.ledger.query_events(limit=100)]
+        self.assertEqual(event_types.count("task_cancelled"), 4)
+        self.assertEqual(event_types.count("workflow_cancelled"), 1)
+        self.assertNotIn("task_failed", event_types)
+
+        # The stubborn handler finishes detached without touching the cancelled record
+        time.sleep(1)
+        self.assertEqual(result.tasks["stubborn"].status, TaskStatus.CANCELLED)
+
+    def test_async_cancel(self):
+        async def run():
+            async def hang(context):
+                await asyncio.sleep(5)
+
+            builder = WorkflowBuilder(workflow_id="wf-async-cancel", name="Async Cancel Workflow")
+            for i in range(10):
+                builder.add_task(task_id=f"hang_{i}", name=f"Hang {i}", handler=hang)
+            builder.add_task(task_id="after", name="After", handler=hang, depends_on=["hang_0"])
+
+            executor = AsyncWorkflowExecutor()
+            asyncio.get_running_loop().call_later(
+                0.1, lambda: next(iter(executor.executions.values())).cancel()
+            )
+            return await executor.execute_async(builder.build())
+
+        begin = time.time()
+        result = asyncio.run(run())
+
+        self.assertLess(time.time() - begin, 1.0)
+        self.assertEqual(result.status, WorkflowStatus.CANCELLED)
+        self.assertEqual(len(result.tasks), 11)
+        self.assertTrue(all(t.status == TaskStatus.CANCELLED for t in result.tasks.values()))
+
+
+def handler_square(context):
+    return context["item"] ** 2
+
+
+class TestMapAndSubworkflows(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "data/test_dynamic_events.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.ledger = EventLedger(db_path=self.db_path, group_commit=True)
+
+    def tearDown(self):
+        self.ledger.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_map_fans_out_with_bounded_concurrency(self):
+        pulled, running, peak = [], [0], [0]
+        lock = threading.Lock()
+
+        def items(context):
+            def generate():
+                for i in range(10):
+                    pulled.append(i)
+                    yield i
+            return generate()
+
+        def work(context):
+            with lock:
+                # Items are pulled from the generator only as slots free up
+                self.assertLessEqual(len(pulled), context["index"] + 3)
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return context["item"] * 10
+
+        builder = WorkflowBuilder(workflow_id="wf-map", name="Map")
+        builder.add_task(task_id="source", name="Source", handler=items)
+        builder.add_map(task_id="work", name="Work", handler=work, over="source", max_concurrency=3)
+        builder.add_task(task_id="total", name="Total", handler=lambda c: sum(c["work"]), depends_on=["work"])
+        result = WorkflowExecutor(max_workers=8, ledger=self.ledger).execute(builder.build())
+
+        self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+        self.assertEqual(result.tasks["work"].result, [i * 10 for i in range(10)])
+        self.assertEqual(result.tasks["total"].result, 450)
+        self.assertEqual(peak[0], 3)
+        self.assertEqual(result.tasks["work[4]"].metadata["map_task"], "work")
+        self.assertEqual(result.tasks["work"].metadata["map_items"], 10)
+        self.assertEqual(len(self.ledger.query_events(event_type="task_succeeded", limit=100)), 13)
+
+    def test_map_reduce_retries_and_failures(self):
+        flaky_calls = []
+
+        def flaky(context):
+            flaky_calls.append(context["index"])
+            if context["index"] == 2 and flaky_calls.count(2) == 1:
+                raise ValueError("transient")
+            return context["item"]
+
+        builder = WorkflowBuilder(workflow_id="wf-reduce", name="Reduce")
+        builder.add_task(task_id="source", name="Source", handler=lambda c: [1, 2, 3, 4])
+        builder.add_map(task_id="sum", name="Sum", handler=flaky, over="source", max_concurrency=2,
+                        reduce=lambda acc, x: acc + x, initial=0,
+                        retry_policy=RetryPolicy.fixed(1, delay=0.01))
+        builder.add_map(task_id="squares", name="Squares", handler=handler_square, over="source",
+                        backend="process")
+        builder.add_map(task_id="broken", name="Broken", handler=handler_fail, over="source")
+        builder.add_task(task_id="after", name="After", handler=handler_success, depends_on=["broken"])
+        builder.add_task(task_id="empty", name="Empty", handler=lambda c: [])
+        builder.add_map(task_id="none", name="None", handler=handler_square, over="empty")
+        builder.add_task(task_id="scalar", name="Scalar", handler=lambda c: 5)
+        builder.add_map(task_id="bad", name="Bad", handler=handler_square, over="scalar")
+        result = WorkflowExecutor(max_workers=4).execute(builder.build())
+
+        self.assertEqual(result.tasks["sum"].result, 10)
+        self.assertEqual(result.tasks["sum[2]"].attempts, 2)
+        self.assertEqual(result.tasks["squares"].result, [1, 4, 9, 16])
+        self.assertEqual(result.tasks["broken"].status, TaskStatus.FAILED)
+        self.assertEqual(result.tasks["after"].status, TaskStatus.SKIPPED)
+        self.assertEqual(result.tasks["none"].result, [])
+        self.assertEqual(result.tasks["bad"].status, TaskStatus.FAILED)
+        self.assertIn("iterable", result.tasks["bad"].error)
+        self.assertEqual(result.status, WorkflowStatus.FAILED)
+
+    def test_async_map(self):
+        async def double(context):
+            await asyncio.sleep(0.01)
+            return context["item"] * 2
+
+        builder = WorkflowBuilder(workflow_id="wf-async-map", name="Async map")
+        builder.add_task(task_id="source", name="Source", handler=lambda c: range(50))
+        builder.add_map(task_id="double", name="Double", handler=double, over="source", max_concurrency=10)
+        result = AsyncWorkflowExecutor().execute(builder.build())
+        self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+        self.assertEqual(result.tasks["double"].result, [i * 2 for i in range(50)])
+
+    def child_workflow(self):
+        def check(context):
+            if context["config"]["fail"]:
+                raise ValueError("child failed")
+            return context["config"]["value"] + 1
+
+        child = WorkflowBuilder(workflow_id="wf-child", name="Child")
+        child.add_task(task_id="check", name="Check", handler=check)
+        child.add_task(task_id="double", name="Double", handler=lambda c: c["check"] * 2, depends_on=["check"])
+        return child.build()
+
+    def parent_workflow(self, child, fail=False):
+        builder = WorkflowBuilder(workflow_id="wf-parent", name="Parent")
+        builder.add_task(task_id="config", name="Config", handler=lambda c: {"value": 4, "fail": fail})
+        builder.add_subworkflow(task_id="child", name="Child", workflow=child, depends_on=["config"])
+        builder.add_task(task_id="report", name="Report", handler=lambda c: c["child"]["double"],
+                         depends_on=["child"])
+        return builder.build()
+
+    def test_subworkflow(self):
+        child = self.child_workflow()
+        plan = child.plan
+        executor = WorkflowExecutor(ledger=self.ledger)
+        for run_executor in (executor, AsyncWorkflowExecutor()):
+            result = run_executor.execute(self.parent_workflow(child))
+            self.assertEqual(result.status, WorkflowStatus.SUCCESS)
+            self.assertEqual(result.tasks["child"].result, {"check": 5, "double": 10})
+            self.assertEqual(result.tasks["report"].result, 10)
+        self.assertIs(child.plan, plan)
+
+        children = [e for e in executor.executions.values() if e.metadata.get("parent_execution_id")]
+        self.assertEqual(len(children), 1)
+        self.assertEqual(children[0].workflow_id, "wf-child")
+        started = self.ledger.query_events(event_type="workflow_started", target=children[0].execution_id)
+        self.assertIn("parent_execution_id", started[0]["payload_json"])
+
+        result = executor.execute(self.parent_workflow(child, fail=True))
+        self.assertEqual(result.tasks["child"].status, TaskStatus.FAILED)
+        self.assertIn("child failed", result.tasks["child"].error)
+        self.assertEqual(result.tasks["report"].status, TaskStatus.SKIPPED)
+
+    def test_subworkflow_timeout_cancels_child(self):
+        def stall(context, token):
+            token.wait(5)
+
+        child = WorkflowBuilder(workflow_id="wf-stall", name="Stall")
+        child.add_task(task_id="stall", name="Stall", handler=stall)
+        builder = WorkflowBuilder(workflow_id="wf-timeout-parent", name="Timeout parent")
+        builder.add_subworkflow(task_id="child", name="Child", workflow=child.build(), timeout=0.1)
+        executor = WorkflowExecutor()
+
+        started = time.monotonic()
+        result = executor.execute(builder.build())
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(result.tasks["child"].status, TaskStatus.FAILED)
+        self.assertIn("timeout", result.tasks["child"].error)
+        child_run = next(e for e in executor.executions.values() if e.workflow_id == "wf-stall")
+        child_run_settled = child_run.cancel_token.wait(1)
+        self.assertTrue(child_run_settled)
+
+    def test_cached_task_keyed_on_subworkflow_inputs(self):
+        def collect(context):
+            return sorted((key, value) for key, value in context.items())
+
+        child = WorkflowBuilder(workflow_id="wf-cached-child", name="Cached child")
+        child.add_task(task_id="c", name="C", handler=collect, cache=True)
+        child = child.build()
+        builder = WorkflowBuilder(workflow_id="wf-cached-parent", name="Cached parent")
+        builder.add_task(task_id="a", name="A", handler=lambda context: 1)
+        builder.add_task(task_id="b", name="B", handler=lambda context: 2)
+        builder.add_subworkflow(task_id="s1", name="S1", workflow=child, depends_on=["a"])
+        builder.add_subworkflow(task_id="s2", name="S2", workflow=child, depends_on=["b"])
+
+        result = WorkflowExecutor(max_workers=1, result_cache=ResultCache()).execute(builder.build())
+        self.assertEqual(result.tasks["s1"].result, {"c": [("a", 1)]})
+        self.assertEqual(result.tasks["s2"].result, {"c": [("b", 2)]})
+
+
 if __name__ == '__main__':
     unittest.main()
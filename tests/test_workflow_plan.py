@@ -0,0 +1,114 @@
+"""
+Tests for core/workflow_plan.py - compiled, validated workflow plans
+"""
+import unittest
+import dataclasses
+from simdecisions.core.workflow_plan import WorkflowValidationError, compile_plan
+from simdecisions.core.workflow_orchestrator import (
+    WorkflowBuilder, WorkflowDefinition, WorkflowExecutor, WorkflowMonitor, WorkflowStatus, TaskDefinition
+)
+
+
+def noop(context):
+    return None
+
+
+class TestWorkflowPlan(unittest.TestCase):
+
+    def diamond(self):
+        builder = WorkflowBuilder(workflow_id="wf-diamond", name="Diamond")
+        builder.add_task(task_id="d", name="D", handler=noop, depends_on=["b", "c"])
+        builder.add_task(task_id="b", name="B", handler=noop, depends_on=["a"])
+        builder.add_task(task_id="c", name="C", handler=noop, depends_on=["a"])
+        builder.add_task(task_id="a", name="A", handler=noop)
+        builder.add_task(task_id="e", name="E", handler=noop)
+        return builder
+
+    def test_topological_layout(self):
+        plan = self.diamond().build().plan
+        self.assertEqual(plan.task_ids, ("a", "e", "b", "c", "d"))
+        self.assertEqual([[plan.task_ids[i] for i in level] for level in plan.levels],
+                         [["a", "e"], ["b", "c"], ["d"]])
+        self.assertEqual(plan.depth, 3)
+        d = plan.index["d"]
+        self.assertEqual(sorted(plan.task_ids[i] for i in plan.upstream[d]), ["b", "c"])
+        self.assertTrue(all(u < i for i in range(plan.size) for u in plan.upstream[i]))
+        self.assertEqual(plan.in_degree["d"], 2)
+        self.assertEqual(plan.roots, ("a", "e"))
+
+    def test_plan_is_immutable_and_reused(self):
+        workflow = self.diamond().build()
+        plan = workflow.plan
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            plan.roots = ()
+        with self.assertRaises(TypeError):
+            plan.in_degree["d"] = 0
+
+        executor = WorkflowExecutor()
+        self.assertEqual(executor.execute(workflow).status, WorkflowStatus.SUCCESS)
+        self.assertEqual(executor.execute(workflow).status, WorkflowStatus.SUCCESS)
+        self.assertIs(workflow.plan, plan)
+
+    def test_validation_errors(self):
+        builder = WorkflowBuilder(name="Dangling")
+        builder.add_task(task_id="a", name="A", handler=noop, depends_on=["missing"])
+        with self.assertRaisesRegex(WorkflowValidationError, "'a' depends on unknown task 'missing'"):
+            builder.build()
+
+        builder = WorkflowBuilder(name="Cycle")
+        builder.add_task(task_id="start", name="Start", handler=noop)
+        builder.add_task(task_id="a", name="A", handler=noop, depends_on=["start", "c"])
+        builder.add_task(task_id="b", name="B", handler=noop, depends_on=["a"])
+        builder.add_task(task_id="c", name="C", handler=noop, depends_on=["b"])
+        builder.add_task(task_id="after", name="After", handler=noop, depends_on=["c"])
+        with self.assertRaisesRegex(WorkflowValidationError, r"Cycle detected: (a -> b -> c -> a|b -> c -> a -> b|c -> a -> b -> c)"):
+            builder.build()
+
+        builder = WorkflowBuilder(name="Self")
+        builder.add_task(task_id="a", name="A", handler=noop, depends_on=["a"])
+        with self.assertRaisesRegex(WorkflowValidationError, "Cycle detected: a -> a"):
+            builder.build()
+
+        builder = WorkflowBuilder(name="Branch")
+        builder.add_task(task_id="a", name="A", handler=noop)
+        builder.add_task(task_id="b", name="B", handler=noop, branch_conditions={"a": "if_failed"})
+        with self.assertRaisesRegex(WorkflowValidationError, "branch condition on 'a'"):
+            builder.build()
+
+        builder = WorkflowBuilder(name="Map")
+        builder.add_task(task_id="a", name="A", handler=noop)
+        builder.add_map(task_id="m", name="M", handler=noop, over="a")
+        builder.tasks["m"].depends_on = []
+        with self.assertRaisesRegex(WorkflowValidationError, "maps over 'a'"):
+            builder.build()
+
+    def test_hand_built_definition_fails_cleanly(self):
+        workflow = WorkflowDefinition(workflow_id="wf-bad", name="Bad", tasks={
+            "a": TaskDefinition(task_id="a", name="A", handler=noop, depends_on=["ghost"]),
+        })
+        execution = WorkflowExecutor().execute(workflow)
+        self.assertEqual(execution.status, WorkflowStatus.FAILED)
+        self.assertIn("Task 'a' depends on unknown task 'ghost'", execution.errors)
+
+    def test_critical_path_from_history(self):
+        plan = self.diamond().build().plan
+        estimate = plan.critical_path({"a": 1.0, "b": 5.0, "c": 2.0, "d": 1.0, "e": 3.0})
+        self.assertEqual(estimate.task_ids, ("a", "b", "d"))
+        self.assertEqual(estimate.length, 7.0)
+
+        # Tasks without history count as the mean of the known durations
+        remaining = plan.remaining_work({"a": 1.0, "b": 5.0})
+        self.assertEqual(remaining["d"], 3.0)
+        self.assertEqual(remaining["a"], 9.0)
+        self.assertEqual(compile_plan({}).roots, ())
+
+        monitor = WorkflowMonitor()
+        workflow = self.diamond().build()
+        monitor.record_execution(WorkflowExecutor().execute(workflow))
+        durations = monitor.get_average_task_durations()
+        self.assertEqual(set(durations), {"a", "b", "c", "d", "e"})
+        self.assertEqual(len(workflow.plan.critical_path(durations).task_ids), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,284 @@
+"""
+Tests for core/workflow_scheduler.py - shared-pool scheduler with fair queuing
+"""
+import unittest
+import threading
+import time
+from simdecisions.core.retry import RetryPolicy
+from simdecisions.core.workflow_orchestrator import (
+    TaskStatus, WorkflowBuilder, WorkflowMonitor, WorkflowStatus
+)
+from simdecisions.core.workflow_scheduler import WorkflowScheduler
+
+
+def sleeper(seconds, record=None, label=None):
+    lock = threading.Lock()
+
+    def handler(context):
+        if record is not None:
+            with lock:
+                record.append(label)
+        time.sleep(seconds)
+        return label
+    return handler
+
+
+def chain(workflow_id, length=3, seconds=0.01, record=None, domain=None):
+    builder = WorkflowBuilder(workflow_id=workflow_id, name=workflow_id)
+    for i in range(length):
+        builder.add_task(task_id=f"t{i}", name=f"T{i}", handler=sleeper(seconds, record, workflow_id),
+                         domain=domain, depends_on=[f"t{i - 1}"] if i else [])
+    return builder.build()
+
+
+def wide(workflow_id, width, seconds=0.01, record=None, domain=None):
+    builder = WorkflowBuilder(workflow_id=workflow_id, name=workflow_id)
+    for i in range(width):
+        builder.add_task(task_id=f"t{i}", name=f"T{i}", handler=sleeper(seconds, record, workflow_id),
+                         domain=domain)
+    return builder.build()
+
+
+class TestWorkflowScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = None
+
+    def tearDown(self):
+        if self.scheduler is not None:
+            self.scheduler.shutdown(cancel_running=True)
+
+    def test_submit_returns_before_run_finishes(self):
+        self.scheduler = WorkflowScheduler(max_workers=2)
+        begin = time.perf_counter()
+        handle = self.scheduler.submit(chain("wf-slow", length=2, seconds=0.2))
+        self.assertLess(time.perf_counter() - begin, 0.1)
+        self.assertFalse(handle.done())
+        self.assertIn(handle.status(), (WorkflowStatus.CREATED, WorkflowStatus.RUNNING))
+
+        execution = handle.result(timeout=5)
+        self.assertTrue(handle.done())
+        self.assertEqual(handle.status(), WorkflowStatus.SUCCESS)
+        self.assertEqual(execution.outputs["t1"], "wf-slow")
+        self.assertEqual(execution.scheduler.tasks_dispatched, 2)
+
+    def test_many_workflows_share_bounded_pool(self):
+        self.scheduler = WorkflowScheduler(max_workers=4)
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def counted(context):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        builder = WorkflowBuilder(workflow_id="wf-counted", name="Counted")
+        for i in range(4):
+            builder.add_task(task_id=f"t{i}", name=f"T{i}", handler=counted)
+        workflow = builder.build()
+
+        threads_before = threading.active_count()
+        handles = [self.scheduler.submit(workflow) for _ in range(30)]
+        executions = [handle.result(timeout=10) for handle in handles]
+
+        self.assertTrue(all(e.status == WorkflowStatus.SUCCESS for e in executions))
+        self.assertEqual(peak[0], 4)
+        self.assertLessEqual(threading.active_count() - threads_before, 4)
+
+    def test_tenant_weights_share_workers(self):
+        record = []
+        self.scheduler = WorkflowScheduler(max_workers=1, tenant_weights={"gold": 3.0})
+        # Hold the only worker until both tenants have queued work
+        gate = threading.Event()
+        blocker = WorkflowBuilder(workflow_id="wf-gate", name="Gate")
+        blocker.add_task(task_id="wait", name="Wait", handler=lambda context: gate.wait(5))
+        first = self.scheduler.submit(blocker.build())
+        time.sleep(0.05)
+
+        basic = self.scheduler.submit(wide("basic", 8, record=record), tenant="basic")
+        gold = self.scheduler.submit(wide("gold", 8, record=record), tenant="gold")
+        time.sleep(0.05)
+        gate.set()
+        for handle in (first, basic, gold):
+            handle.result(timeout=5)
+
+        # Three gold tasks per basic one until gold runs dry
+        self.assertEqual(record[:8].count("gold"), 6)
+        self.assertEqual(record[-2:], ["basic", "basic"])
+
+    def test_domain_weights_share_workers(self):
+        record = []
+        self.scheduler = WorkflowScheduler(max_workers=1, domain_weights={"fast": 2.0})
+        gate = threading.Event()
+        blocker = WorkflowBuilder(workflow_id="wf-gate", name="Gate")
+        blocker.add_task(task_id="wait", name="Wait", handler=lambda context: gate.wait(5))
+        first = self.scheduler.submit(blocker.build())
+        time.sleep(0.05)
+
+        slow = self.scheduler.submit(wide("slow", 6, record=record, domain="slow"))
+        fast = self.scheduler.submit(wide("fast", 6, record=record, domain="fast"))
+        time.sleep(0.05)
+        gate.set()
+        for handle in (first, slow, fast):
+            handle.result(timeout=5)
+
+        self.assertEqual(record[:6].count("fast"), 4)
+
+    def test_cancel_through_handle(self):
+        self.scheduler = WorkflowScheduler(max_workers=2)
+        running = threading.Event()
+
+        def wait_for_cancel(context, token):
+            running.set()
+            token.wait(5)
+            token.raise_if_cancelled()
+
+        builder = WorkflowBuilder(workflow_id="wf-cancel", name="Cancel")
+        builder.add_task(task_id="polite", name="Polite", handler=wait_for_cancel)
+        builder.add_task(task_id="after", name="After", handler=sleeper(0.01), depends_on=["polite"])
+        handle = self.scheduler.submit(builder.build())
+        other = self.scheduler.submit(chain("wf-other"))
+
+        self.assertTrue(running.wait(5))
+        self.assertTrue(handle.cancel("user request"))
+        execution = handle.result(timeout=5)
+
+        self.assertEqual(execution.status, WorkflowStatus.CANCELLED)
+        self.assertEqual(execution.tasks["polite"].status, TaskStatus.CANCELLED)
+        self.assertEqual(execution.tasks["after"].status, TaskStatus.CANCELLED)
+        self.assertFalse(handle.cancel())
+        self.assertEqual(other.result(timeout=5).status, WorkflowStatus.SUCCESS)
+
+    def test_retries_and_failures(self):
+        self.scheduler = WorkflowScheduler(max_workers=2)
+        calls = []
+
+        def flaky(context):
+            calls.append(True)
+            if len(calls) < 3:
+                raise ConnectionError("try again")
+            return "ok"
+
+        builder = WorkflowBuilder(workflow_id="wf-flaky", name="Flaky")
+        builder.add_task(task_id="flaky", name="Flaky", handler=flaky,
+                         retry_policy=RetryPolicy(max_retries=3, base_delay=0.01, jitter=False))
+        retried = self.scheduler.submit(builder.build())
+
+        builder = WorkflowBuilder(workflow_id="wf-broken", name="Broken")
+        builder.add_task(task_id="bad", name="Bad", handler=lambda context: 1 / 0)
+        builder.add_task(task_id="after", name="After", handler=sleeper(0.01), depends_on=["bad"])
+        broken = self.scheduler.submit(builder.build())
+
+        self.assertEqual(retried.result(timeout=5).status, WorkflowStatus.SUCCESS)
+        self.assertEqual(retried.execution.tasks["flaky"].attempts, 3)
+        self.assertEqual(broken.result(timeout=5).status, WorkflowStatus.FAILED)
+        self.assertEqual(broken.execution.tasks["after"].status, TaskStatus.SKIPPED)
+
+    def test_retries_wait_for_a_worker(self):
+        self.scheduler = WorkflowScheduler(max_workers=1)
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def counted(fail_times=0):
+            calls = []
+
+            def handler(context):
+                calls.append(True)
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+                time.sleep(0.02)
+                with lock:
+                    running[0] -= 1
+                    # Dispatched attempts, this one included, never exceed the workers
+                    peak[0] = max(peak[0], self.scheduler._busy)
+                if len(calls) <= fail_times:
+                    raise ConnectionError("try again")
+            return handler
+
+        builder = WorkflowBuilder(workflow_id="wf-retry", name="Retry")
+        builder.add_task(task_id="flaky", name="Flaky", handler=counted(fail_times=2),
+                         retry_policy=RetryPolicy(max_retries=2, base_delay=0.001, jitter=False))
+        flaky = self.scheduler.submit(builder.build(), tenant="a")
+        builder = WorkflowBuilder(workflow_id="wf-busy", name="Busy")
+        for i in range(6):
+            builder.add_task(task_id=f"t{i}", name=f"T{i}", handler=counted())
+        busy = self.scheduler.submit(builder.build(), tenant="b")
+
+        self.assertEqual(flaky.result(timeout=5).status, WorkflowStatus.SUCCESS)
+        self.assertEqual(busy.result(timeout=5).status, WorkflowStatus.SUCCESS)
+        self.assertEqual(flaky.execution.tasks["flaky"].attempts, 3)
+        self.assertEqual(peak[0], 1)
+
+    def test_fail_fast_stops_running_siblings(self):
+        self.scheduler = WorkflowScheduler(max_workers=2, fail_fast=True)
+
+        def polling(context, token):
+            for _ in range(300):
+                token.raise_if_cancelled()
+                time.sleep(0.01)
+
+        def failing(context):
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        builder = WorkflowBuilder(workflow_id="wf-fast", name="Fast")
+        builder.add_task(task_id="bad", name="Bad", handler=failing)
+        builder.add_task(task_id="sibling", name="Sibling", handler=polling)
+        begin = time.perf_counter()
+        execution = self.scheduler.submit(builder.build()).result(timeout=5)
+
+        self.assertLess(time.perf_counter() - begin, 1.0)
+        self.assertEqual(execution.status, WorkflowStatus.FAILED)
+        self.assertEqual(execution.tasks["sibling"].status, TaskStatus.CANCELLED)
+
+    def test_finish_error_fails_only_its_run(self):
+        class FlakyMonitor(WorkflowMonitor):
+            failures = 1
+
+            def record_execution(self, execution):
+                if self.failures:
+                    self.failures -= 1
+                    raise OSError("monitor down")
+                super().record_execution(execution)
+
+        monitor = FlakyMonitor()
+        self.scheduler = WorkflowScheduler(max_workers=2, monitor=monitor)
+        first = self.scheduler.submit(chain("wf-first"))
+        with self.assertRaises(OSError):
+            first.result(timeout=5)
+        self.assertTrue(first.done())
+
+        second = self.scheduler.submit(chain("wf-second"))
+        self.assertEqual(second.result(timeout=5).status, WorkflowStatus.SUCCESS)
+        self.assertTrue(self.scheduler._thread.is_alive())
+        self.assertEqual(monitor.get_execution_count(), 1)
+
+    def test_finished_runs_beyond_history_are_released(self):
+        self.scheduler = WorkflowScheduler(max_workers=1, history=2)
+        handles = [self.scheduler.submit(chain(f"wf-{i}", length=1)) for i in range(5)]
+        for handle in handles:
+            self.assertEqual(handle.result(timeout=5).status, WorkflowStatus.SUCCESS)
+
+        kept = {handle.execution_id for handle in handles[-2:]}
+        self.assertEqual(set(self.scheduler.executions), kept)
+        self.assertEqual(set(self.scheduler.workflows), {"wf-3", "wf-4"})
+        self.assertFalse(handles[0].cancel())
+
+    def test_execute_and_shutdown(self):
+        self.scheduler = WorkflowScheduler(max_workers=2)
+        self.assertEqual(self.scheduler.execute(chain("wf-sync")).status, WorkflowStatus.SUCCESS)
+
+        pending = self.scheduler.submit(chain("wf-last", seconds=0.05))
+        self.scheduler.shutdown()
+        self.assertEqual(pending.status(), WorkflowStatus.SUCCESS)
+        with self.assertRaises(RuntimeError):
+            self.scheduler.submit(chain("wf-late"))
+        self.scheduler = None
+
+
+if __name__ == '__main__':
+    unittest.main()